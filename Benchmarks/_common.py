@@ -0,0 +1,41 @@
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+
+# Бенчмарки импортируют код так же, как main.py: `systems.*`
+if str(ROOT_PATH / "Code") not in sys.path:
+    sys.path.insert(0, str(ROOT_PATH / "Code"))
+
+
+def measure_time(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Возвращает лучшее время выполнения функции в секундах из `repeat` запусков."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def measure_memory(func: Callable[[], Any]) -> Tuple[Any, int]:
+    """Выполняет функцию и возвращает ее результат и объем удерживаемой им памяти в байтах."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        current, _ = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    return result, current
+
+
+def print_row(*columns: Any, width: int = 16) -> None:
+    print("".join(f"{str(col):<{width}}" for col in columns))
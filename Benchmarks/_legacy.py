@@ -0,0 +1,86 @@
+"""Прежние реализации, с которыми сравниваются бенчмарки."""
+import hashlib
+import math
+import zipfile
+from pathlib import Path
+from typing import Dict, List
+
+
+class LegacyCoordinate:
+    """Coordinate до перехода на __slots__ и упакованный ключ."""
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __eq__(self, other):
+        if isinstance(other, LegacyCoordinate):
+            return self.x == other.x and self.y == other.y
+
+        elif isinstance(other, tuple):
+            return self.x == other[0] and self.y == other[1]
+
+        return False
+
+    def distance_to(self, other: "LegacyCoordinate") -> float:
+        return math.sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2)
+
+
+class LegacyMapStorage:
+    """Прежнее хранилище MapEntity: один словарь Coordinate -> List на всю карту."""
+
+    def __init__(self) -> None:
+        self.entities: Dict[LegacyCoordinate, List[object]] = {}
+
+    def add(self, x: int, y: int, entity: object) -> None:
+        coord = LegacyCoordinate(x, y)
+        if coord not in self.entities:
+            self.entities[coord] = []
+
+        self.entities[coord].append(entity)
+
+    def get_entities(self, coord: LegacyCoordinate):
+        return self.entities.get(coord, None)
+
+    def get_entities_in_radius(self, center: LegacyCoordinate, radius: float):
+        entities_in_radius = set()
+
+        min_x, max_x = center.x - radius, center.x + radius
+        min_y, max_y = center.y - radius, center.y + radius
+
+        for dx in range(int(min_x), int(max_x) + 1):
+            for dy in range(int(min_y), int(max_y) + 1):
+                current_coords = LegacyCoordinate(dx, dy)
+                if current_coords in self.entities:
+                    if center.distance_to(current_coords) <= radius:
+                        entities_in_radius.update(self.entities[current_coords])
+
+        return list(entities_in_radius)
+
+
+def legacy_content_hash(folder_path: Path, archive_path: Path) -> str:
+    """Прежний DownloadServerModule.net_get_server_content_hash: обход Content
+    с stat каждого файла, пересборка zip при новых mtime и хэш всего архива."""
+    latest_time = 0.0
+    for file_path in folder_path.rglob("*"):
+        if file_path.is_file():
+            latest_time = max(latest_time, file_path.stat().st_mtime)
+
+    if not archive_path.exists() or archive_path.stat().st_mtime < latest_time:
+        if archive_path.exists():
+            archive_path.unlink()
+
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for file_path in folder_path.rglob("*"):
+                if file_path.is_file():
+                    zipf.write(file_path, file_path.relative_to(folder_path))
+
+    hash_function = hashlib.sha256()
+    with archive_path.open("rb") as f:
+        while chunk := f.read(8192):
+            hash_function.update(chunk)
+
+    return hash_function.hexdigest()
@@ -0,0 +1,127 @@
+"""Сравнение рукописных dump/restore компонента со сгенерированными по схеме.
+
+Запуск: python Benchmarks/component_schema.py [кол-во компонентов ...]
+"""
+import io
+import sys
+from typing import Any, Dict, List
+
+import msgpack
+from _common import measure_time, print_row
+
+from systems.ecs import BaseComponent, BaseEntity, register_component, register_entity
+from systems.map.coordinate import Coordinate
+from systems.map.map_entity import MapEntity
+from systems.map.map_snapshot import MapSnapshot
+
+
+@register_component
+class BenchManualStatsComponent(BaseComponent):
+    def __init__(self, health: int = 100, armor: int = 0, speed: float = 1.0,
+                 tags: List[str] | None = None) -> None:
+        super().__init__()
+        self.health = health
+        self.armor = armor
+        self.speed = speed
+        self.tags = tags if tags is not None else []
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "health": self.health,
+            "armor": self.armor,
+            "speed": self.speed,
+            "tags": self.tags,
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchManualStatsComponent":
+        return cls(
+            data.get("health", 100),
+            data.get("armor", 0),
+            data.get("speed", 1.0),
+            data.get("tags", []),
+        )
+
+
+@register_component
+class BenchSchemaStatsComponent(BaseComponent):
+    health: int = 100
+    armor: int = 0
+    speed: float = 1.0
+    tags: List[str] = []
+
+
+@register_entity
+class BenchSchemaUnit(BaseEntity):
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "components": {
+                name: comp.dump() for name, comp in self._components.items()
+            },
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchSchemaUnit":
+        entity = cls(id=data["id"])
+        cls._restore_components(entity, data)
+        return entity
+
+
+def build_map(component_type: type, count: int) -> MapEntity:
+    map_entity = MapEntity("bench")
+    for i in range(count):
+        entity = BenchSchemaUnit("unit")
+        entity.add_component(component_type(health=i % 100, armor=i % 7, tags=["unit"]))
+        map_entity.add_entity(Coordinate(i % 64, i // 64), entity)
+
+    return map_entity
+
+
+def snapshot_size(map_entity: MapEntity) -> int:
+    stream = io.BytesIO()
+    MapSnapshot.dump(map_entity, stream)
+    return len(stream.getvalue())
+
+
+def run(count: int) -> None:
+    manual = [BenchManualStatsComponent(i % 100, i % 7, tags=["unit"]) for i in range(count)]
+    schema = [BenchSchemaStatsComponent(health=i % 100, armor=i % 7, tags=["unit"]) for i in range(count)]
+    manual_dumps = [comp.dump() for comp in manual]
+    schema_dumps = [comp.dump() for comp in schema]
+    schema_values = [comp.dump_values() for comp in schema]
+
+    rows = [
+        ("dump", lambda: [c.dump() for c in manual], lambda: [c.dump() for c in schema]),
+        ("restore",
+         lambda: [BenchManualStatsComponent.restore(d) for d in manual_dumps],
+         lambda: [BenchSchemaStatsComponent.restore(d) for d in schema_dumps]),
+        ("restore_values", None,
+         lambda: [BenchSchemaStatsComponent.restore_values(v) for v in schema_values]),
+    ]
+    for name, manual_func, schema_func in rows:
+        print_row(
+            f"{count} {name}",
+            f"{measure_time(manual_func) * 1000:.1f}" if manual_func else "-",
+            f"{measure_time(schema_func) * 1000:.1f}",
+        )
+
+    print_row(
+        f"{count} msgpack",
+        len(msgpack.packb(manual_dumps)),
+        len(msgpack.packb(schema_values)),
+    )
+    print_row(
+        f"{count} snapshot",
+        snapshot_size(build_map(BenchManualStatsComponent, count)),
+        snapshot_size(build_map(BenchSchemaStatsComponent, count)),
+    )
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    print_row("case", "manual", "schema")
+    for count in counts:
+        run(count)
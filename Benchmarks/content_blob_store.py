@@ -0,0 +1,86 @@
+"""Пересборка content.zip после изменения одного файла: zipfile против BlobStore.
+
+Контент: 70% "png" (несжимаемые данные), 30% текстовых файлов.
+
+Запуск: python Benchmarks/content_blob_store.py [кол-во файлов] [размер файла, КиБ]
+"""
+import random
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+from _common import measure_time, print_row
+
+from systems.content import BlobStore, ContentManifest
+
+
+def generate(root: Path, files: int, size: int) -> None:
+    rng = random.Random(files)
+    words = ["sprite", "text", "desc", "health", "access", "chat", "admin", "user"]
+    for i in range(files):
+        directory = root / f"dir_{i % 20}"
+        directory.mkdir(parents=True, exist_ok=True)
+        if i % 10 < 7:
+            (directory / f"image_{i}.png").write_bytes(rng.randbytes(size))
+
+        else:
+            text = " ".join(rng.choice(words) for _ in range(size // 6))
+            (directory / f"strings_{i}.loc").write_text(text, encoding="utf-8")
+
+
+def zipfile_build(manifest: ContentManifest, archive: Path) -> None:
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for path in sorted(manifest.files):
+            zipf.write(manifest.root / path, path)
+
+
+def blob_build(store: BlobStore, manifest: ContentManifest, archive: Path) -> None:
+    store.write_archive(
+        archive,
+        [(path, manifest.root / path, entry.hash) for path, entry in sorted(manifest.files.items())],
+    )
+
+
+def run(files: int, size: int) -> None:
+    with tempfile.TemporaryDirectory() as temp:
+        root = Path(temp) / "Content"
+        generate(root, files, size)
+        manifest = ContentManifest(root)
+        manifest.refresh()
+        store = BlobStore(Path(temp) / "blobs")
+        counter = iter(range(10**6))
+
+        def change_one() -> None:
+            (root / "dir_7" / "strings_7.loc").write_text(f"text-{next(counter)} = changed")
+            manifest.update(["dir_7/strings_7.loc"])
+
+        def cold_build() -> None:
+            store.collect([])
+            blob_build(store, manifest, Path(temp) / "b.zip")
+
+        def warm_build() -> None:
+            change_one()
+            blob_build(store, manifest, Path(temp) / "b.zip")
+
+        full = measure_time(lambda: zipfile_build(manifest, Path(temp) / "a.zip"), repeat=3)
+        cold = measure_time(cold_build, repeat=3)
+        warm = measure_time(warm_build, repeat=3)
+
+        zip_size = (Path(temp) / "a.zip").stat().st_size // 1024
+        blob_size = (Path(temp) / "b.zip").stat().st_size // 1024
+
+    print_row(
+        f"{files} x {size // 1024} KiB",
+        f"{full * 1000:.1f}",
+        f"{cold * 1000:.1f}",
+        f"{warm * 1000:.1f}",
+    )
+    print_row("archive, KiB", zip_size, blob_size, "")
+
+
+if __name__ == "__main__":
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    print_row("content", "zipfile, ms", "blobs cold, ms", "blobs 1 changed, ms")
+    run(files, size * 1024)
@@ -0,0 +1,66 @@
+"""Объем обновления контента: полный content.zip против архива дельты.
+
+Запуск: python Benchmarks/content_delta.py [кол-во файлов] [измененных файлов ...]
+"""
+import random
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+from _common import measure_time, print_row
+
+from systems.content import ContentManifest, build_delta_archive, diff_manifest
+
+
+def generate(root: Path, files: int) -> None:
+    rng = random.Random(files)
+    for i in range(files):
+        path = root / f"dir_{i % 20}" / f"file_{i}.bin"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(rng.randbytes(16 * 1024))
+
+
+def build_full(root: Path, archive: Path) -> None:
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for path in sorted(root.rglob("*")):
+            if path.is_file():
+                zipf.write(path, path.relative_to(root))
+
+
+def run(files: int, changes: int) -> None:
+    with tempfile.TemporaryDirectory() as temp:
+        root = Path(temp) / "Content"
+        generate(root, files)
+        manifest = ContentManifest(root)
+        manifest.refresh()
+        client_files = {path: entry.hash for path, entry in manifest.files.items()}
+
+        for i in range(changes):
+            (root / f"dir_{i % 20}" / f"file_{i}.bin").write_bytes(random.randbytes(16 * 1024))
+
+        manifest.refresh()
+        full_archive = Path(temp) / "full.zip"
+        delta_archive = Path(temp) / "delta.zip"
+
+        full_time = measure_time(lambda: build_full(root, full_archive), repeat=3)
+        delta_time = measure_time(
+            lambda: build_delta_archive(manifest, diff_manifest(manifest, client_files), delta_archive),
+            repeat=3,
+        )
+
+        print_row(
+            f"{files}/{changes}",
+            full_archive.stat().st_size // 1024,
+            delta_archive.stat().st_size // 1024,
+            f"{full_time * 1000:.1f}",
+            f"{delta_time * 1000:.1f}",
+        )
+
+
+if __name__ == "__main__":
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    changes = [int(arg) for arg in sys.argv[2:]] or [0, 1, 20, 200]
+    print_row("files/changed", "full, KiB", "delta, KiB", "full, ms", "delta, ms")
+    for count in changes:
+        run(files, count)
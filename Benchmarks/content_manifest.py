@@ -0,0 +1,90 @@
+"""Хэш контента: прежний zip-then-hash против ContentManifest.
+
+Запуск: python Benchmarks/content_manifest.py [кол-во файлов] [размер файла, КиБ]
+"""
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from _common import measure_time, print_row
+from _legacy import legacy_content_hash
+
+from systems.content import ContentManifest
+
+
+def generate(root: Path, files: int, size: int) -> None:
+    rng = random.Random(files)
+    for i in range(files):
+        path = root / f"dir_{i % 20}" / f"sub_{i % 7}" / f"file_{i}.bin"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(rng.randbytes(size))
+
+
+def touch_one(root: Path, index: int) -> None:
+    path = root / "dir_0" / "sub_0" / "file_0.bin"
+    path.write_bytes(index.to_bytes(8, "little") + path.read_bytes()[8:])
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + index * 10**9))
+
+
+def run(files: int, size: int) -> None:
+    with tempfile.TemporaryDirectory() as temp:
+        root = Path(temp) / "Content"
+        archive = Path(temp) / "content.zip"
+        generate(root, files, size)
+
+        counter = iter(range(1, 1000))
+
+        def legacy_cold_hash() -> None:
+            archive.unlink(missing_ok=True)
+            legacy_content_hash(root, archive)
+
+        def legacy_changed_hash() -> None:
+            touch_one(root, next(counter))
+            legacy_content_hash(root, archive)
+
+        legacy_cold = measure_time(legacy_cold_hash, repeat=3)
+        legacy_warm = measure_time(lambda: legacy_content_hash(root, archive))
+        legacy_changed = measure_time(legacy_changed_hash, repeat=3)
+
+        manifest_cold = measure_time(lambda: ContentManifest(root).refresh(), repeat=3)
+        manifest = ContentManifest(root)
+        manifest.refresh()
+
+        def manifest_changed_hash() -> None:
+            touch_one(root, next(counter))
+            manifest.refresh()
+            manifest.root_hash
+
+        def manifest_update_hash() -> None:
+            touch_one(root, next(counter))
+            manifest.update(["dir_0/sub_0/file_0.bin"])
+            manifest.root_hash
+
+        manifest_warm = measure_time(manifest.refresh)
+        manifest_changed = measure_time(manifest_changed_hash, repeat=3)
+        manifest_update = measure_time(manifest_update_hash, repeat=3)
+        root_query = measure_time(lambda: manifest.root_hash)
+
+    for name, legacy, current in (
+        ("cold", legacy_cold, manifest_cold),
+        ("no changes", legacy_warm, manifest_warm),
+        ("1 file changed", legacy_changed, manifest_changed),
+        ("1 file, update()", None, manifest_update),
+        ("root_hash query", None, root_query),
+    ):
+        print_row(
+            f"{files} {name}",
+            f"{legacy * 1000:.2f}" if legacy is not None else "-",
+            f"{current * 1000:.3f}",
+            width=22,
+        )
+
+
+if __name__ == "__main__":
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    print_row("files case", "zip+hash, ms", "manifest, ms", width=22)
+    run(files, size * 1024)
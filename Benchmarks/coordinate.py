@@ -0,0 +1,41 @@
+"""Пропускная способность hash/eq/поиска в словаре и память на экземпляр Coordinate.
+
+Запуск: python Benchmarks/coordinate.py
+"""
+import random
+
+from _common import measure_memory, measure_time, print_row
+from _legacy import LegacyCoordinate
+
+from systems.map.coordinate import Coordinate
+
+COUNT = 200_000
+
+
+def run(cls, points) -> None:
+    coords, memory = measure_memory(lambda: [cls(x, y) for x, y in points])
+    probes = [cls(x, y) for x, y in points]
+    table = dict.fromkeys(coords)
+
+    hash_time = measure_time(lambda: [hash(c) for c in coords])
+    eq_time = measure_time(lambda: [a == b for a, b in zip(coords, probes)])
+    lookup_time = measure_time(lambda: [c in table for c in probes])
+
+    print_row(
+        cls.__name__,
+        f"{memory / len(points):.0f}",
+        f"{len(points) / hash_time / 1e6:.1f}",
+        f"{len(points) / eq_time / 1e6:.1f}",
+        f"{len(points) / lookup_time / 1e6:.1f}",
+        width=18,
+    )
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    points = [(rng.randint(-5000, 5000), rng.randint(-5000, 5000)) for _ in range(COUNT)]
+
+    print(f"{COUNT} coordinates")
+    print_row("", "bytes/instance", "hash, M/s", "eq, M/s", "dict lookup, M/s", width=18)
+    run(LegacyCoordinate, points)
+    run(Coordinate, points)
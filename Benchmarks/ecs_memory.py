@@ -0,0 +1,70 @@
+"""Память сущностей с __slots__ и без, плюс отчет memory_report по реестру.
+
+Запуск: python Benchmarks/ecs_memory.py [кол-во сущностей]
+"""
+import sys
+from typing import Any, Dict
+
+from _common import measure_memory, print_row
+
+from systems.ecs import (BaseEntity, Factory, dump_fields,
+                         format_memory_report, memory_report, register_entity,
+                         restore_fields)
+from systems.map.components import CoordinateComponent
+from systems.map.coordinate import Coordinate
+
+
+class BenchItemBase(BaseEntity):
+    __slots__ = []
+
+    def __init__(self, id: str = "", name: str = "", weight: int = 1) -> None:
+        super().__init__(id)
+        self.name = name
+        self.weight = weight
+
+    def dump(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, **dump_fields(self)}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchItemBase":
+        entity = cls(id=data["id"])
+        restore_fields(entity, data)
+        return entity
+
+
+@register_entity
+class BenchDictItem(BenchItemBase):
+    pass
+
+
+@register_entity
+class BenchSlotItem(BenchItemBase):
+    __slots__ = ["name", "weight"]
+
+
+def fill(cls, count: int):
+    items = []
+    for i in range(count):
+        item = cls("item", "crate", i)
+        item.add_component(CoordinateComponent(Coordinate(i, i)))
+        items.append(item)
+
+    return items
+
+
+def run(count: int) -> None:
+    print(f"\n{count} entities with CoordinateComponent")
+    print_row("", "bytes/entity")
+    for cls in (BenchDictItem, BenchSlotItem):
+        _, used = measure_memory(lambda: fill(cls, count))
+        print_row(cls.__name__, f"{used / count:.0f}")
+
+    for entity in fill(BenchSlotItem, 1000) + fill(BenchDictItem, 1000):
+        Factory.assign_new_uid_if_needed(entity)
+
+    print()
+    print(format_memory_report(memory_report()))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,115 @@
+"""Запрос сущностей по набору компонентов: обход всех сущностей, ComponentStore и World.
+
+Запуск: python Benchmarks/ecs_query.py [кол-во сущностей ...]
+"""
+import random
+import sys
+from typing import Any, Dict
+
+from _common import measure_time, print_row
+
+from systems.ecs import (BaseComponent, BaseEntity, ComponentStore, Factory,
+                         World, register_component, register_entity)
+
+
+@register_component
+class BenchPositionComponent(BaseComponent):
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchPositionComponent":
+        return cls()
+
+
+@register_component
+class BenchHealthComponent(BenchPositionComponent):
+    pass
+
+
+@register_component
+class BenchAiComponent(BenchPositionComponent):
+    pass
+
+
+@register_entity
+class BenchEntity(BaseEntity):
+    def dump(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchEntity":
+        entity = cls(id=data["id"])
+        cls._restore_components(entity, data)
+        return entity
+
+
+# Доля сущностей с компонентом: позиция есть почти у всех, ИИ - у немногих
+DENSITY = {
+    "BenchPositionComponent": 0.9,
+    "BenchHealthComponent": 0.3,
+    "BenchAiComponent": 0.02,
+}
+
+
+def fill(count: int) -> None:
+    Factory._entity_registry_by_uid.clear()
+    World.clear()
+    rng = random.Random(count)
+    for _ in range(count):
+        components = {
+            name: {"type": name} for name, density in DENSITY.items() if rng.random() < density
+        }
+        Factory.create_entity({"id": "bench", "type": "BenchEntity", "components": components})
+
+
+def scan(*comp_types: str):
+    result = []
+    for entity in Factory._entity_registry_by_uid.values():
+        comps = [entity.get_component(comp_type) for comp_type in comp_types]
+        if all(comp is not None for comp in comps):
+            result.append((entity, *comps))
+
+    return result
+
+
+def churn_and_query(comp_types) -> None:
+    # Типичный тик: несколько сущностей меняют состав, затем система делает запрос
+    entity = next(iter(Factory._entity_registry_by_uid.values()))
+    for _ in range(10):
+        entity.add_component(BenchAiComponent())
+        entity.remove_component("BenchAiComponent")
+
+    World.query(*comp_types).rows()
+
+
+def run(count: int) -> None:
+    fill(count)
+    print(f"\n{count} entities")
+    print_row("query", "matches", "scan, ms", "store, ms", "view, us", "view+churn, us", width=18)
+
+    for comp_types in (
+        ("BenchPositionComponent",),
+        ("BenchPositionComponent", "BenchHealthComponent"),
+        ("BenchPositionComponent", "BenchAiComponent"),
+    ):
+        assert len(scan(*comp_types)) == len(ComponentStore.query(*comp_types))
+        scan_time = measure_time(lambda: scan(*comp_types))
+        store_time = measure_time(lambda: ComponentStore.query(*comp_types))
+        view_time = measure_time(lambda: World.query(*comp_types).rows())
+        churn_time = measure_time(lambda: churn_and_query(comp_types))
+        print_row(
+            " + ".join(name[5:-9] for name in comp_types),
+            len(ComponentStore.query(*comp_types)),
+            f"{scan_time * 1e3:.2f}",
+            f"{store_time * 1e3:.2f}",
+            f"{view_time * 1e6:.2f}",
+            f"{churn_time * 1e6:.1f}",
+            width=18,
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    for size in sizes:
+        run(size)
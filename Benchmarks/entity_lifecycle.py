@@ -0,0 +1,80 @@
+"""Память реестра сущностей при постоянном создании и уничтожении.
+
+Запуск: python Benchmarks/entity_lifecycle.py [кол-во раундов]
+"""
+import gc
+import sys
+import tracemalloc
+from typing import Any, Dict
+
+from _common import print_row
+
+from systems.ecs import (BaseComponent, BaseEntity, Factory,
+                         register_component, register_entity)
+
+
+@register_component
+class BenchLifetimeComponent(BaseComponent):
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchLifetimeComponent":
+        return cls()
+
+
+@register_entity
+class BenchProjectile(BaseEntity):
+    def dump(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchProjectile":
+        entity = cls(id=data["id"])
+        cls._restore_components(entity, data)
+        return entity
+
+
+DATA = {
+    "id": "bullet",
+    "type": "BenchProjectile",
+    "components": {"BenchLifetimeComponent": {"type": "BenchLifetimeComponent"}},
+}
+
+
+def churn_round(destroy: bool, wave: int = 1000) -> None:
+    entities = [Factory.create_entity(DATA) for _ in range(wave)]
+    if destroy:
+        for entity in entities:
+            Factory.destroy_entity(entity)
+
+
+def run(rounds: int) -> None:
+    print_row("round", "no destroy, KiB", "destroy, KiB", "weak, KiB")
+    usage = {}
+    for mode in ("keep", "destroy", "weak"):
+        Factory.set_weak_registry(mode == "weak")
+        gc.collect()
+        tracemalloc.start()
+        usage[mode] = []
+        for _ in range(rounds):
+            churn_round(destroy=mode == "destroy")
+            gc.collect()
+            usage[mode].append(tracemalloc.get_traced_memory()[0])
+
+        tracemalloc.stop()
+        for entity in list(Factory._entity_registry_by_uid.values()):
+            Factory.destroy_entity(entity)
+
+    Factory.set_weak_registry(False)
+    for i in range(rounds):
+        print_row(
+            i + 1,
+            usage["keep"][i] // 1024,
+            usage["destroy"][i] // 1024,
+            usage["weak"][i] // 1024,
+        )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
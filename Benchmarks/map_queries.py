@@ -0,0 +1,97 @@
+"""Микробенчмарк пространственных запросов MapEntity.
+
+Сравнивает перебор клеток квадрата (прежний get_entities_in_radius) с запросами
+по занятым клеткам чанков на разреженной, плотной карте и при большом радиусе,
+а также пачку запросов видимости для всех игроков против отдельных вызовов.
+
+Запуск: python Benchmarks/map_queries.py
+"""
+import random
+
+from _common import measure_time, print_row
+from _legacy import LegacyCoordinate, LegacyMapStorage
+
+from systems.map.coordinate import Coordinate
+from systems.map.map_entity import MapEntity
+
+CASES = [
+    # название, размер стороны карты, сущностей, радиус
+    ("sparse", 2000, 5_000, 15),
+    ("dense", 300, 60_000, 15),
+    ("large radius", 1000, 20_000, 250),
+]
+
+
+def run(name: str, side: int, count: int, radius: float, queries: int = 100) -> None:
+    rng = random.Random(side)
+    legacy = LegacyMapStorage()
+    chunked = MapEntity("bench")
+
+    for _ in range(count):
+        x, y = rng.randrange(side), rng.randrange(side)
+        entity = object()
+        legacy.add(x, y, entity)
+        chunked.entities.add(x, y, entity)
+
+    centers = [Coordinate(rng.randrange(side), rng.randrange(side)) for _ in range(queries)]
+    legacy_centers = [LegacyCoordinate(c.x, c.y) for c in centers]
+    corners = [Coordinate(c.x + int(radius), c.y + int(radius)) for c in centers]
+
+    for center, legacy_center in zip(centers[:10], legacy_centers):
+        assert set(legacy.get_entities_in_radius(legacy_center, radius)) == set(
+            chunked.get_entities_in_radius(center, radius)
+        )
+
+    repeat = 1 if radius > 100 else 3
+    timings = {
+        "legacy radius": measure_time(
+            lambda: [legacy.get_entities_in_radius(c, radius) for c in legacy_centers], repeat
+        ),
+        "radius": measure_time(
+            lambda: [chunked.get_entities_in_radius(c, radius) for c in centers], repeat
+        ),
+        "rect": measure_time(
+            lambda: [
+                chunked.get_entities_in_rect(c, corner)
+                for c, corner in zip(centers, corners)
+            ],
+            repeat,
+        ),
+        "nearest 10": measure_time(
+            lambda: [chunked.get_nearest_entities(c, 10) for c in centers], repeat
+        ),
+    }
+
+    print(f"\n{name}: {count} entities on {side}x{side}, radius {radius}")
+    for query, elapsed in timings.items():
+        print_row(query, f"{elapsed / queries * 1e6:.1f} us")
+
+
+def run_batch(players: int = 25, radius: float = 20, count: int = 60_000, side: int = 300) -> None:
+    rng = random.Random(players)
+    chunked = MapEntity("bench")
+    for _ in range(count):
+        chunked.entities.add(rng.randrange(side), rng.randrange(side), object())
+
+    # Игроки обычно держатся кучно, их области видимости перекрываются
+    hub_x, hub_y = side // 2, side // 2
+    queries = [
+        (Coordinate(hub_x + rng.randint(-30, 30), hub_y + rng.randint(-30, 30)), radius)
+        for _ in range(players)
+    ]
+
+    single = measure_time(
+        lambda: [chunked.get_entities_in_radius(c, r) for c, r in queries]
+    )
+    batch = measure_time(lambda: chunked.get_entities_in_radius_batch(queries))
+
+    print(f"\nvisibility tick: {players} players, radius {radius}, {count} entities")
+    print_row("per player", f"{single * 1e3:.2f} ms")
+    print_row("batch", f"{batch * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    for case in CASES:
+        run(*case)
+
+    run_batch()
@@ -0,0 +1,88 @@
+"""Сравнение бинарного снимка карты с отладочным dump()/restore() через JSON.
+
+Запуск: python Benchmarks/map_snapshot.py [кол-во сущностей ...]
+"""
+import io
+import json
+import random
+import sys
+from typing import Any, Dict
+
+from _common import measure_time, print_row
+
+from systems.ecs import BaseComponent, BaseEntity, register_component, register_entity
+from systems.map.coordinate import Coordinate
+from systems.map.map_entity import MapEntity
+from systems.map.map_snapshot import MapSnapshot
+
+
+@register_component
+class BenchHealthComponent(BaseComponent):
+    def __init__(self, health: int = 100, max_health: int = 100) -> None:
+        super().__init__()
+        self.health = health
+        self.max_health = max_health
+
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type, "health": self.health, "max_health": self.max_health}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchHealthComponent":
+        return cls(data["health"], data["max_health"])
+
+
+@register_entity
+class BenchItem(BaseEntity):
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "components": {
+                name: comp.dump() for name, comp in self._components.items()
+            },
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchItem":
+        entity = cls(id=data["id"])
+        cls._restore_components(entity, data)
+        return entity
+
+
+def build_map(count: int) -> MapEntity:
+    rng = random.Random(count)
+    side = int((count * 4) ** 0.5)
+    map_entity = MapEntity("bench")
+    for _ in range(count):
+        entity = BenchItem(rng.choice(["crate", "chair", "wall", "floor_lamp"]))
+        entity.add_component(BenchHealthComponent(rng.randint(1, 100)))
+        map_entity.add_entity(
+            Coordinate(rng.randrange(side) - side // 2, rng.randrange(side) - side // 2), entity
+        )
+
+    return map_entity
+
+
+def run(count: int) -> None:
+    map_entity = build_map(count)
+
+    json_data = json.dumps(map_entity.dump()).encode()
+    stream = io.BytesIO()
+    MapSnapshot.dump(map_entity, stream)
+    binary_data = stream.getvalue()
+
+    json_save = measure_time(lambda: json.dumps(map_entity.dump()).encode(), repeat=3)
+    json_load = measure_time(lambda: MapEntity.restore(json.loads(json_data)), repeat=3)
+    binary_save = measure_time(lambda: MapSnapshot.dump(map_entity, io.BytesIO()), repeat=3)
+    binary_load = measure_time(lambda: MapSnapshot.load(io.BytesIO(binary_data)), repeat=3)
+
+    print(f"\n{count} entities")
+    print_row("", "save, ms", "load, ms", "size, KiB")
+    print_row("json dump", f"{json_save * 1e3:.0f}", f"{json_load * 1e3:.0f}", f"{len(json_data) / 1024:.0f}")
+    print_row("snapshot", f"{binary_save * 1e3:.0f}", f"{binary_load * 1e3:.0f}", f"{len(binary_data) / 1024:.0f}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        run(size)
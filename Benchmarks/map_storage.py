@@ -0,0 +1,70 @@
+"""Сравнение чанкового хранилища MapEntity со старым словарем Coordinate -> list.
+
+Запуск: python Benchmarks/map_storage.py [кол-во сущностей ...]
+"""
+import random
+import sys
+
+from _common import measure_memory, measure_time, print_row
+from _legacy import LegacyCoordinate, LegacyMapStorage
+
+from systems.map.coordinate import Coordinate
+from systems.map.map_entity import MapEntity
+
+
+def fill_legacy(points):
+    storage = LegacyMapStorage()
+    for x, y in points:
+        storage.add(x, y, object())
+
+    return storage
+
+
+def fill_chunked(points):
+    map_entity = MapEntity("bench")
+    for x, y in points:
+        map_entity.entities.add(x, y, object())
+
+    return map_entity
+
+
+def run(count: int, radius: float = 10, queries: int = 200) -> None:
+    rng = random.Random(count)
+    side = int((count * 4) ** 0.5)
+    points = [(rng.randrange(side), rng.randrange(side)) for _ in range(count)]
+    centers = [Coordinate(rng.randrange(side), rng.randrange(side)) for _ in range(queries)]
+    legacy_centers = [LegacyCoordinate(c.x, c.y) for c in centers]
+
+    legacy, legacy_mem = measure_memory(lambda: fill_legacy(points))
+    chunked, chunked_mem = measure_memory(lambda: fill_chunked(points))
+
+    legacy_get = measure_time(lambda: [legacy.get_entities(c) for c in legacy_centers])
+    chunked_get = measure_time(lambda: [chunked.get_entities(c) for c in centers])
+
+    legacy_radius = measure_time(
+        lambda: [legacy.get_entities_in_radius(c, radius) for c in legacy_centers], repeat=3
+    )
+    chunked_radius = measure_time(
+        lambda: [chunked.get_entities_in_radius(c, radius) for c in centers], repeat=3
+    )
+
+    print(f"\n{count} entities on {side}x{side}, radius {radius}, {queries} queries")
+    print_row("", "memory, MiB", "get, us", "radius, us")
+    print_row(
+        "dict",
+        f"{legacy_mem / 2**20:.1f}",
+        f"{legacy_get / queries * 1e6:.2f}",
+        f"{legacy_radius / queries * 1e6:.1f}",
+    )
+    print_row(
+        "chunked",
+        f"{chunked_mem / 2**20:.1f}",
+        f"{chunked_get / queries * 1e6:.2f}",
+        f"{chunked_radius / queries * 1e6:.1f}",
+    )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for size in sizes:
+        run(size)
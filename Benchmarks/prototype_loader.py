@@ -0,0 +1,92 @@
+"""Холодная и теплая загрузка прототипов из YAML.
+
+Холодная - без кэша (отдельно с чистым Python SafeLoader и с CSafeLoader),
+теплая - с кэшем, когда ни один файл не изменился, и когда изменился один.
+
+Запуск: python Benchmarks/prototype_loader.py [кол-во файлов] [прототипов в файле]
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+from _common import measure_time, print_row
+
+from systems.ecs import prototype_loader
+from systems.ecs.prototype_loader import PrototypeLoader
+
+PROTOTYPE = """
+- type: BenchCreature
+  id: creature_{index}
+  name: Creature {index}
+  description: Generated prototype number {index} for the loader benchmark
+  components:
+    - type: HealthComponent
+      hp: {index}
+      regen: 5
+    - type: PositionComponent
+      x: 10
+      y: 20
+    - type: InventoryComponent
+      slots: [head, body, legs, hands]
+      items: {{}}
+"""
+
+
+def write_files(root: Path, files: int, per_file: int) -> None:
+    for i in range(files):
+        text = "".join(
+            PROTOTYPE.format(index=i * per_file + j) for j in range(per_file)
+        )
+        (root / f"proto_{i}.yml").write_text(text, encoding="utf-8")
+
+
+def cold_load(root: Path, cache: Path) -> None:
+    if cache.exists():
+        cache.unlink()
+
+    PrototypeLoader([root], cache).load()
+
+
+def run(files: int, per_file: int) -> None:
+    with tempfile.TemporaryDirectory() as temp:
+        root = Path(temp) / "Prototype"
+        root.mkdir()
+        cache = Path(temp) / "cache.msgpack"
+        write_files(root, files, per_file)
+
+        fast_loader = prototype_loader.YamlLoader
+        prototype_loader.YamlLoader = yaml.SafeLoader
+        pure_cold = measure_time(lambda: cold_load(root, cache), repeat=3)
+        prototype_loader.YamlLoader = fast_loader
+        cold = measure_time(lambda: cold_load(root, cache), repeat=3)
+
+        PrototypeLoader([root], cache).load()
+        warm = measure_time(lambda: PrototypeLoader([root], cache).load())
+
+        changed = root / "proto_0.yml"
+
+        def warm_one_changed() -> None:
+            stat = changed.stat()
+            os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            changed.write_text(changed.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+            PrototypeLoader([root], cache).load()
+
+        warm_changed = measure_time(warm_one_changed)
+
+    print_row(
+        f"{files}x{per_file}",
+        f"{pure_cold * 1000:.1f}",
+        f"{cold * 1000:.1f}",
+        f"{warm * 1000:.1f}",
+        f"{warm_changed * 1000:.1f}",
+    )
+
+
+if __name__ == "__main__":
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    print(f"libyaml: {prototype_loader.YamlLoader is not yaml.SafeLoader}")
+    print_row("files x protos", "cold py, ms", "cold C, ms", "warm, ms", "1 changed, ms")
+    run(files, per_file)
@@ -0,0 +1,163 @@
+"""Создание экземпляров прототипа: copy.deepcopy, скомпилированный шаблон и пул.
+
+Запуск: python Benchmarks/prototype_spawn.py [кол-во экземпляров ...]
+"""
+import sys
+from typing import Any, Dict, List, Optional
+
+from _common import measure_time, print_row
+
+from systems.ecs import (BaseComponent, BaseEntity, Factory,
+                         register_component, register_entity)
+
+
+@register_component
+class BenchStatsComponent(BaseComponent):
+    def __init__(self, health: int = 100, armor: int = 0, speed: float = 1.0) -> None:
+        super().__init__()
+        self.health = health
+        self.armor = armor
+        self.speed = speed
+
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type, "health": self.health, "armor": self.armor, "speed": self.speed}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchStatsComponent":
+        return cls(data.get("health", 100), data.get("armor", 0), data.get("speed", 1.0))
+
+    def reset(self, data: Dict[str, Any]) -> None:
+        self.health = data.get("health", 100)
+        self.armor = data.get("armor", 0)
+        self.speed = data.get("speed", 1.0)
+
+
+@register_component
+class BenchSpriteComponent(BaseComponent):
+    def __init__(self, sprite: str = "", state: str = "idle") -> None:
+        super().__init__()
+        self.sprite = sprite
+        self.state = state
+
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type, "sprite": self.sprite, "state": self.state}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchSpriteComponent":
+        return cls(data.get("sprite", ""), data.get("state", "idle"))
+
+    def reset(self, data: Dict[str, Any]) -> None:
+        self.sprite = data.get("sprite", "")
+        self.state = data.get("state", "idle")
+
+
+@register_component
+class BenchContainerComponent(BaseComponent):
+    def __init__(self, slots: Optional[List[str]] = None) -> None:
+        super().__init__()
+        self.slots: List[str] = slots if slots is not None else []
+
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type, "slots": self.slots}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchContainerComponent":
+        return cls(data.get("slots"))
+
+
+@register_entity
+class BenchItem(BaseEntity):
+    def __init__(self, id: str = "", name: str = "") -> None:
+        super().__init__(id)
+        self.name = name
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "name": self.name,
+            "components": {
+                name: comp.dump() for name, comp in self._components.items()
+            },
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "BenchItem":
+        entity = cls(id=data["id"], name=data.get("name", ""))
+        cls._restore_components(entity, data)
+        return entity
+
+    def reset(self, data: Dict[str, Any]) -> None:
+        self.set_id(data["id"])
+        self.name = data.get("name", "")
+        self._restore_components(self, data)
+
+
+PROTOTYPES = {
+    "crate": {
+        "BenchStatsComponent": {"type": "BenchStatsComponent", "health": 50},
+        "BenchSpriteComponent": {"type": "BenchSpriteComponent", "sprite": "crate.png"},
+    },
+    "backpack": {
+        "BenchStatsComponent": {"type": "BenchStatsComponent", "health": 10},
+        "BenchSpriteComponent": {"type": "BenchSpriteComponent", "sprite": "backpack.png"},
+        "BenchContainerComponent": {"type": "BenchContainerComponent", "slots": ["knife", "rope"]},
+    },
+}
+
+
+def run(count: int) -> None:
+    for proto_id, components in PROTOTYPES.items():
+        Factory.register_base_entity(
+            {"id": proto_id, "type": "BenchItem", "name": proto_id, "components": components}
+        )
+
+    print(f"\n{count} instances")
+    print_row("prototype", "deepcopy, ms", "copy, ms", "spawn_many, ms")
+    for proto_id in PROTOTYPES:
+        deep_time = measure_time(
+            lambda: [Factory.get_base_entity_deepcopy(proto_id) for _ in range(count)], repeat=3
+        )
+        copy_time = measure_time(
+            lambda: [Factory.get_base_entity_copy(proto_id) for _ in range(count)], repeat=3
+        )
+        many_time = measure_time(lambda: Factory.spawn_many(proto_id, count), repeat=3)
+        print_row(
+            proto_id,
+            f"{deep_time * 1e3:.1f}",
+            f"{copy_time * 1e3:.1f}",
+            f"{many_time * 1e3:.1f}",
+        )
+
+
+def churn(count: int, wave: int = 100) -> None:
+    # Снаряды: волнами создаются и сразу освобождаются
+    for _ in range(count // wave):
+        for entity in Factory.spawn_many("crate", wave):
+            Factory.destroy_entity(entity)
+
+
+def run_churn(count: int) -> None:
+    plain_time = measure_time(lambda: churn(count), repeat=3)
+
+    for cls in (BenchItem, BenchStatsComponent, BenchSpriteComponent):
+        Factory.enable_pool(cls)
+
+    pooled_time = measure_time(lambda: churn(count), repeat=3)
+    stats = Factory.pool_stats()["BenchItem"]
+
+    for cls in (BenchItem, BenchStatsComponent, BenchSpriteComponent):
+        Factory.disable_pool(cls)
+
+    print(f"\n{count} spawn + release of crate in waves of 100")
+    print_row("", "time, ms", "hit rate")
+    print_row("no pool", f"{plain_time * 1e3:.1f}", "-")
+    print_row("pool", f"{pooled_time * 1e3:.1f}", f"{stats['hit_rate']:.2f}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000]
+    for size in sizes:
+        run(size)
+
+    run_churn(sizes[-1])
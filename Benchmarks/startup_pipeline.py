@@ -0,0 +1,98 @@
+"""Загрузка контента при запуске: последовательно, в потоках и в процессах.
+
+Генерирует прототипы, директории DMS и файлы локализации во временной
+директории. Кэш прототипов не используется, чтобы мерить холодный запуск.
+
+Запуск: python Benchmarks/startup_pipeline.py [кол-во файлов каждого вида]
+"""
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from _common import measure_time, print_row
+
+from systems.ecs import PrototypeLoader
+from systems.localization import load_locales
+from systems.startup import (StartupPipeline, add_localization_phase,
+                             add_prototype_phase, add_texture_phase)
+from systems.texture_validator import DMSValidator
+
+PROTOTYPE = """
+- type: BenchCreature
+  id: creature_{index}
+  name: Creature {index}
+  components:
+    - type: HealthComponent
+      hp: {index}
+      regen: 5
+    - type: InventoryComponent
+      slots: [head, body, legs, hands]
+"""
+
+INFO_YML = """
+Author: "bench"
+License: "NONE"
+Sprites:
+{sprites}
+"""
+
+SPRITE = """  - name: "sprite_{index}"
+    size: {{x: 32, y: 32}}
+    is_mask: false
+    frames: 1
+"""
+
+
+def generate(root: Path, files: int) -> None:
+    (root / "Prototype").mkdir()
+    for i in range(files):
+        text = "".join(PROTOTYPE.format(index=i * 40 + j) for j in range(40))
+        (root / "Prototype" / f"proto_{i}.yml").write_text(text, encoding="utf-8")
+
+        dms = root / "Sprites" / f"pack_{i}.dms"
+        dms.mkdir(parents=True)
+        (dms / "info.yml").write_text(
+            INFO_YML.format(sprites="".join(SPRITE.format(index=j) for j in range(20))),
+            encoding="utf-8",
+        )
+        for j in range(20):
+            (dms / f"sprite_{j}.png").touch()
+
+        loc = root / "loc" / "rus" / f"strings_{i}.loc"
+        loc.parent.mkdir(parents=True, exist_ok=True)
+        loc.write_text(
+            "\n".join(f"text-{i}_{j} = Строка {j}" for j in range(200)), encoding="utf-8"
+        )
+
+
+def serial(root: Path) -> None:
+    PrototypeLoader([root / "Prototype"]).load()
+    for dms in DMSValidator.list_dms(root / "Sprites", recursive=True):
+        DMSValidator.validate_dms(root / "Sprites", dms)
+
+    load_locales(root / "loc")
+
+
+def pipelined(root: Path, executor_class: type) -> None:
+    pipeline = StartupPipeline()
+    add_prototype_phase(pipeline, PrototypeLoader([root / "Prototype"]))
+    add_texture_phase(pipeline, root / "Sprites")
+    add_localization_phase(pipeline, root / "loc")
+    with executor_class() as executor:
+        pipeline.run(executor)
+
+
+if __name__ == "__main__":
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    with tempfile.TemporaryDirectory() as temp:
+        root = Path(temp)
+        generate(root, files)
+
+        print_row("files", "serial, ms", "threads, ms", "processes, ms")
+        print_row(
+            files,
+            f"{measure_time(lambda: serial(root), repeat=3) * 1000:.1f}",
+            f"{measure_time(lambda: pipelined(root, ThreadPoolExecutor), repeat=3) * 1000:.1f}",
+            f"{measure_time(lambda: pipelined(root, ProcessPoolExecutor), repeat=3) * 1000:.1f}",
+        )
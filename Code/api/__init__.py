@@ -1,5 +1,6 @@
+from .access import access_cache
 from .chat import ChatServerModule
 from .download import DownloadServerModule
 from .user import UserServerModule
 
-__all__ = ["DownloadServerModule", "UserServerModule", "ChatServerModule"]
+__all__ = ["DownloadServerModule", "UserServerModule", "ChatServerModule", "access_cache"]
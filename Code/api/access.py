@@ -0,0 +1,23 @@
+from typing import Dict
+
+from DMBotNetwork import Server, ServerDB
+from systems.access import AccessCache
+
+# Права пользователей читаются из кэша; все изменения прав и пользователей
+# идут через функции ниже, чтобы кэш не расходился с базой
+access_cache = AccessCache(ServerDB.get_access, ServerDB.get_base_access, ServerDB.check_access)
+
+
+async def change_user_access(login: str, access: Dict[str, bool]) -> None:
+    await ServerDB.change_user_access(login, access)
+    access_cache.store(login, access)
+
+
+async def add_user(login: str, password: str) -> None:
+    await ServerDB.add_user(login, password)
+    access_cache.invalidate(login)
+
+
+async def remove_user(login: str) -> None:
+    await Server.remove_user(login)
+    access_cache.invalidate(login)
@@ -1,31 +1,54 @@
+import logging
 from typing import Dict, Optional
 
-from DMBotNetwork import ClUnit, Server, ServerDB
+from DMBotNetwork import ClUnit, Server
+from systems.chat import RecipientCache
+
+from .access import access_cache
+from .download import DownloadServerModule
+
+
+async def _resolve_recipients(channel: str) -> Optional[Dict[str, ClUnit]]:
+    if channel == "admin":
+        return await Server.get_connects_with_access("access_admin_chat")
+
+    return None
 
 
 class ChatServerModule:
+    # Получатели admin-канала кэшируются. DMBotNetwork не сообщает о
+    # подключениях, поэтому кэш живет не дольше секунды, а при изменении
+    # прав в access_cache сбрасывается через invalidate_recipients
+    # (слушатель подключается в main.init_all)
+    _recipients = RecipientCache(_resolve_recipients, ttl=1.0)
+
+    @staticmethod
+    def invalidate_recipients(_login: Optional[str] = None) -> None:
+        # Список admin-канала зависит от прав любого пользователя, поэтому
+        # сбрасывается целиком, какой бы логин ни изменился
+        ChatServerModule._recipients.invalidate()
+
     @staticmethod
     async def net_send_message(
         cl_unit: ClUnit, message: str, message_type: str
     ) -> None:
-        cl_to_send: Optional[Dict[str, ClUnit]] = None
-
         if message_type != "admin" and message_type != "ooc":
             return
 
         if message_type == "admin":
-            if not await ServerDB.check_access_login(
-                cl_unit.login, ["access_admin_chat"]
-            ):
+            if not await access_cache.check(cl_unit.login, ["access_admin_chat"]):
                 return
 
-            cl_to_send = await Server.get_connects_with_access("access_admin_chat")
+        try:
+            async with DownloadServerModule.interactive():
+                await Server.broadcast(
+                    "req_net_func",
+                    await ChatServerModule._recipients.get(message_type),
+                    "get_chat_message",
+                    message=message,
+                    message_type=message_type,
+                    sender=cl_unit.login,
+                )
 
-        await Server.broadcast(
-            "req_net_func",
-            cl_to_send,
-            "get_chat_message",
-            message=message,
-            message_type=message_type,
-            sender=cl_unit.login,
-        )
+        except Exception as err:
+            logging.error(f"Failed to send chat message to '{message_type}': {err}")
@@ -1,92 +1,270 @@
-import hashlib
+import threading
 import zipfile
 from pathlib import Path
+from typing import Any, AsyncContextManager, Dict, Optional, Union
 
-from DMBotNetwork import ClUnit
+from DMBotNetwork import ClUnit, require_access
 from root_path import ROOT_PATH
+from systems.content import (BlobStore, ChunkedTransfers, ContentManifest,
+                             DeltaArchiveCache, DownloadScheduler,
+                             ManifestSnapshot, SingleFlight, delta_key,
+                             validate_client_files)
+from systems.content.chunked_transfer import CHUNK_SIZE, MAX_RANGE_SIZE
 
 
 class DownloadServerModule:
+    # Как часто манифест сверяется с диском при запросах, в секундах
+    MANIFEST_REFRESH_INTERVAL: float = 5.0
+    # Блобы старых версий файлов удаляются не раньше, чем через столько секунд
+    BLOB_MIN_AGE: float = 600.0
+
+    _manifest: Optional[ContentManifest] = None
+    _manifest_lock = threading.Lock()
+    _delta_cache: Optional[DeltaArchiveCache] = None
+    _blob_store = BlobStore(Path(ROOT_PATH) / "data" / "content_blobs")
+    _transfers = ChunkedTransfers()
+    # Отправка контента делит общий лимит скорости, интерактивные методы
+    # идут через interactive() и имеют приоритет. Настраивается через
+    # configure_scheduler
+    _scheduler = DownloadScheduler(16 * 1024 * 1024, max_active=4)
+    # Работа с диском идет в пуле потоков, одновременные одинаковые запросы
+    # клиентов ждут один общий вызов
+    _flight = SingleFlight()
+
+    @staticmethod
+    def configure_scheduler(bandwidth: float, max_transfers: int) -> None:
+        """Задает общий лимит скорости отдачи контента (байт/с, 0 - без
+        лимита) и максимум одновременных передач."""
+        DownloadServerModule._scheduler = DownloadScheduler(bandwidth, max_active=max_transfers)
+
+    @staticmethod
+    def interactive() -> AsyncContextManager[None]:
+        """Помечает интерактивную работу: пока она идет, отправка контента
+        уступает ей канал. Используется и другими модулями, например чатом."""
+        return DownloadServerModule._scheduler.interactive()
+
+    @require_access("change_server_settings")
+    @staticmethod
+    async def net_get_download_metrics(cl_unit: ClUnit):
+        """Возвращает SchedulerMetrics: активные и ожидающие передачи, число
+        клиентов, отправлено байт и передач, скорость за последние секунды."""
+        return DownloadServerModule._scheduler.metrics()._asdict()
+
     @staticmethod
     async def net_get_server_content_hash(cl_unit: ClUnit):
         try:
-            zip_path = DownloadServerModule._create_zip_archive()
-            return DownloadServerModule._calculate_file_hash(zip_path)
-        
+            async with DownloadServerModule.interactive():
+                snapshot = await DownloadServerModule._flight.run(
+                    "manifest", DownloadServerModule._get_manifest
+                )
+                return snapshot.root_hash
+
         except Exception as err:
             return str(err)
 
     @staticmethod
     async def net_download_server_content(cl_unit: ClUnit):
         try:
-            zip_path = DownloadServerModule._create_zip_archive()
-            await cl_unit.send_file(zip_path, "server_content.zip")
+            zip_path = await DownloadServerModule._flight.run(
+                "archive", DownloadServerModule._create_zip_archive
+            )
+            # send_file не разбивается на части, поэтому байты списываются
+            # параллельно с отправкой, а слот держится до конца списания
+            async with DownloadServerModule._scheduler.transfer(cl_unit.login) as transfer:
+                await transfer.send(
+                    cl_unit.send_file(zip_path, "server_content.zip"), zip_path.stat().st_size
+                )
+
             return "done"
 
         except Exception as err:
             return str(err)
 
     @staticmethod
-    def _get_latest_modification_time(directory_path: Path) -> float:
-        """Получает время последней модификации файлов в директории.
+    async def net_download_content_delta(cl_unit: ClUnit, client_files: Dict[str, str]):
+        """Отправляет клиенту только новые и измененные файлы контента.
 
         Args:
-            directory_path (Path): Путь к директории.
+            client_files (Dict[str, str]): Путь (относительно Content, через
+                "/") -> sha256 файлов, которые уже есть у клиента.
 
         Returns:
-            float: Время последней модификации в формате timestamp.
+            str: "up_to_date", если отправлять нечего, "done" после отправки
+            server_content_delta.zip или текст ошибки. Список удаленных
+            файлов и корневой хэш лежат в архиве в _delta.json.
         """
-        latest_time = 0
-        for file_path in directory_path.rglob("*"):
-            if file_path.is_file():
-                file_time = file_path.stat().st_mtime
-                if file_time > latest_time:
-                    latest_time = file_time
+        try:
+            client_files = validate_client_files(client_files)
+            archive_path = await DownloadServerModule._flight.run(
+                ("delta", delta_key(client_files, "")),
+                DownloadServerModule._build_delta_archive,
+                client_files,
+            )
+            if archive_path is None:
+                return "up_to_date"
 
-        return latest_time
+            async with DownloadServerModule._scheduler.transfer(cl_unit.login) as transfer:
+                await transfer.send(
+                    cl_unit.send_file(archive_path, "server_content_delta.zip"),
+                    archive_path.stat().st_size,
+                )
+
+            return "done"
+
+        except Exception as err:
+            return str(err)
 
     @staticmethod
-    def _create_zip_archive() -> Path:
-        """Создает ZIP-архив из папки 'Content' и возвращает путь к архиву.
-        Проверяет время последней модификации файлов перед пересозданием.
+    async def net_get_content_transfer(
+        cl_unit: ClUnit, client_files: Optional[Dict[str, str]] = None
+    ) -> Union[Dict[str, Any], str]:
+        """Начинает передачу архива контента блоками с возможностью докачки.
+
+        Args:
+            client_files (Optional[Dict[str, str]]): Если задано - передается
+                архив дельты относительно этих файлов (как в
+                net_download_content_delta), иначе полный архив.
 
         Returns:
-            Path: Путь к созданному ZIP-архиву.
+            Union[Dict[str, Any], str]: TransferInfo.to_dict() - id, size,
+            chunk_size и sha256 каждого блока, "up_to_date", если передавать
+            нечего, или текст ошибки. Блоки запрашиваются через
+            net_get_content_chunk или net_get_content_range; после обрыва
+            клиент продолжает с первого непроверенного блока.
         """
-        folder_path = Path(ROOT_PATH) / "Content"
-        archive_path = Path(ROOT_PATH) / "data" / "content.zip"
+        try:
+            if client_files is None:
+                archive_path = await DownloadServerModule._flight.run(
+                    "archive", DownloadServerModule._create_zip_archive
+                )
 
-        if archive_path.exists():
-            if (
-                archive_path.stat().st_mtime
-                >= DownloadServerModule._get_latest_modification_time(folder_path)
+            else:
+                client_files = validate_client_files(client_files)
+                archive_path = await DownloadServerModule._flight.run(
+                    ("delta", delta_key(client_files, "")),
+                    DownloadServerModule._build_delta_archive,
+                    client_files,
+                )
+                if archive_path is None:
+                    return "up_to_date"
+
+            info = await DownloadServerModule._flight.run(
+                ("transfer", str(archive_path)),
+                DownloadServerModule._transfers.register,
+                archive_path,
+            )
+            return info.to_dict()
+
+        except Exception as err:
+            return str(err)
+
+    @staticmethod
+    async def net_get_content_chunk(cl_unit: ClUnit, transfer_id: str, index: int) -> Union[bytes, str]:
+        """Возвращает блок index передачи или текст ошибки. Если архив с
+        начала передачи изменился, передачу нужно запросить заново."""
+        try:
+            async with DownloadServerModule._scheduler.transfer(cl_unit.login, CHUNK_SIZE):
+                return await DownloadServerModule._flight.run(
+                    ("chunk", transfer_id, index),
+                    DownloadServerModule._transfers.read_chunk,
+                    transfer_id,
+                    index,
+                )
+
+        except Exception as err:
+            return str(err)
+
+    @staticmethod
+    async def net_get_content_range(
+        cl_unit: ClUnit, transfer_id: str, offset: int, length: int
+    ) -> Union[bytes, str]:
+        """Возвращает до length байт передачи с offset (не больше
+        MAX_RANGE_SIZE за запрос) или текст ошибки."""
+        try:
+            async with DownloadServerModule._scheduler.transfer(
+                cl_unit.login, max(0, min(length, MAX_RANGE_SIZE))
             ):
-                return archive_path
+                return await DownloadServerModule._flight.run(
+                    ("range", transfer_id, offset, length),
+                    DownloadServerModule._transfers.read_range,
+                    transfer_id,
+                    offset,
+                    length,
+                )
 
-            else:
-                archive_path.unlink()
+        except Exception as err:
+            return str(err)
 
-        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in folder_path.rglob("*"):
-                if file_path.is_file():
-                    zipf.write(file_path, file_path.relative_to(folder_path))
+    @staticmethod
+    def _get_manifest() -> ManifestSnapshot:
+        """Сверяет манифест папки 'Content' с диском, если с прошлой сверки
+        прошло MANIFEST_REFRESH_INTERVAL секунд, и возвращает его снимок.
+        Вызывается из пула потоков.
 
-        return archive_path
+        Returns:
+            ManifestSnapshot: Снимок манифеста контента.
+        """
+        with DownloadServerModule._manifest_lock:
+            manifest = DownloadServerModule._manifest
+            if manifest is None:
+                manifest = ContentManifest(
+                    Path(ROOT_PATH) / "Content",
+                    Path(ROOT_PATH) / "data" / "content_manifest.msgpack",
+                )
+                DownloadServerModule._manifest = manifest
+
+            manifest.refresh_if_stale(DownloadServerModule.MANIFEST_REFRESH_INTERVAL)
+            return manifest.snapshot()
 
     @staticmethod
-    def _calculate_file_hash(file_path: Path, hash_algo="sha256") -> str:
-        """Вычисляет хеш для переданного файла.
+    def _build_delta_archive(client_files: Dict[str, str]) -> Optional[Path]:
+        if DownloadServerModule._delta_cache is None:
+            DownloadServerModule._delta_cache = DeltaArchiveCache(
+                Path(ROOT_PATH) / "data" / "content_delta",
+                blob_store=DownloadServerModule._blob_store,
+            )
 
-        Args:
-            file_path (Path): Путь к файлу.
-            hash_algo (str): Алгоритм хеширования (по умолчанию 'sha256').
+        _, archive_path = DownloadServerModule._delta_cache.get_or_build(
+            DownloadServerModule._get_manifest(), client_files
+        )
+        return archive_path
+
+    @staticmethod
+    def _create_zip_archive() -> Path:
+        """Создает ZIP-архив из папки 'Content' и возвращает путь к архиву.
+        Архив пересоздается, только если корневой хэш манифеста отличается от
+        записанного в комментарий архива. Архив собирается из блобов
+        BlobStore: сжимаются только новые и измененные файлы. Новый архив
+        пишется во временный файл и подменяет старый, поэтому уже начатая
+        отправка старого архива не ломается. Вызывается из пула потоков.
 
         Returns:
-            str: Хеш файла в виде шестнадцатеричной строки.
+            Path: Путь к созданному ZIP-архиву.
         """
-        hash_function = hashlib.new(hash_algo)
-        with file_path.open("rb") as f:
-            while chunk := f.read(8192):
-                hash_function.update(chunk)
+        snapshot = DownloadServerModule._get_manifest()
+        root_hash = snapshot.root_hash.encode()
+        archive_path = Path(ROOT_PATH) / "data" / "content.zip"
 
-        return hash_function.hexdigest()
+        if archive_path.exists():
+            try:
+                with zipfile.ZipFile(archive_path) as zipf:
+                    if zipf.comment == root_hash:
+                        return archive_path
+
+            except zipfile.BadZipFile:
+                pass
+
+        blob_store = DownloadServerModule._blob_store
+        blob_store.write_archive(
+            archive_path,
+            [
+                (rel_path, snapshot.root / rel_path, snapshot.files[rel_path].hash)
+                for rel_path in sorted(snapshot.files)
+            ],
+            comment=root_hash,
+        )
+        blob_store.collect(
+            (entry.hash for entry in snapshot.files.values()),
+            DownloadServerModule.BLOB_MIN_AGE,
+        )
+        return archive_path
@@ -1,17 +1,12 @@
 from DMBotNetwork import ClUnit, Server, ServerDB, require_access
 
+from .access import access_cache, add_user, change_user_access, remove_user
+
 
 class UserServerModule:
     @staticmethod
     async def net_get_access(cl_unit: ClUnit, login: str):
-        access = await ServerDB.get_access(login)
-        base_access = ServerDB.get_base_access()
-        
-        for key, value in base_access.items():
-            if key not in access: # type: ignore
-                access[key] = value # type: ignore
-        
-        return access
+        return await access_cache.get_merged_access(login)
 
     @staticmethod
     async def net_get_all_users(cl_unit: ClUnit):
@@ -20,8 +15,8 @@ class UserServerModule:
     @require_access("change_access")
     @staticmethod
     async def net_change_access(cl_unit: ClUnit, login: str, changes: dict):
-        cur_target_access = await ServerDB.get_access(login)
-        cl_unit_access = await ServerDB.get_access(cl_unit.login)
+        cur_target_access = await access_cache.get_access(login)
+        cl_unit_access = await access_cache.get_access(cl_unit.login)
 
         if cur_target_access is None or cl_unit_access is None:
             return
@@ -29,7 +24,7 @@ class UserServerModule:
         need_access = [k for k in changes.keys()]
         if ServerDB.check_access(cl_unit_access, need_access):
             cur_target_access.update(changes)
-            await ServerDB.change_user_access(login, cur_target_access)
+            await change_user_access(login, cur_target_access)
             return "Sucess"
 
         return "Insufficient access"
@@ -43,6 +38,11 @@ class UserServerModule:
             "allow_registration": Server.get_allow_registration(),
         }
 
+    @require_access("change_server_settings")
+    @staticmethod
+    async def net_get_access_cache_stats(cl_unit: ClUnit):
+        return dict(access_cache.stats)
+
     @require_access("change_server_settings")
     @staticmethod
     async def net_change_server_settings(
@@ -80,14 +80,14 @@ class UserServerModule:
         if login == "owner":
             return "Insufficient access"
 
-        await Server.remove_user(login)
+        await remove_user(login)
         return "Sucess"
 
     @require_access("create_users")
     @staticmethod
     async def net_create_user(cl_unit: ClUnit, login: str, password: str):
         try:
-            await ServerDB.add_user(login, password)
+            await add_user(login, password)
 
         except Exception as err:
             return str(err)
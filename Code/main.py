@@ -5,14 +5,18 @@ import os
 import platform
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-from api import ChatServerModule, DownloadServerModule, UserServerModule
+from api import (ChatServerModule, DownloadServerModule, UserServerModule,
+                 access_cache)
 from DMBotNetwork import Server
 from dotenv import load_dotenv
 from root_path import ROOT_PATH
 from systems.auto_updater import AutoUpdater
+from systems.ecs import Factory, PrototypeLoader
 from systems.file_work import MainAppSettings
+from systems.startup import StartupError, StartupPipeline, add_prototype_phase
 
 load_dotenv()
 
@@ -50,17 +54,68 @@ def init_all() -> None:
                 "allow_registration": True,
                 "server_name": "dev",
                 "max_players": 25,
-            }
+            },
+            "download": {
+                "bandwidth": 16 * 1024 * 1024,
+                "max_transfers": 4,
+            },
         }
     )
     logging.info("Done")
 
+    logging.info("Loading content...")
+    loader = PrototypeLoader(
+        [ROOT_PATH / "Prototype"], ROOT_PATH / "data" / "prototype_cache.msgpack"
+    )
+    # Текстуры и локализация сервером не используются, поэтому их проверка
+    # (add_texture_phase, add_localization_phase) в запуск не входит
+    pipeline = StartupPipeline()
+    add_prototype_phase(pipeline, loader)
+
+    # Разбор YAML держит GIL, поэтому параллельность дают только процессы.
+    # На одном ядре или при одной задаче пул процессов лишь добавляет
+    # накладные расходы, а процессов больше, чем задач, не нужно
+    workers = min(os.cpu_count() or 1, pipeline.job_count)
+    try:
+        with (ProcessPoolExecutor(workers) if workers > 1 else ThreadPoolExecutor(1)) as executor:
+            report = pipeline.run(executor)
+
+    except StartupError as err:
+        for line in err.report.format():
+            logging.info(line)
+
+        for error in err.errors:
+            logging.error(error)
+
+        raise
+
+    for line in report.format():
+        logging.info(line)
+
+    # Ошибки необязательных фаз не мешают запуску сервера
+    for warning in report.warnings:
+        logging.warning(warning)
+
+    for prototype in report.results["prototypes"]:
+        Factory.register_base_entity(prototype)
+
+    logging.info(
+        f"Done: {len(report.results['prototypes'])} prototypes "
+        f"({loader.stats['parsed']} files parsed, {loader.stats['cached']} from cache)"
+    )
+
     logging.info("Initialize Server modules...")
     Server()
 
+    DownloadServerModule.configure_scheduler(
+        main_settings.get_s("download.bandwidth"),
+        main_settings.get_s("download.max_transfers"),
+    )
+
     Server.register_methods_from_class(
         [DownloadServerModule, UserServerModule, ChatServerModule]
     )
+    access_cache.add_listener(ChatServerModule.invalidate_recipients)
     logging.info("Done")
 
 
@@ -0,0 +1 @@
+from .access_cache import AccessCache, check_all_flags
@@ -0,0 +1,120 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+Access = Dict[str, bool]
+LoadAccess = Callable[[str], Awaitable[Optional[Access]]]
+CheckAccess = Callable[[Access, List[str]], bool]
+AccessListener = Callable[[Optional[str]], None]
+
+
+def check_all_flags(access: Access, need_access: List[str]) -> bool:
+    return all(access.get(flag, False) for flag in need_access)
+
+
+class AccessCache:
+    """Кэш прав пользователей перед базой данных.
+
+    Права пользователя загружаются через load один раз и хранятся вместе с
+    заранее объединенным с base_access словарем, так что проверки прав и
+    выдача прав клиенту обходятся без запросов к базе. Запись идет через
+    базу, после нее вызывается store (новые права сразу попадают в кэш) или
+    invalidate (пользователь создан или удален). Слушатели из add_listener
+    получают логин (None - сброс всех) при каждом изменении.
+
+    Args:
+        load (LoadAccess): Корутина логин -> права из базы или None.
+        base_access (Callable[[], Access]): Права по умолчанию.
+        check (CheckAccess): Проверка прав, например ServerDB.check_access.
+            По умолчанию все флаги должны быть True.
+    """
+    __slots__ = ["_load", "_base_access", "_check", "_raw", "_merged", "_generation", "_listeners", "stats"]
+
+    def __init__(
+        self,
+        load: LoadAccess,
+        base_access: Callable[[], Access],
+        check: CheckAccess = check_all_flags,
+    ) -> None:
+        self._load = load
+        self._base_access = base_access
+        self._check = check
+        self._raw: Dict[str, Optional[Access]] = {}
+        self._merged: Dict[str, Optional[Access]] = {}
+        self._generation = 0
+        self._listeners: List[AccessListener] = []
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    def add_listener(self, listener: AccessListener) -> None:
+        """Подписывает listener на изменения. Повторная подписка того же
+        слушателя ничего не делает."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    async def get_access(self, login: str) -> Optional[Access]:
+        """Права пользователя как в базе (копия, ее можно менять)."""
+        access, _ = await self._entry(login)
+        return dict(access) if access is not None else None
+
+    async def get_merged_access(self, login: str) -> Optional[Access]:
+        """Права пользователя, дополненные правами по умолчанию (копия)."""
+        _, merged = await self._entry(login)
+        return dict(merged) if merged is not None else None
+
+    async def check(self, login: str, need_access: List[str]) -> bool:
+        """Есть ли у пользователя все права need_access с учетом прав по
+        умолчанию, как в ServerDB.check_access_login. Неизвестный
+        пользователь прав не имеет."""
+        _, merged = await self._entry(login)
+        return merged is not None and self._check(merged, need_access)
+
+    def store(self, login: str, access: Optional[Access]) -> None:
+        """Запоминает права, только что записанные в базу."""
+        self._generation += 1
+        self._put(login, dict(access) if access is not None else None)
+        self._notify(login)
+
+    def invalidate(self, login: Optional[str] = None) -> None:
+        """Сбрасывает права пользователя или, без аргумента, всех."""
+        self._generation += 1
+        if login is None:
+            self._raw.clear()
+            self._merged.clear()
+
+        else:
+            self._raw.pop(login, None)
+            self._merged.pop(login, None)
+
+        self._notify(login)
+
+    async def _entry(self, login: str) -> Tuple[Optional[Access], Optional[Access]]:
+        if login in self._raw:
+            self.stats["hits"] += 1
+            return self._raw[login], self._merged[login]
+
+        self.stats["misses"] += 1
+        generation = self._generation
+        access = await self._load(login)
+        access = dict(access) if access is not None else None
+        # Неизвестные логины не кэшируются: их присылают клиенты, и кэш
+        # рос бы без ограничений. Если права изменились, пока шла загрузка,
+        # загруженное могло устареть: отдаем его этому вызову, но не кэшируем
+        if access is None or generation != self._generation:
+            return access, self._merge(access)
+
+        self._put(login, access)
+        return self._raw[login], self._merged[login]
+
+    def _put(self, login: str, access: Optional[Access]) -> None:
+        self._raw[login] = access
+        self._merged[login] = self._merge(access)
+
+    def _merge(self, access: Optional[Access]) -> Optional[Access]:
+        if access is None:
+            return None
+
+        merged = dict(self._base_access())
+        merged.update(access)
+        return merged
+
+    def _notify(self, login: Optional[str]) -> None:
+        for listener in self._listeners:
+            listener(login)
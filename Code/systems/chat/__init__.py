@@ -0,0 +1 @@
+from .recipient_cache import RecipientCache
@@ -0,0 +1,52 @@
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Получатели канала: логин -> подключение. None - все подключенные клиенты
+Recipients = Optional[Dict[str, Any]]
+ResolveRecipients = Callable[[str], Awaitable[Recipients]]
+
+
+class RecipientCache:
+    """Кэш списков получателей по каналам чата.
+
+    Список канала запрашивается через resolve один раз и живет до
+    invalidate() или ttl секунд. ttl ограничивает устаревание, когда об
+    изменении (например, о подключении клиента) некому сообщить.
+    Если invalidate() вызван, пока resolve еще выполняется, результат
+    этого resolve не кэшируется.
+
+    Args:
+        resolve (ResolveRecipients): Корутина канал -> получатели.
+        ttl (float): Время жизни списка в секундах. По умолчанию 1.
+    """
+    __slots__ = ["_resolve", "_ttl", "_entries", "_generation", "stats"]
+
+    def __init__(self, resolve: ResolveRecipients, ttl: float = 1.0) -> None:
+        self._resolve = resolve
+        self._ttl = ttl
+        self._entries: Dict[str, Tuple[float, Recipients]] = {}
+        self._generation = 0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    async def get(self, channel: str) -> Recipients:
+        entry = self._entries.get(channel)
+        if entry is not None and entry[0] > time.monotonic():
+            self.stats["hits"] += 1
+            return entry[1]
+
+        self.stats["misses"] += 1
+        generation = self._generation
+        recipients = await self._resolve(channel)
+        if generation == self._generation:
+            self._entries[channel] = (time.monotonic() + self._ttl, recipients)
+
+        return recipients
+
+    def invalidate(self, channel: Optional[str] = None) -> None:
+        """Сбрасывает список канала или, без аргумента, всех каналов."""
+        self._generation += 1
+        if channel is None:
+            self._entries.clear()
+
+        else:
+            self._entries.pop(channel, None)
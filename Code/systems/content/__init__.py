@@ -0,0 +1,10 @@
+from .blob_store import BlobInfo, BlobStore
+from .chunked_transfer import (CHUNK_SIZE, ChunkedDownload, ChunkedTransfers,
+                               TransferInfo, build_transfer_info)
+from .content_delta import (DELTA_INFO_NAME, ContentDelta, DeltaArchiveCache,
+                            apply_delta_archive, build_delta_archive,
+                            delta_key, diff_manifest, validate_client_files)
+from .content_manifest import (ContentManifest, FileEntry, ManifestSnapshot,
+                               hash_file)
+from .download_scheduler import DownloadScheduler, SchedulerMetrics, Transfer
+from .single_flight import SingleFlight
@@ -0,0 +1,237 @@
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import (BinaryIO, Dict, Iterable, NamedTuple, Optional, Tuple,
+                    Union)
+
+BLOB_MAGIC = b"DMB1"
+# Заголовок блоба: magic, метод сжатия zip, crc32, исходный размер
+_BLOB_HEADER = struct.Struct("<4sBIQ")
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# Форматы, которые уже сжаты: deflate их почти не уменьшает
+PRECOMPRESSED_SUFFIXES = frozenset(
+    [".png", ".jpg", ".jpeg", ".gif", ".webp", ".ogg", ".mp3", ".zip", ".gz", ".xz"]
+)
+# Сжатый блоб хранится, только если он меньше исходного хотя бы на 5%
+MIN_DEFLATE_RATIO = 0.95
+
+_DOS_TIME, _DOS_DATE = 0, (1 << 5) | 1  # 1980-01-01 00:00, для одинаковых архивов
+_ZIP_FLAGS = 0x0800  # имена в UTF-8
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_ZIP_LIMIT = 0xFFFFFFFF
+
+
+class BlobInfo(NamedTuple):
+    method: int
+    crc: int
+    size: int
+    compressed_size: int
+
+
+def _compress(data: bytes, suffix: str) -> Tuple[int, bytes]:
+    if suffix.lower() not in PRECOMPRESSED_SUFFIXES and data:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        if len(compressed) < len(data) * MIN_DEFLATE_RATIO:
+            return ZIP_DEFLATED, compressed
+
+    return ZIP_STORED, data
+
+
+class BlobStore:
+    """Хранилище сжатых файлов контента по sha256 их содержимого.
+
+    Каждый файл сжимается один раз, как запись zip (deflate без заголовка
+    или без сжатия для уже сжатых форматов), и переиспользуется всеми
+    последующими архивами. write_archive собирает zip из готовых блобов
+    без повторного сжатия, поэтому время сборки зависит от числа новых
+    файлов, а не от объема всего контента.
+
+    Args:
+        directory (Union[str, Path]): Директория блобов, например data/content_blobs.
+    """
+    __slots__ = ["_directory", "stats"]
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self._directory = Path(directory)
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    def path(self, digest: str) -> Path:
+        return self._directory / digest[:2] / f"{digest}.blob"
+
+    def get(self, digest: str) -> Optional[BlobInfo]:
+        try:
+            with self.path(digest).open("rb") as file:
+                header = file.read(_BLOB_HEADER.size)
+                compressed_size = os.fstat(file.fileno()).st_size - _BLOB_HEADER.size
+
+        except FileNotFoundError:
+            return None
+
+        if len(header) != _BLOB_HEADER.size:
+            return None
+
+        magic, method, crc, size = _BLOB_HEADER.unpack(header)
+        if magic != BLOB_MAGIC:
+            return None
+
+        return BlobInfo(method, crc, size, compressed_size)
+
+    def put_file(self, source: Union[str, Path], digest: str) -> BlobInfo:
+        """Сохраняет файл в хранилище, если блоба с этим хэшем еще нет.
+
+        Raises:
+            ValueError: Если содержимое файла не совпадает с digest (файл
+                изменился после хеширования).
+
+        Returns:
+            BlobInfo: Метаданные блоба.
+        """
+        info = self.get(digest)
+        if info is not None:
+            self.stats["hits"] += 1
+            return info
+
+        source = Path(source)
+        data = source.read_bytes()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"File {source} does not match hash {digest}")
+
+        self.stats["misses"] += 1
+        return self._write_blob(digest, data, source.suffix)
+
+    def put_bytes(self, data: bytes, suffix: str = "") -> Tuple[str, BlobInfo]:
+        digest = hashlib.sha256(data).hexdigest()
+        info = self.get(digest)
+        if info is not None:
+            self.stats["hits"] += 1
+            return digest, info
+
+        self.stats["misses"] += 1
+        return digest, self._write_blob(digest, data, suffix)
+
+    def collect(self, keep: Iterable[str], min_age: float = 0.0) -> int:
+        """Удаляет блобы, хэшей которых нет в keep.
+
+        Args:
+            keep (Iterable[str]): Хэши, которые нужно сохранить.
+            min_age (float): Не трогать блобы моложе min_age секунд: их может
+                использовать сборка архива, идущая в другом потоке.
+
+        Returns:
+            int: Количество удаленных блобов.
+        """
+        keep = set(keep)
+        deadline = time.time() - min_age
+        removed = 0
+        for path in self._directory.glob("*/*.blob"):
+            if path.stem not in keep and path.stat().st_mtime <= deadline:
+                path.unlink(missing_ok=True)
+                removed += 1
+
+        return removed
+
+    def write_archive(
+        self,
+        archive_path: Union[str, Path],
+        files: Iterable[Tuple[str, Optional[Union[str, Path]], str]],
+        comment: bytes = b"",
+    ) -> Path:
+        """Собирает zip из блобов, сжимая только файлы, которых еще нет в хранилище.
+
+        Args:
+            archive_path (Union[str, Path]): Куда записать архив.
+            files (Iterable[Tuple[str, Optional[Union[str, Path]], str]]):
+                Тройки (имя в архиве, путь к файлу, sha256). Порядок
+                сохраняется. Путь None - блоб уже добавлен через put_bytes.
+            comment (bytes): Комментарий архива.
+
+        Raises:
+            ValueError: Если архив не помещается в zip без zip64, файл
+                изменился после хеширования или блоба без пути нет.
+
+        Returns:
+            Path: Путь к архиву.
+        """
+        entries = []
+        for name, source, digest in files:
+            info = self.put_file(source, digest) if source is not None else self.get(digest)
+            if info is None:
+                raise ValueError(f"Blob {digest} for {name} is not in the store")
+
+            entries.append((name, digest, info))
+
+        if len(entries) > 0xFFFF:
+            raise ValueError("Too many files for a zip archive without zip64")
+
+        archive_path = Path(archive_path)
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = archive_path.with_name(archive_path.name + ".tmp")
+        with temp_path.open("wb") as archive:
+            central = []
+            for name, digest, info in entries:
+                central.append(self._write_entry(archive, name, digest, info))
+
+            directory_offset = archive.tell()
+            for name, info, offset in central:
+                encoded = name.encode("utf-8")
+                archive.write(_CENTRAL_HEADER.pack(
+                    0x02014B50, 20, 20, _ZIP_FLAGS, info.method, _DOS_TIME, _DOS_DATE,
+                    info.crc, info.compressed_size, info.size, len(encoded), 0, 0, 0, 0, 0, offset,
+                ))
+                archive.write(encoded)
+
+            directory_size = archive.tell() - directory_offset
+            if archive.tell() > _ZIP_LIMIT:
+                raise ValueError("Archive is too large for a zip without zip64")
+
+            archive.write(_END_RECORD.pack(
+                0x06054B50, 0, 0, len(central), len(central), directory_size,
+                directory_offset, len(comment),
+            ))
+            archive.write(comment)
+
+        os.replace(temp_path, archive_path)
+        return archive_path
+
+    def _write_entry(
+        self, archive: BinaryIO, name: str, digest: str, info: BlobInfo
+    ) -> Tuple[str, BlobInfo, int]:
+        offset = archive.tell()
+        if offset > _ZIP_LIMIT or info.size > _ZIP_LIMIT:
+            raise ValueError("Archive is too large for a zip without zip64")
+
+        encoded = name.encode("utf-8")
+        archive.write(_LOCAL_HEADER.pack(
+            0x04034B50, 20, _ZIP_FLAGS, info.method, _DOS_TIME, _DOS_DATE,
+            info.crc, info.compressed_size, info.size, len(encoded), 0,
+        ))
+        archive.write(encoded)
+        with self.path(digest).open("rb") as blob:
+            blob.seek(_BLOB_HEADER.size)
+            while chunk := blob.read(1024 * 1024):
+                archive.write(chunk)
+
+        return name, info, offset
+
+    def _write_blob(self, digest: str, data: bytes, suffix: str) -> BlobInfo:
+        method, payload = _compress(data, suffix)
+        info = BlobInfo(method, zlib.crc32(data), len(data), len(payload))
+        path = self.path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with temp_path.open("wb") as file:
+            file.write(_BLOB_HEADER.pack(BLOB_MAGIC, method, info.crc, info.size))
+            file.write(payload)
+
+        os.replace(temp_path, path)
+        return info
@@ -0,0 +1,233 @@
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, Union
+
+CHUNK_SIZE = 256 * 1024
+# Больше этого за один запрос диапазона не отдается
+MAX_RANGE_SIZE = 4 * 1024 * 1024
+
+
+class TransferInfo(NamedTuple):
+    id: str
+    size: int
+    chunk_size: int
+    chunk_hashes: List[str]
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.chunk_hashes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TransferInfo":
+        return cls(data["id"], data["size"], data["chunk_size"], list(data["chunk_hashes"]))
+
+
+def _read_mapped(path: Path, offset: int, length: int) -> bytes:
+    with path.open("rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if offset >= size or length <= 0:
+            return b""
+
+        # Файл отображается только на время чтения: открытое отображение
+        # мешало бы подменять архив через os.replace (Windows)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[offset:offset + length]
+
+
+def _file_version(path: Path) -> Tuple[int, ...]:
+    # Архивы подменяются через os.replace, то есть новым inode. mtime не
+    # годится: DeltaArchiveCache обновляет его при каждом использовании
+    stat = path.stat()
+    return (stat.st_dev, stat.st_ino, stat.st_size)
+
+
+def build_transfer_info(path: Union[str, Path], chunk_size: int = CHUNK_SIZE) -> TransferInfo:
+    """Считает sha256 каждого блока файла и всего файла за один проход.
+
+    id передачи - sha256 всего файла, поэтому другая версия архива
+    получает другой id.
+    """
+    path = Path(path)
+    total = hashlib.sha256()
+    chunk_hashes = []
+    with path.open("rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, size, chunk_size):
+                    chunk = mapped[offset:offset + chunk_size]
+                    total.update(chunk)
+                    chunk_hashes.append(hashlib.sha256(chunk).hexdigest())
+
+    return TransferInfo(total.hexdigest(), size, chunk_size, chunk_hashes)
+
+
+class ChunkedTransfers:
+    """Раздача архивов блоками фиксированного размера с хэшем каждого блока.
+
+    register() объявляет файл для передачи и возвращает TransferInfo, по
+    которому клиент запрашивает блоки (read_chunk) или диапазоны байт
+    (read_range) и проверяет их. Если файл с тех пор изменился, запросы по
+    старому id отклоняются: клиенту нужно запросить передачу заново.
+
+    Args:
+        chunk_size (int): Размер блока. По умолчанию CHUNK_SIZE.
+        limit (int): Сколько передач помнить. По умолчанию 64.
+    """
+    __slots__ = ["_chunk_size", "_limit", "_transfers", "_lock"]
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, limit: int = 64) -> None:
+        if chunk_size < 1 or limit < 1:
+            raise ValueError("Chunk size and transfer limit must be positive")
+
+        self._chunk_size = chunk_size
+        self._limit = limit
+        # id -> (путь, версия файла, TransferInfo)
+        self._transfers: "OrderedDict[str, Tuple[Path, Tuple[int, ...], TransferInfo]]" = OrderedDict()
+        # register и чтения вызываются из пула потоков
+        self._lock = threading.Lock()
+
+    def register(self, path: Union[str, Path]) -> TransferInfo:
+        """Объявляет файл для передачи. Повторная регистрация неизмененного
+        файла не перечитывает его."""
+        path = Path(path)
+        version = _file_version(path)
+        with self._lock:
+            for transfer_id, (known_path, known_version, info) in self._transfers.items():
+                if known_path == path and known_version == version:
+                    self._transfers.move_to_end(transfer_id)
+                    return info
+
+        info = build_transfer_info(path, self._chunk_size)
+        with self._lock:
+            self._transfers[info.id] = (path, version, info)
+            self._transfers.move_to_end(info.id)
+            while len(self._transfers) > self._limit:
+                self._transfers.popitem(last=False)
+
+        return info
+
+    def read_chunk(self, transfer_id: str, index: int) -> bytes:
+        """Возвращает блок index передачи.
+
+        Raises:
+            ValueError: Если передача неизвестна или устарела, либо индекс
+                вне диапазона.
+        """
+        path, info = self._get(transfer_id)
+        if not 0 <= index < info.chunk_count:
+            raise ValueError(f"Chunk index {index} out of range 0..{info.chunk_count - 1}")
+
+        return _read_mapped(path, index * info.chunk_size, info.chunk_size)
+
+    def read_range(self, transfer_id: str, offset: int, length: int) -> bytes:
+        """Возвращает до length байт с offset (не больше MAX_RANGE_SIZE).
+
+        Raises:
+            ValueError: Если передача неизвестна или устарела, либо диапазон
+                некорректен.
+        """
+        path, info = self._get(transfer_id)
+        if offset < 0 or length < 0 or offset > info.size:
+            raise ValueError(f"Invalid range {offset}+{length} for size {info.size}")
+
+        return _read_mapped(path, offset, min(length, MAX_RANGE_SIZE))
+
+    def _get(self, transfer_id: str) -> Tuple[Path, TransferInfo]:
+        with self._lock:
+            entry = self._transfers.get(transfer_id)
+
+        if entry is None:
+            raise ValueError(f"Unknown transfer {transfer_id}")
+
+        path, version, info = entry
+        try:
+            current = _file_version(path)
+
+        except FileNotFoundError:
+            current = None
+
+        if current != version:
+            with self._lock:
+                self._transfers.pop(transfer_id, None)
+
+            raise ValueError(f"Transfer {transfer_id} is stale, request it again")
+
+        return path, info
+
+
+class ChunkedDownload:
+    """Клиентская сторона: докачивает файл по TransferInfo с проверкой блоков.
+
+    Блоки пишутся по порядку в `<destination>.part`. При новом запуске
+    уже скачанная часть проверяется по хэшам блоков, и загрузка
+    продолжается с первого непроверенного блока. Готовый файл
+    переименовывается в destination.
+
+    Args:
+        info (TransferInfo): Описание передачи от сервера.
+        destination (Union[str, Path]): Куда сохранить файл.
+    """
+    __slots__ = ["info", "destination", "part_path"]
+
+    def __init__(self, info: TransferInfo, destination: Union[str, Path]) -> None:
+        self.info = info
+        self.destination = Path(destination)
+        self.part_path = self.destination.with_name(self.destination.name + ".part")
+
+    def verified_chunks(self) -> int:
+        """Сколько блоков с начала .part совпадают с хэшами. Все после
+        первого несовпадения отбрасываются."""
+        if not self.part_path.exists():
+            return 0
+
+        verified = 0
+        with self.part_path.open("rb") as file:
+            for expected in self.info.chunk_hashes:
+                chunk = file.read(self.info.chunk_size)
+                if not chunk or hashlib.sha256(chunk).hexdigest() != expected:
+                    break
+
+                verified += 1
+
+        return verified
+
+    def download(self, fetch_chunk: Callable[[str, int], bytes], retries: int = 2) -> Path:
+        """Докачивает недостающие блоки.
+
+        Args:
+            fetch_chunk (Callable[[str, int], bytes]): Запрос блока (id, индекс).
+            retries (int): Сколько раз перезапросить блок с неверным хэшем.
+
+        Raises:
+            ValueError: Если блок не совпал с хэшем после всех попыток.
+
+        Returns:
+            Path: Путь к скачанному файлу.
+        """
+        start = self.verified_chunks()
+        self.part_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.part_path.open("r+b" if self.part_path.exists() else "wb") as file:
+            file.truncate(start * self.info.chunk_size)
+            file.seek(start * self.info.chunk_size)
+            for index in range(start, self.info.chunk_count):
+                for _ in range(retries + 1):
+                    chunk = fetch_chunk(self.info.id, index)
+                    if hashlib.sha256(chunk).hexdigest() == self.info.chunk_hashes[index]:
+                        break
+
+                else:
+                    raise ValueError(f"Chunk {index} of transfer {self.info.id} failed verification")
+
+                file.write(chunk)
+                file.flush()
+
+        os.replace(self.part_path, self.destination)
+        return self.destination
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .blob_store import BlobStore
+from .content_manifest import ContentManifest, ManifestSnapshot
+
+# Служебный файл в архиве дельты: корень, удаленные пути и хэши файлов
+DELTA_INFO_NAME = "_delta.json"
+MAX_CLIENT_FILES = 100_000
+
+ManifestView = Union[ContentManifest, ManifestSnapshot]
+
+
+class ContentDelta(NamedTuple):
+    changed: List[str]
+    deleted: List[str]
+    root_hash: str
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.changed and not self.deleted
+
+
+def validate_client_files(client_files: Any) -> Dict[str, str]:
+    """Проверяет манифест клиента: словарь путь -> sha256.
+
+    Raises:
+        ValueError: Если это не словарь строк или он слишком большой.
+    """
+    if not isinstance(client_files, dict):
+        raise ValueError("Client manifest must be a mapping of path to hash")
+
+    if len(client_files) > MAX_CLIENT_FILES:
+        raise ValueError(f"Client manifest has more than {MAX_CLIENT_FILES} files")
+
+    for path, digest in client_files.items():
+        if not isinstance(path, str) or not isinstance(digest, str):
+            raise ValueError("Client manifest must contain only string paths and hashes")
+
+    return client_files
+
+
+def diff_manifest(manifest: ManifestView, client_files: Dict[str, str]) -> ContentDelta:
+    """Сравнивает манифест сервера с манифестом клиента.
+
+    Args:
+        manifest (ManifestView): Манифест контента сервера или его снимок.
+        client_files (Dict[str, str]): Путь -> sha256 файлов клиента.
+
+    Returns:
+        ContentDelta: Новые и измененные пути, пути, которых нет на сервере,
+        и корневой хэш сервера. Списки отсортированы.
+    """
+    files = manifest.files
+    changed = sorted(
+        path for path, entry in files.items() if client_files.get(path) != entry.hash
+    )
+    deleted = sorted(path for path in client_files if path not in files)
+    return ContentDelta(changed, deleted, manifest.root_hash)
+
+
+def delta_key(client_files: Dict[str, str], root_hash: str) -> str:
+    """Ключ дельты: одинаков для всех клиентов с одинаковым контентом."""
+    hash_function = hashlib.sha256(root_hash.encode())
+    for path in sorted(client_files):
+        hash_function.update(f"{path}\0{client_files[path]}\n".encode())
+
+    return hash_function.hexdigest()
+
+
+def build_delta_archive(
+    manifest: ManifestView,
+    delta: ContentDelta,
+    archive_path: Union[str, Path],
+    blob_store: Optional[BlobStore] = None,
+) -> Path:
+    """Собирает ZIP с новыми и измененными файлами дельты.
+
+    В корень архива кладется DELTA_INFO_NAME: {"root": корневой хэш,
+    "deleted": [пути], "files": {путь: sha256}}. Клиент распаковывает
+    файлы, удаляет пути из deleted и сверяет результат с root.
+
+    Args:
+        manifest (ManifestView): Манифест или снимок, по которому считалась дельта.
+        delta (ContentDelta): Дельта.
+        archive_path (Union[str, Path]): Куда записать архив.
+        blob_store (Optional[BlobStore]): Если задано, архив собирается из
+            заранее сжатых блобов.
+
+    Returns:
+        Path: Путь к архиву.
+    """
+    archive_path = Path(archive_path)
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = archive_path.with_name(archive_path.name + ".tmp")
+    info = {
+        "root": delta.root_hash,
+        "deleted": delta.deleted,
+        "files": {path: manifest.files[path].hash for path in delta.changed},
+    }
+
+    info_data = json.dumps(info, ensure_ascii=False).encode("utf-8")
+
+    if blob_store is not None:
+        info_digest, _ = blob_store.put_bytes(info_data, ".json")
+        return blob_store.write_archive(archive_path, [(DELTA_INFO_NAME, None, info_digest)] + [
+            (path, manifest.root / path, manifest.files[path].hash) for path in delta.changed
+        ])
+
+    with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr(DELTA_INFO_NAME, info_data)
+        for path in delta.changed:
+            zipf.write(manifest.root / path, path)
+
+    os.replace(temp_path, archive_path)
+    return archive_path
+
+
+def apply_delta_archive(archive_path: Union[str, Path], target: Union[str, Path]) -> str:
+    """Применяет архив дельты к локальной копии контента (сторона клиента).
+
+    Файлы проверяются по sha256 из DELTA_INFO_NAME до записи на диск.
+
+    Args:
+        archive_path (Union[str, Path]): Архив из build_delta_archive.
+        target (Union[str, Path]): Директория контента клиента.
+
+    Raises:
+        ValueError: Если путь выходит за target или хэш файла не совпал.
+
+    Returns:
+        str: Корневой хэш сервера, с которым можно сверить результат.
+    """
+    target = Path(target).resolve()
+
+    def safe_path(path: str) -> Path:
+        full_path = (target / path).resolve()
+        if target not in full_path.parents:
+            raise ValueError(f"Delta path {path!r} escapes the content directory")
+
+        return full_path
+
+    with zipfile.ZipFile(archive_path) as zipf:
+        info = json.loads(zipf.read(DELTA_INFO_NAME))
+        for path, digest in info["files"].items():
+            data = zipf.read(path)
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise ValueError(f"Delta file {path!r} does not match its hash")
+
+            full_path = safe_path(path)
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            full_path.write_bytes(data)
+
+    for path in info["deleted"]:
+        safe_path(path).unlink(missing_ok=True)
+
+    return info["root"]
+
+
+class DeltaArchiveCache:
+    """Кэш архивов дельты на диске по delta_key.
+
+    Клиенты, обновляющиеся с одной и той же версии контента, получают один
+    и тот же архив. Хранится не больше limit архивов, лишние удаляются
+    начиная с давно использованных.
+
+    Args:
+        directory (Union[str, Path]): Директория для архивов.
+        limit (int): Максимум архивов, не меньше 1. По умолчанию 32.
+        blob_store (Optional[BlobStore]): Хранилище блобов для сборки архивов.
+    """
+    __slots__ = ["_directory", "_limit", "_blob_store"]
+
+    def __init__(
+        self, directory: Union[str, Path], limit: int = 32, blob_store: Optional[BlobStore] = None
+    ) -> None:
+        if limit < 1:
+            raise ValueError("Delta archive cache limit must be positive")
+
+        self._directory = Path(directory)
+        self._limit = limit
+        self._blob_store = blob_store
+
+    def get_or_build(
+        self, manifest: ManifestView, client_files: Dict[str, str]
+    ) -> Tuple[ContentDelta, Optional[Path]]:
+        """Возвращает дельту и архив для нее.
+
+        Returns:
+            Tuple[ContentDelta, Optional[Path]]: Дельта и архив. Архив None,
+            если у клиента уже весь контент.
+        """
+        delta = diff_manifest(manifest, client_files)
+        if delta.is_empty:
+            return delta, None
+
+        archive_path = self._directory / f"{delta_key(client_files, delta.root_hash)}.zip"
+        if archive_path.is_file():
+            os.utime(archive_path)
+            return delta, archive_path
+
+        build_delta_archive(manifest, delta, archive_path, self._blob_store)
+        self._trim()
+        return delta, archive_path
+
+    def _trim(self) -> None:
+        archives = sorted(self._directory.glob("*.zip"), key=lambda path: path.stat().st_mtime_ns)
+        for path in archives[:-self._limit]:
+            path.unlink(missing_ok=True)
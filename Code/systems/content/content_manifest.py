@@ -0,0 +1,288 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import (Dict, Iterable, Iterator, List, NamedTuple, Optional, Set,
+                    Tuple, Union)
+
+import msgpack
+
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class FileEntry(NamedTuple):
+    size: int
+    mtime_ns: int
+    hash: str
+
+
+class ManifestSnapshot(NamedTuple):
+    """Неизменяемая копия манифеста для чтения из других потоков."""
+    root: Path
+    root_hash: str
+    files: Dict[str, FileEntry]
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """sha256 содержимого файла в виде шестнадцатеричной строки."""
+    hash_function = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            hash_function.update(chunk)
+
+    return hash_function.hexdigest()
+
+
+def _parent(path: str) -> str:
+    return path.rpartition("/")[0]
+
+
+class ContentManifest:
+    """Манифест директории контента: размер, mtime и sha256 каждого файла.
+
+    Файл перехешируется, только если изменились его размер или mtime.
+    Корневой хэш - дерево Меркла по директориям: хэш директории считается
+    от имен и хэшей ее прямых потомков, поэтому изменение файла
+    пересчитывает только директории на пути к корню. Готовый корень
+    кэшируется, и root_hash отдает его за O(1), пока файлы не менялись.
+
+    Пути в манифесте относительные, через "/". Пустые директории не
+    учитываются.
+
+    Args:
+        root (Union[str, Path]): Директория контента.
+        state_path (Optional[Union[str, Path]]): Файл, в котором манифест
+            сохраняется между запусками, чтобы не хешировать все заново.
+    """
+    __slots__ = [
+        "_root", "_state_path", "_files", "_children", "_dir_hashes", "_dirty", "_unsaved",
+        "last_refresh",
+    ]
+
+    def __init__(
+        self, root: Union[str, Path], state_path: Optional[Union[str, Path]] = None
+    ) -> None:
+        self._root = Path(root)
+        self._state_path = Path(state_path) if state_path is not None else None
+        self._files: Dict[str, FileEntry] = {}
+        self._children: Dict[str, Set[str]] = {"": set()}
+        self._dir_hashes: Dict[str, str] = {}
+        self._dirty: Set[str] = {""}
+        self._unsaved = False
+        self.last_refresh: float = 0.0
+        self._load_state()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def root_hash(self) -> str:
+        """Корневой хэш по текущему состоянию манифеста (без обращения к диску)."""
+        if self._dirty:
+            self._rehash_dirs()
+
+        return self._dir_hashes[""]
+
+    @property
+    def files(self) -> Dict[str, FileEntry]:
+        """Путь -> FileEntry. Словарь только для чтения."""
+        return self._files
+
+    def snapshot(self) -> ManifestSnapshot:
+        """Копия текущего состояния: по ней можно собирать архивы, пока
+        манифест обновляется в другом потоке."""
+        return ManifestSnapshot(self._root, self.root_hash, dict(self._files))
+
+    def get(self, path: str) -> Optional[FileEntry]:
+        return self._files.get(path)
+
+    def dir_hash(self, path: str = "") -> Optional[str]:
+        """Хэш поддерева директории или None, если в ней нет файлов."""
+        if path not in self._children:
+            return None
+
+        if self._dirty:
+            self._rehash_dirs()
+
+        return self._dir_hashes[path]
+
+    def refresh(self) -> List[str]:
+        """Сверяет манифест с диском: обходит директорию и перехеширует
+        только файлы с новым размером или mtime.
+
+        Returns:
+            List[str]: Добавленные, измененные и удаленные пути.
+        """
+        seen: Set[str] = set()
+        changed: List[str] = []
+        for rel_path, stat in self._scan(self._root, ""):
+            seen.add(rel_path)
+            if self._update_file(rel_path, stat):
+                changed.append(rel_path)
+
+        for rel_path in [path for path in self._files if path not in seen]:
+            self._remove_file(rel_path)
+            changed.append(rel_path)
+
+        self.last_refresh = time.monotonic()
+        if self._unsaved:
+            self.save()
+
+        return changed
+
+    def refresh_if_stale(self, max_age: float) -> List[str]:
+        """Вызывает refresh, если с прошлой сверки прошло не меньше max_age секунд.
+
+        Returns:
+            List[str]: Изменившиеся пути, пустой список без сверки.
+        """
+        if time.monotonic() - self.last_refresh < max_age:
+            return []
+
+        return self.refresh()
+
+    def update(self, paths: Iterable[Union[str, Path]]) -> List[str]:
+        """Обновляет только переданные файлы, например, по событиям изменения.
+
+        Args:
+            paths (Iterable[Union[str, Path]]): Абсолютные пути или пути
+                относительно корня контента. Несуществующие файлы удаляются
+                из манифеста.
+
+        Returns:
+            List[str]: Пути, которые действительно изменились.
+        """
+        changed: List[str] = []
+        for path in paths:
+            full_path = Path(path) if Path(path).is_absolute() else self._root / path
+            rel_path = full_path.relative_to(self._root).as_posix()
+            try:
+                stat = full_path.stat()
+
+            except FileNotFoundError:
+                stat = None
+
+            if stat is not None and full_path.is_file():
+                if self._update_file(rel_path, stat):
+                    changed.append(rel_path)
+
+            elif rel_path in self._files:
+                self._remove_file(rel_path)
+                changed.append(rel_path)
+
+        if self._unsaved:
+            self.save()
+
+        return changed
+
+    def save(self) -> None:
+        self._unsaved = False
+        if self._state_path is None:
+            return
+
+        self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._state_path.with_name(self._state_path.name + ".tmp")
+        temp_path.write_bytes(msgpack.packb({
+            "version": MANIFEST_VERSION,
+            "files": {path: list(entry) for path, entry in self._files.items()},
+        }))
+        os.replace(temp_path, self._state_path)
+
+    def _load_state(self) -> None:
+        if self._state_path is None or not self._state_path.is_file():
+            return
+
+        try:
+            state = msgpack.unpackb(self._state_path.read_bytes())
+
+        except (ValueError, msgpack.UnpackException):
+            return
+
+        if not isinstance(state, dict) or state.get("version") != MANIFEST_VERSION:
+            return
+
+        for path, entry in state["files"].items():
+            self._add_file(path, FileEntry(*entry))
+
+        self._unsaved = False
+
+    def _scan(self, directory: Path, prefix: str) -> Iterator[Tuple[str, os.stat_result]]:
+        try:
+            entries = list(os.scandir(directory))
+
+        except FileNotFoundError:
+            return
+
+        for entry in entries:
+            rel_path = f"{prefix}{entry.name}"
+            if entry.is_dir():
+                yield from self._scan(Path(entry.path), rel_path + "/")
+
+            elif entry.is_file():
+                yield rel_path, entry.stat()
+
+    def _update_file(self, rel_path: str, stat: os.stat_result) -> bool:
+        entry = self._files.get(rel_path)
+        if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            return False
+
+        digest = hash_file(self._root / rel_path)
+        self._add_file(rel_path, FileEntry(stat.st_size, stat.st_mtime_ns, digest))
+        # Файл тронули, но содержимое то же - корень не меняется
+        return entry is None or entry.hash != digest
+
+    def _add_file(self, rel_path: str, entry: FileEntry) -> None:
+        self._files[rel_path] = entry
+        self._unsaved = True
+        child = rel_path
+        while child:
+            parent = _parent(child)
+            self._children.setdefault(parent, set()).add(child)
+            self._dirty.add(parent)
+            child = parent
+
+    def _remove_file(self, rel_path: str) -> None:
+        del self._files[rel_path]
+        self._unsaved = True
+        child = rel_path
+        while child:
+            parent = _parent(child)
+            siblings = self._children[parent]
+            siblings.discard(child)
+            self._dirty.add(parent)
+            if siblings or not parent:
+                break
+
+            # Директория опустела - убираем ее из родителя
+            del self._children[parent]
+            self._dir_hashes.pop(parent, None)
+            self._dirty.discard(parent)
+            child = parent
+
+        for parent in self._ancestors(rel_path):
+            if parent in self._children:
+                self._dirty.add(parent)
+
+    @staticmethod
+    def _ancestors(path: str) -> Iterator[str]:
+        while path:
+            path = _parent(path)
+            yield path
+
+    def _rehash_dirs(self) -> None:
+        # Сначала глубокие директории: хэш родителя зависит от хэшей детей
+        for directory in sorted(self._dirty, key=lambda path: -path.count("/") - bool(path)):
+            if directory not in self._children:
+                continue
+
+            hash_function = hashlib.sha256()
+            for child in sorted(self._children[directory]):
+                entry = self._files.get(child)
+                kind, digest = ("f", entry.hash) if entry is not None else ("d", self._dir_hashes[child])
+                hash_function.update(f"{kind} {child.rpartition('/')[2]} {digest}\n".encode())
+
+            self._dir_hashes[directory] = hash_function.hexdigest()
+
+        self._dirty.clear()
@@ -0,0 +1,242 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import (Any, AsyncIterator, Awaitable, Deque, Dict, Hashable,
+                    NamedTuple, Tuple)
+
+
+class SchedulerMetrics(NamedTuple):
+    active: int
+    queued: int
+    clients: int
+    bytes_sent: int
+    transfers: int
+    throughput: float
+    interactive: int
+
+
+class Transfer:
+    """Передача, получившая слот в DownloadScheduler.transfer."""
+    __slots__ = ["_scheduler"]
+
+    def __init__(self, scheduler: "DownloadScheduler") -> None:
+        self._scheduler = scheduler
+
+    async def pace(self, size: int) -> None:
+        """Ждет, пока общий бюджет позволит передать size байт. Байты
+        списываются частями по quantum, вперемешку с другими передачами."""
+        await self._scheduler._pace(size)
+
+    async def send(self, send: Awaitable[Any], size: int) -> Any:
+        """Выполняет отправку, которую нельзя разбить на части (например,
+        ClUnit.send_file), и списывает ее size байт частями, пока она идет.
+        Возвращается, когда закончены и отправка, и списание: до этого
+        слот занят, поэтому следующие такие отправки не начнутся раньше,
+        чем позволит бюджет."""
+        pacing = asyncio.ensure_future(self.pace(size))
+        try:
+            result = await send
+            await pacing
+            return result
+
+        finally:
+            pacing.cancel()
+
+
+class DownloadScheduler:
+    """Планировщик раздачи контента: общий лимит скорости, ограничение
+    одновременных передач и честная очередь между клиентами.
+
+    Каждая передача (файл целиком, блок или диапазон) идет внутри
+    transfer(client, size). Сначала занимается слот: их не больше
+    max_active, у одного клиента не больше per_client, а освободившийся
+    слот отдается клиентам по кругу, поэтому клиент с десятком запросов
+    не оттесняет остальных. Затем байты списываются с общего бюджета rate
+    байт/с частями по quantum: каждая часть ждет своей очереди отдельно,
+    поэтому большой файл не занимает канал целиком, а делит его с другими
+    передачами. Ожидание идет через asyncio.sleep и не занимает цикл событий.
+
+    Интерактивная работа (чат, игровые методы) помечается через
+    interactive() и имеет приоритет: пока она идет, очередная часть
+    передачи ждет ее завершения, но не дольше interactive_wait секунд.
+
+    Args:
+        rate (float): Общий лимит в байтах в секунду. 0 - без лимита.
+        max_active (int): Максимум одновременных передач. По умолчанию 4.
+        per_client (int): Максимум одновременных передач одного клиента.
+            По умолчанию 1.
+        window (float): Окно в секундах для расчета throughput. По умолчанию 10.
+        quantum (int): Размер части при списании в байтах. По умолчанию 64 КиБ.
+        interactive_wait (float): Сколько часть передачи ждет интерактивную
+            работу, в секундах. По умолчанию 0.05.
+    """
+    __slots__ = [
+        "rate", "max_active", "per_client", "window", "quantum", "interactive_wait",
+        "_next_free", "_active", "_active_count", "_queues", "_last_grant", "_grants",
+        "_interactive", "_interactive_idle", "_history", "_history_bytes", "bytes_sent", "transfers",
+    ]
+
+    def __init__(
+        self,
+        rate: float,
+        max_active: int = 4,
+        per_client: int = 1,
+        window: float = 10.0,
+        quantum: int = 64 * 1024,
+        interactive_wait: float = 0.05,
+    ) -> None:
+        if (
+            rate < 0 or max_active < 1 or per_client < 1 or window <= 0
+            or quantum < 1 or interactive_wait < 0
+        ):
+            raise ValueError("Scheduler limits must be positive")
+
+        self.rate = rate
+        self.max_active = max_active
+        self.per_client = per_client
+        self.window = window
+        self.quantum = quantum
+        self.interactive_wait = interactive_wait
+        # Момент, когда канал освободится от уже запланированных передач
+        self._next_free = 0.0
+        self._active: Dict[Hashable, int] = {}
+        self._active_count = 0
+        # Клиент -> ожидающие слота, в порядке появления клиентов
+        self._queues: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        # Номер последней выдачи слота клиенту: слот получает тот, кто ждал
+        # своей очереди дольше всех
+        self._last_grant: Dict[Hashable, int] = {}
+        self._grants = 0
+        self._interactive = 0
+        self._interactive_idle = asyncio.Event()
+        self._interactive_idle.set()
+        self._history: Deque[Tuple[float, int]] = deque()
+        self._history_bytes = 0
+        self.bytes_sent = 0
+        self.transfers = 0
+
+    @asynccontextmanager
+    async def transfer(self, client: Hashable, size: int = 0) -> AsyncIterator[Transfer]:
+        """Занимает слот клиента и ждет, пока общий бюджет позволит
+        передать size байт. Остальное списывается через полученный
+        Transfer. Слот освобождается при выходе из блока."""
+        await self._acquire(client)
+        try:
+            await self._pace(size)
+            yield Transfer(self)
+
+        finally:
+            self._release(client)
+            self.transfers += 1
+
+    @asynccontextmanager
+    async def interactive(self) -> AsyncIterator[None]:
+        """Помечает интерактивную работу: пока блок выполняется, передачи
+        не начинают новые части."""
+        self._interactive += 1
+        self._interactive_idle.clear()
+        try:
+            yield
+
+        finally:
+            self._interactive -= 1
+            if not self._interactive:
+                self._interactive_idle.set()
+
+    def metrics(self) -> SchedulerMetrics:
+        """Текущее состояние: активные и ожидающие передачи, число клиентов
+        с передачами, всего байт и передач, средняя скорость за window."""
+        self._trim_history(time.monotonic())
+        queued = sum(len(waiters) for waiters in self._queues.values())
+        clients = len(self._active.keys() | self._queues.keys())
+        return SchedulerMetrics(
+            self._active_count, queued, clients, self.bytes_sent, self.transfers,
+            self._history_bytes / self.window, self._interactive,
+        )
+
+    async def _acquire(self, client: Hashable) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(client, deque()).append(future)
+        self._dispatch()
+        try:
+            await future
+
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Слот уже выдан, но ждущий отменен
+                self._release(client)
+
+            else:
+                waiters = self._queues.get(client)
+                if waiters is not None and future in waiters:
+                    waiters.remove(future)
+                    if not waiters:
+                        del self._queues[client]
+                        if client not in self._active:
+                            self._last_grant.pop(client, None)
+
+            raise
+
+    def _release(self, client: Hashable) -> None:
+        self._active_count -= 1
+        self._active[client] -= 1
+        if not self._active[client]:
+            del self._active[client]
+            if client not in self._queues:
+                self._last_grant.pop(client, None)
+
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._active_count < self.max_active:
+            eligible = [
+                client for client in self._queues
+                if self._active.get(client, 0) < self.per_client
+            ]
+            if not eligible:
+                return
+
+            client = min(eligible, key=lambda key: self._last_grant.get(key, -1))
+            waiters = self._queues[client]
+            future = waiters.popleft()
+            if not waiters:
+                del self._queues[client]
+
+            if future.done():
+                continue
+
+            self._grants += 1
+            self._last_grant[client] = self._grants
+            self._active[client] = self._active.get(client, 0) + 1
+            self._active_count += 1
+            future.set_result(None)
+
+    async def _pace(self, size: int) -> None:
+        while size > 0:
+            part = min(size, self.quantum)
+            size -= part
+            if self._interactive:
+                try:
+                    await asyncio.wait_for(self._interactive_idle.wait(), self.interactive_wait)
+
+                except asyncio.TimeoutError:
+                    pass
+
+            now = time.monotonic()
+            start = now
+            if self.rate:
+                start = max(now, self._next_free)
+                self._next_free = start + part / self.rate
+
+            self.bytes_sent += part
+            self._trim_history(now)
+            self._history.append((start, part))
+            self._history_bytes += part
+            if start > now:
+                await asyncio.sleep(start - now)
+
+    def _trim_history(self, now: float) -> None:
+        while self._history and self._history[0][0] < now - self.window:
+            _, size = self._history.popleft()
+            self._history_bytes -= size
@@ -0,0 +1,48 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Выполняет блокирующие функции в исполнителе, не занимая цикл событий,
+    и объединяет одновременные вызовы с одним ключом.
+
+    Пока вызов с ключом выполняется, все остальные вызовы с тем же ключом
+    ждут его результат (или исключение) вместо запуска своей копии. После
+    завершения ключ освобождается, и следующий вызов выполнится заново.
+
+    Args:
+        executor (Optional[Executor]): Исполнитель. По умолчанию - исполнитель
+            цикла событий (пул потоков).
+    """
+    __slots__ = ["_executor", "_inflight", "calls", "executions"]
+
+    def __init__(self, executor: Optional[Executor] = None) -> None:
+        self._executor = executor
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+
+    def is_running(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def run(self, key: Hashable, func: Callable[..., Any], *args: Any) -> Any:
+        """Возвращает результат func(*args), выполненной в исполнителе.
+
+        Отмена одного ожидающего не отменяет общий вызов для остальных.
+        """
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, func, *args)
+            self._inflight[key] = future
+            self.executions += 1
+
+            def release(done: asyncio.Future) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            future.add_done_callback(release)
+
+        return await asyncio.shield(future)
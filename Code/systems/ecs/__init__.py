@@ -1,11 +1,27 @@
 from .base_struct import BaseComponent, BaseEntity
 from .class_roster import register_component, register_entity
+from .component_store import ComponentStore
 from .factory import Factory
+from .fields import dump_fields, restore_fields, slot_fields
+from .memory_report import format_memory_report, memory_report
+from .prototype_loader import PrototypeLoader
+from .schema import FieldCodec
+from .world import QueryView, World
 
 __all__ = [
     "BaseComponent",
     "BaseEntity",
     "register_component",
     "register_entity",
+    "ComponentStore",
     "Factory",
+    "dump_fields",
+    "restore_fields",
+    "slot_fields",
+    "memory_report",
+    "format_memory_report",
+    "PrototypeLoader",
+    "FieldCodec",
+    "QueryView",
+    "World",
 ]
@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from .class_roster import COMPONENT_REGISTRY
+from .component_store import ComponentStore
+from .object_pool import POOLS
 
 
 class BaseEntity(ABC):
+    # Подклассы могут объявлять свои __slots__, тогда экземпляры не получат __dict__
+    __slots__ = ["_id", "_uid", "_components", "__weakref__"]
+
     def __init__(self, id: str = "") -> None:
         self._id: str = id
         self._uid: int = 0
@@ -35,6 +40,7 @@ class BaseEntity(ABC):
 
         comp.set_owner(self)
         self._components[comp_type] = comp
+        ComponentStore.on_component_added(self, comp)
 
     def has_component(self, comp_type: str) -> bool:
         return comp_type in self._components
@@ -43,6 +49,7 @@ class BaseEntity(ABC):
         comp = self._components.pop(comp_type, None)
         if comp is not None:
             comp.set_owner(None)
+            ComponentStore.on_component_removed(self, comp_type)
 
     def get_component(self, comp_type: str) -> Optional["BaseComponent"]:
         return self._components.get(comp_type, None)
@@ -76,16 +83,38 @@ class BaseEntity(ABC):
             entity.add_component(component)
 
     @staticmethod
-    def _create_component(component_type: str, data: Dict[str, Any]) -> "BaseComponent":
+    def _create_component(
+        component_type: str, data: Dict[str, Any] | List[Any]
+    ) -> "BaseComponent":
+        """Создает компонент из словаря dump() или, для компонентов со схемой,
+        из списка dump_values()."""
         component_class = COMPONENT_REGISTRY.get(component_type)
 
         if component_class is None:
             raise ValueError(f"Component type {component_type} not found in registry")
 
+        if isinstance(data, list):
+            if not hasattr(component_class, "restore_values"):
+                raise ValueError(f"Component type {component_type} has no field schema")
+
+            if component_type not in POOLS:
+                return component_class.restore_values(data)
+
+            data = dict(zip(component_class.schema_names, data))
+
+        pool = POOLS.get(component_type)
+        if pool is not None:
+            component = pool.acquire()
+            if component is not None:
+                component.reset(data)
+                return component
+
         return component_class.restore(data)
 
 
 class BaseComponent(ABC):
+    __slots__ = ["_owner", "__weakref__"]
+
     def __init__(self) -> None:
         self._owner: Optional["BaseEntity"] = None
 
@@ -1,13 +1,19 @@
+from .schema import compile_component_schema, compile_entity_schema
+
 ENTITY_REGISTRY = {}
 COMPONENT_REGISTRY = {}
 
 
-# Декораторы для регистрации классов в реестрах
+# Декораторы для регистрации классов в реестрах. Если класс объявляет поля
+# аннотациями на уровне класса и не пишет dump/restore сам, они генерируются
+# по этой схеме (см. schema.py)
 def register_entity(cls):
+    compile_entity_schema(cls)
     ENTITY_REGISTRY[cls.__name__] = cls
     return cls
 
 
 def register_component(cls):
+    compile_component_schema(cls)
     COMPONENT_REGISTRY[cls.__name__] = cls
     return cls
@@ -0,0 +1,201 @@
+import weakref
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from .base_struct import BaseComponent, BaseEntity
+    from .world import QueryView
+
+
+class ComponentStore:
+    """Индексы компонентов зарегистрированных сущностей по типам.
+
+    Для каждого типа компонента хранится разреженное множество uid -> компонент.
+    Запрос по нескольким типам обходит самый маленький индекс и проверяет
+    остальные по uid, поэтому его стоимость зависит от числа подходящих
+    сущностей, а не от числа сущностей в мире.
+
+    В индекс попадают только сущности, получившие uid через Factory. Сущности
+    без uid (например, прототипы) хранят компоненты только у себя.
+
+    Изменения индексов сразу передаются подписанным QueryView тех типов,
+    которых они касаются. В слабом режиме (Factory.set_weak_registry) индексы
+    не удерживают сущности и компоненты.
+    """
+    __slots__ = []
+
+    _weak: bool = False
+    _entities: Dict[int, "BaseEntity"] = {}
+    _by_type: Dict[str, Dict[int, "BaseComponent"]] = {}
+    _watchers: Dict[str, List["QueryView"]] = {}
+
+    @staticmethod
+    def _index(comp_type: str) -> Dict[int, "BaseComponent"]:
+        index = ComponentStore._by_type.get(comp_type)
+        if index is None:
+            index = weakref.WeakValueDictionary() if ComponentStore._weak else {}
+            ComponentStore._by_type[comp_type] = index  # type: ignore
+
+        return index  # type: ignore
+
+    @staticmethod
+    def attach(entity: "BaseEntity") -> None:
+        """Добавляет сущность и все ее компоненты в индексы.
+
+        Args:
+            entity (BaseEntity): Сущность с ненулевым uid.
+
+        Raises:
+            ValueError: Если у сущности нет uid.
+        """
+        uid = entity.uid
+        if uid == 0:
+            raise ValueError("Entity without uid can't be attached to the component store")
+
+        previous = ComponentStore._entities.get(uid)
+        if previous is not None and previous is not entity:
+            ComponentStore.detach(previous)
+
+        ComponentStore._entities[uid] = entity
+        for comp_type, comp in entity._components.items():
+            ComponentStore._index(comp_type)[uid] = comp
+            for view in ComponentStore._watchers.get(comp_type, ()):
+                view._update(entity)
+
+    @staticmethod
+    def detach(entity: "BaseEntity") -> None:
+        """Убирает сущность из индексов, если она в них есть."""
+        uid = entity.uid
+        if ComponentStore._entities.get(uid) is not entity:
+            return
+
+        del ComponentStore._entities[uid]
+        for comp_type in entity._components:
+            ComponentStore._discard(comp_type, uid)
+            for view in ComponentStore._watchers.get(comp_type, ()):
+                view._discard(uid)
+
+    @staticmethod
+    def is_attached(entity: "BaseEntity") -> bool:
+        return ComponentStore._entities.get(entity.uid) is entity
+
+    @staticmethod
+    def on_component_added(entity: "BaseEntity", comp: "BaseComponent") -> None:
+        if ComponentStore._entities.get(entity.uid) is entity:
+            comp_type = comp.type
+            ComponentStore._index(comp_type)[entity.uid] = comp
+            for view in ComponentStore._watchers.get(comp_type, ()):
+                view._update(entity)
+
+    @staticmethod
+    def on_component_removed(entity: "BaseEntity", comp_type: str) -> None:
+        if ComponentStore._entities.get(entity.uid) is entity:
+            ComponentStore._discard(comp_type, entity.uid)
+            for view in ComponentStore._watchers.get(comp_type, ()):
+                view._discard(entity.uid)
+
+    @staticmethod
+    def _discard(comp_type: str, uid: int) -> None:
+        index = ComponentStore._by_type.get(comp_type)
+        if index is None:
+            return
+
+        index.pop(uid, None)
+        if not index:
+            del ComponentStore._by_type[comp_type]
+
+    @staticmethod
+    def count(comp_type: str) -> int:
+        return len(ComponentStore._by_type.get(comp_type, ()))
+
+    @staticmethod
+    def query(*comp_types: str) -> List[Tuple["BaseEntity", ...]]:
+        """Возвращает сущности, у которых есть все указанные компоненты.
+
+        Args:
+            *comp_types (str): Типы компонентов.
+
+        Raises:
+            ValueError: Если не указан ни один тип.
+
+        Returns:
+            List[Tuple[BaseEntity, ...]]: Кортежи (сущность, компоненты в порядке типов).
+        """
+        if not comp_types:
+            raise ValueError("At least one component type is required")
+
+        indexes = []
+        for comp_type in comp_types:
+            index = ComponentStore._by_type.get(comp_type)
+            if index is None:
+                return []
+
+            indexes.append(index)
+
+        # В слабом режиме записи могут исчезнуть во время обхода (сборка
+        # мусора идет при любом выделении памяти), поэтому он идет по копии,
+        # записи остальных индексов берутся через get и пропадают без ошибки,
+        # а владелец берется из компонента, а не из _entities
+        if len(indexes) == 1:
+            values = indexes[0].values()
+            return [(comp._owner, comp) for comp in (list(values) if ComponentStore._weak else values)]
+
+        smallest = min(indexes, key=len)
+        items = smallest.items()
+        if ComponentStore._weak:
+            items = list(items)  # type: ignore
+
+        result = []
+        for uid, comp in items:
+            row = []
+            for index in indexes:
+                found = comp if index is smallest else index.get(uid)
+                if found is None:
+                    break
+
+                row.append(found)
+
+            else:
+                result.append((comp._owner, *row))
+
+        return result
+
+    @staticmethod
+    def watch(view: "QueryView") -> None:
+        """Подписывает представление на изменения индексов его типов."""
+        for comp_type in set(view.types):
+            ComponentStore._watchers.setdefault(comp_type, []).append(view)
+
+    @staticmethod
+    def unwatch(view: "QueryView") -> None:
+        for comp_type in set(view.types):
+            watchers = ComponentStore._watchers.get(comp_type, [])
+            if view in watchers:
+                watchers.remove(view)
+
+            if not watchers:
+                ComponentStore._watchers.pop(comp_type, None)
+
+    @staticmethod
+    def set_weak(enabled: bool) -> None:
+        """Переводит индексы и представления на слабые или обычные ссылки."""
+        if enabled == ComponentStore._weak:
+            return
+
+        ComponentStore._weak = enabled
+        container = weakref.WeakValueDictionary if enabled else dict
+        ComponentStore._entities = container(ComponentStore._entities.items())  # type: ignore
+        ComponentStore._by_type = {
+            comp_type: container(index.items())  # type: ignore
+            for comp_type, index in ComponentStore._by_type.items()
+        }
+        for view in {view for watchers in ComponentStore._watchers.values() for view in watchers}:
+            view._set_weak(enabled)
+
+    @staticmethod
+    def clear() -> None:
+        """Очищает индексы. Подписанные представления становятся пустыми."""
+        ComponentStore._entities.clear()
+        ComponentStore._by_type.clear()
+        for watchers in ComponentStore._watchers.values():
+            for view in watchers:
+                view._reset()
@@ -1,19 +1,136 @@
 import copy
-from typing import Any, Dict, Optional
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
-from .base_struct import BaseEntity
-from .class_roster import ENTITY_REGISTRY
+from .base_struct import BaseComponent, BaseEntity
+from .class_roster import COMPONENT_REGISTRY, ENTITY_REGISTRY
+from .component_store import ComponentStore
+from .object_pool import POOL_DEFAULT_LIMIT, POOLS, ObjectPool
+
+_MUTABLE_TYPES = (list, dict, set, bytearray)
+
+# uid = (поколение << UID_INDEX_BITS) | индекс. Индекс уничтоженной сущности
+# переиспользуется с новым поколением, поэтому старый uid больше ничего не находит
+UID_INDEX_BITS = 32
+UID_INDEX_MASK = (1 << UID_INDEX_BITS) - 1
+
+
+def make_uid(index: int, generation: int) -> int:
+    return (generation << UID_INDEX_BITS) | index
+
+
+def split_uid(uid: int) -> Tuple[int, int]:
+    """Возвращает индекс и поколение uid."""
+    return uid & UID_INDEX_MASK, uid >> UID_INDEX_BITS
+
+
+def _copy_plain(value: Any) -> Any:
+    """Копирует вложенные dict/list/set, неизменяемые значения разделяет."""
+    if isinstance(value, dict):
+        return {key: _copy_plain(item) for key, item in value.items()}
+
+    if isinstance(value, (list, set, bytearray)):
+        return type(value)(_copy_plain(item) for item in value)
+
+    return value
+
+
+class SpawnTemplate:
+    """Скомпилированный прототип: дамп базовой сущности и класс для restore.
+
+    Новые экземпляры собираются через restore сущности и ее компонентов, без
+    обхода графа объектов, как у copy.deepcopy. Дамп разделяется между
+    экземплярами, копируются только поля с изменяемыми значениями, найденные
+    при компиляции.
+    """
+    __slots__ = ["entity_class", "data", "_entity_keys", "_component_keys"]
+
+    def __init__(self, entity_class: Type[BaseEntity], data: Dict[str, Any]) -> None:
+        self.entity_class: Type[BaseEntity] = entity_class
+        self.data: Dict[str, Any] = data
+        self._entity_keys: List[str] = []
+        self._component_keys: Dict[str, List[str]] = {}
+
+        for key, value in data.items():
+            if key == "components":
+                for comp_type, comp_data in value.items():
+                    keys = [
+                        field for field, field_value in comp_data.items()
+                        if isinstance(field_value, _MUTABLE_TYPES)
+                    ]
+                    if keys:
+                        self._component_keys[comp_type] = keys
+
+            elif isinstance(value, _MUTABLE_TYPES):
+                self._entity_keys.append(key)
+
+    def spawn(self) -> BaseEntity:
+        # Верхний словарь копируется всегда: restore может сохранить или
+        # изменить переданный словарь
+        data = dict(self.data)
+        for key in self._entity_keys:
+            data[key] = _copy_plain(data[key])
+
+        if self._component_keys:
+            components = dict(data["components"])
+            for comp_type, keys in self._component_keys.items():
+                comp_data = dict(components[comp_type])
+                for key in keys:
+                    comp_data[key] = _copy_plain(comp_data[key])
+
+                components[comp_type] = comp_data
+
+            data["components"] = components
+
+        return Factory._build_entity(self.entity_class, data)
 
 
 class Factory:
     _id_counter = 0
+    _generations: List[int] = [0]
+    _free_indices: List[int] = []
     _entity_registry_by_uid: Dict[int, BaseEntity] = {}
+    _weak_registry: bool = False
+    _finalizers: Dict[int, weakref.finalize] = {}
     _base_entity_registry: Dict[str, BaseEntity] = {}
+    _spawn_templates: Dict[str, SpawnTemplate] = {}
 
     @staticmethod
     def _generate_unique_id() -> int:
-        Factory._id_counter += 1
-        return Factory._id_counter
+        if Factory._free_indices:
+            index = Factory._free_indices.pop()
+
+        else:
+            Factory._id_counter += 1
+            index = Factory._id_counter
+            Factory._generations.append(0)
+
+        return make_uid(index, Factory._generations[index])
+
+    @staticmethod
+    def _free_uid(uid: int) -> None:
+        index, generation = split_uid(uid)
+        if index < len(Factory._generations) and Factory._generations[index] == generation:
+            Factory._generations[index] += 1
+            Factory._free_indices.append(index)
+
+    @staticmethod
+    def _register(entity: BaseEntity) -> None:
+        entity.set_uid(Factory._generate_unique_id())
+        Factory._entity_registry_by_uid[entity.uid] = entity
+        if Factory._weak_registry:
+            Factory._track(entity)
+
+        ComponentStore.attach(entity)
+
+    @staticmethod
+    def _track(entity: BaseEntity) -> None:
+        Factory._finalizers[entity.uid] = weakref.finalize(entity, Factory._on_collected, entity.uid)
+
+    @staticmethod
+    def _on_collected(uid: int) -> None:
+        Factory._finalizers.pop(uid, None)
+        Factory._free_uid(uid)
 
     @staticmethod
     def create_entity(data: Dict[str, Any]) -> "BaseEntity":
@@ -23,22 +140,36 @@ class Factory:
         if entity_class is None:
             raise ValueError(f"Entity type {entity_type} not found in registry")
 
-        entity = entity_class.restore(data)
-        entity.set_uid(Factory._generate_unique_id())
-        Factory._entity_registry_by_uid[entity.uid] = entity
+        entity = Factory._build_entity(entity_class, data)
+        Factory._register(entity)
 
         return entity
 
+    @staticmethod
+    def _build_entity(entity_class: Type[BaseEntity], data: Dict[str, Any]) -> BaseEntity:
+        pool = POOLS.get(entity_class.__name__)
+        if pool is not None:
+            entity = pool.acquire()
+            if entity is not None:
+                entity.reset(data)
+                return entity
+
+        return entity_class.restore(data)
+
     @staticmethod
     def get_entity_by_uid(uid: int) -> Optional["BaseEntity"]:
         return Factory._entity_registry_by_uid.get(uid, None)
 
     @staticmethod
-    def assign_new_uid_if_needed(entity: "BaseEntity") -> None:
-        if entity.uid == 0 or Factory._entity_registry_by_uid[entity.uid] is not entity:
-            entity.set_uid(Factory._generate_unique_id())
+    def is_alive(uid: int) -> bool:
+        """Проверяет, что сущность с этим uid существует и не уничтожена."""
+        return uid in Factory._entity_registry_by_uid
 
-        Factory._entity_registry_by_uid[entity.uid] = entity
+    @staticmethod
+    def assign_new_uid_if_needed(entity: "BaseEntity") -> None:
+        if entity.uid == 0 or Factory._entity_registry_by_uid.get(entity.uid) is not entity:
+            ComponentStore.detach(entity)
+            Factory._register(entity)
 
     @staticmethod
     def register_base_entity(data: Dict[str, Any]) -> "BaseEntity":
@@ -50,17 +181,189 @@ class Factory:
 
         entity = entity_class.restore(data)
         Factory._base_entity_registry[entity.id] = entity
+        Factory._spawn_templates[entity.id] = SpawnTemplate(entity_class, entity.dump())
 
         return entity
 
+    @staticmethod
+    def _get_spawn_template(id: str) -> Optional[SpawnTemplate]:
+        template = Factory._spawn_templates.get(id, None)
+        if template is None:
+            base_entity = Factory._base_entity_registry.get(id, None)
+            if base_entity is None:
+                return None
+
+            template = SpawnTemplate(type(base_entity), base_entity.dump())
+            Factory._spawn_templates[id] = template
+
+        return template
+
     @staticmethod
     def get_base_entity_copy(id: str) -> Optional["BaseEntity"]:
+        """Создает экземпляр прототипа по его шаблону.
+
+        Экземпляр регистрируется, как у create_entity: получает uid, попадает
+        в индексы компонентов и освобождается через destroy_entity.
+        """
+        template = Factory._get_spawn_template(id)
+
+        if template is None:
+            return None
+
+        new_entity = template.spawn()
+        Factory._register(new_entity)
+
+        return new_entity
+
+    @staticmethod
+    def get_base_entity_deepcopy(id: str) -> Optional["BaseEntity"]:
+        """Копирует прототип через copy.deepcopy.
+
+        Нужен для сущностей, чье состояние не переживает dump/restore.
+        Копия получает собственный uid, даже если он был у прототипа.
+        """
         base_entity = Factory._base_entity_registry.get(id, None)
 
         if base_entity is None:
             return None
 
         new_entity = copy.deepcopy(base_entity)
-        new_entity.set_uid(Factory._generate_unique_id())
+        Factory._register(new_entity)
 
         return new_entity
+
+    @staticmethod
+    def spawn_many(id: str, count: int) -> List["BaseEntity"]:
+        """Создает несколько экземпляров прототипа.
+
+        Args:
+            id (str): Id прототипа.
+            count (int): Количество экземпляров.
+
+        Raises:
+            ValueError: Если прототип не зарегистрирован.
+
+        Returns:
+            List[BaseEntity]: Новые зарегистрированные сущности.
+        """
+        template = Factory._get_spawn_template(id)
+
+        if template is None:
+            raise ValueError(f"Base entity {id} not found in registry")
+
+        entities = []
+        for _ in range(count):
+            entity = template.spawn()
+            Factory._register(entity)
+            entities.append(entity)
+
+        return entities
+
+    @staticmethod
+    def destroy_entity(entity: "BaseEntity") -> None:
+        """Уничтожает сущность: убирает ее из реестра и индексов компонентов.
+
+        Индекс uid освобождается и переиспользуется со следующим поколением,
+        так что сохраненный старый uid больше не находит сущность. Если для
+        типа сущности или ее компонентов включен пул, объекты возвращаются в
+        него. Убрать сущность с карты нужно до вызова. Если uid сущности
+        записан за другой сущностью (например, у копии через copy.deepcopy),
+        чужой индекс не освобождается.
+
+        Args:
+            entity (BaseEntity): Сущность, созданная через Factory.
+
+        Raises:
+            ValueError: Если у сущности нет uid (она не создавалась через Factory
+                или уже уничтожена).
+        """
+        uid = entity.uid
+        if uid == 0:
+            raise ValueError(f"Entity {entity.id} has no uid, nothing to destroy")
+
+        owned = Factory._entity_registry_by_uid.get(uid) is entity
+        if owned:
+            del Factory._entity_registry_by_uid[uid]
+            finalizer = Factory._finalizers.pop(uid, None)
+            if finalizer is not None:
+                finalizer.detach()
+
+        ComponentStore.detach(entity)
+        entity.set_uid(0)
+        if owned:
+            Factory._free_uid(uid)
+
+        for comp_type, comp in list(entity._components.items()):
+            entity.remove_component(comp_type)
+            pool = POOLS.get(comp_type)
+            if pool is not None:
+                pool.release(comp)
+
+        pool = POOLS.get(entity.type)
+        if pool is not None:
+            pool.release(entity)
+
+    @staticmethod
+    def enable_pool(
+        cls: Union[Type[BaseEntity], Type[BaseComponent]], limit: int = POOL_DEFAULT_LIMIT
+    ) -> None:
+        """Включает пул для зарегистрированного типа сущности или компонента.
+
+        Тип должен реализовать reset(data): заново инициализировать объект из
+        пула по данным, как restore. Сущность приходит без uid и компонентов,
+        компонент - без владельца. Типам со схемой полей reset генерируется
+        вместе со схемой.
+
+        Raises:
+            ValueError: Если тип не зарегистрирован или не реализует reset.
+        """
+        name = cls.__name__
+        if ENTITY_REGISTRY.get(name) is not cls and COMPONENT_REGISTRY.get(name) is not cls:
+            raise ValueError(f"Type {name} not found in registry")
+
+        if not hasattr(cls, "reset"):
+            raise ValueError(f"Type {name} must implement reset() to be pooled")
+
+        pool = POOLS.get(name)
+        if pool is None:
+            POOLS[name] = ObjectPool(limit)
+
+        else:
+            pool.limit = limit
+
+    @staticmethod
+    def disable_pool(cls: Union[Type[BaseEntity], Type[BaseComponent]]) -> None:
+        POOLS.pop(cls.__name__, None)
+
+    @staticmethod
+    def pool_stats() -> Dict[str, Dict[str, Any]]:
+        """Возвращает размер, попадания, промахи и долю попаданий пулов по типам."""
+        return {name: pool.stats() for name, pool in POOLS.items()}
+
+    @staticmethod
+    def set_weak_registry(enabled: bool) -> None:
+        """Переключает реестр uid и индексы компонентов на слабые ссылки.
+
+        В слабом режиме сущность, на которую больше никто не ссылается, сама
+        пропадает из реестра и запросов после сборки мусора, а ее индекс uid
+        освобождается. Цена: QueryView не кэширует список строк и собирает
+        его при каждом обращении.
+        """
+        if enabled == Factory._weak_registry:
+            return
+
+        entities = list(Factory._entity_registry_by_uid.items())
+        Factory._weak_registry = enabled
+        if enabled:
+            Factory._entity_registry_by_uid = weakref.WeakValueDictionary(entities)  # type: ignore
+            for _, entity in entities:
+                Factory._track(entity)
+
+        else:
+            Factory._entity_registry_by_uid = dict(entities)
+            for finalizer in Factory._finalizers.values():
+                finalizer.detach()
+
+            Factory._finalizers.clear()
+
+        ComponentStore.set_weak(enabled)
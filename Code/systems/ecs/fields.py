@@ -0,0 +1,84 @@
+from typing import Any, Dict, Tuple
+
+from .base_struct import BaseComponent, BaseEntity
+
+# Служебные атрибуты, которыми управляют BaseEntity/BaseComponent и Factory
+_SERVICE_FIELDS = frozenset(
+    ["__dict__", "__weakref__"]
+    + list(BaseEntity.__slots__)
+    + list(BaseComponent.__slots__)
+)
+
+_slot_cache: Dict[type, Tuple[str, ...]] = {}
+
+
+def slot_fields(cls: type) -> Tuple[str, ...]:
+    """Возвращает поля из __slots__ класса и его предков без служебных.
+
+    Результат кэшируется по классу.
+    """
+    fields = _slot_cache.get(cls)
+    if fields is None:
+        names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get("__slots__", ())
+            if isinstance(slots, str):
+                slots = (slots,)
+
+            for name in slots:
+                if name not in _SERVICE_FIELDS and name not in names:
+                    names.append(name)
+
+        fields = tuple(names)
+        _slot_cache[cls] = fields
+
+    return fields
+
+
+def dump_fields(obj: Any) -> Dict[str, Any]:
+    """Собирает поля объекта из __slots__ и __dict__ без служебных.
+
+    Подходит для dump сущностей и компонентов с __slots__ и без них.
+    Незаполненные слоты пропускаются.
+
+    Args:
+        obj (Any): Сущность или компонент.
+
+    Returns:
+        Dict[str, Any]: Имя поля -> значение.
+    """
+    data = {}
+    for name in slot_fields(type(obj)):
+        try:
+            data[name] = getattr(obj, name)
+
+        except AttributeError:
+            continue
+
+    instance_dict = getattr(obj, "__dict__", None)
+    if instance_dict:
+        for name, value in instance_dict.items():
+            if name not in _SERVICE_FIELDS:
+                data[name] = value
+
+    return data
+
+
+def restore_fields(obj: Any, data: Dict[str, Any]) -> None:
+    """Заполняет поля объекта значениями из data, обратное к dump_fields.
+
+    Ключи, которых нет ни в __slots__, ни в __dict__ объекта (например,
+    "type", "id", "components"), пропускаются.
+
+    Args:
+        obj (Any): Сущность или компонент, созданный конструктором.
+        data (Dict[str, Any]): Данные из dump.
+    """
+    fields = slot_fields(type(obj))
+    instance_dict = getattr(obj, "__dict__", None)
+    for name, value in data.items():
+        if name in _SERVICE_FIELDS:
+            continue
+
+        if name in fields or (instance_dict is not None and name in instance_dict):
+            setattr(obj, name, value)
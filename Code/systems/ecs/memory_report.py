@@ -0,0 +1,80 @@
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+from .base_struct import BaseComponent, BaseEntity
+from .factory import Factory
+from .fields import dump_fields
+
+TypeStats = Dict[str, Dict[str, Any]]
+
+
+def _object_size(obj: Any) -> int:
+    """Размер объекта, его __dict__ и значений его полей (без вложенности).
+
+    Значения, разделяемые несколькими объектами (интернированные строки,
+    координаты), учитываются у каждого владельца. Начиная с Python 3.11
+    обращение к __dict__ создает словарь, который до этого хранился внутри
+    объекта, поэтому для объектов без __slots__ оценка завышена.
+    """
+    size = sys.getsizeof(obj)
+    instance_dict = getattr(obj, "__dict__", None)
+    if instance_dict is not None:
+        size += sys.getsizeof(instance_dict)
+
+    for value in dump_fields(obj).values():
+        if not isinstance(value, (BaseEntity, BaseComponent)):
+            size += sys.getsizeof(value)
+
+    return size
+
+
+def _add(stats: TypeStats, obj: Any, size: int) -> None:
+    item = stats.setdefault(type(obj).__name__, {"count": 0, "bytes": 0, "dict_backed": 0})
+    item["count"] += 1
+    item["bytes"] += size
+    if hasattr(obj, "__dict__"):
+        item["dict_backed"] += 1
+
+
+def memory_report(entities: Optional[Iterable[BaseEntity]] = None) -> Dict[str, TypeStats]:
+    """Считает память сущностей и компонентов по типам.
+
+    Args:
+        entities (Optional[Iterable[BaseEntity]]): Сущности для подсчета. По
+            умолчанию - все живые сущности из реестра Factory.
+
+    Returns:
+        Dict[str, TypeStats]: Для "entities" и "components" - тип -> count,
+        bytes, per_instance и dict_backed (сколько экземпляров имеют __dict__).
+        Память компонентов в размер сущности не входит.
+    """
+    if entities is None:
+        entities = list(Factory._entity_registry_by_uid.values())
+
+    entity_stats: TypeStats = {}
+    component_stats: TypeStats = {}
+    for entity in entities:
+        _add(entity_stats, entity, _object_size(entity) + sys.getsizeof(entity._components))
+        for comp in entity._components.values():
+            _add(component_stats, comp, _object_size(comp))
+
+    for stats in (entity_stats, component_stats):
+        for item in stats.values():
+            item["per_instance"] = item["bytes"] / item["count"]
+
+    return {"entities": entity_stats, "components": component_stats}
+
+
+def format_memory_report(report: Dict[str, TypeStats]) -> str:
+    """Форматирует memory_report в таблицу для лога, по убыванию объема."""
+    lines: List[str] = []
+    for section, stats in report.items():
+        lines.append(f"{section}:")
+        lines.append(f"  {'type':<32}{'count':>10}{'bytes':>14}{'per item':>10}{'dict':>8}")
+        for name, item in sorted(stats.items(), key=lambda pair: -pair[1]["bytes"]):
+            lines.append(
+                f"  {name:<32}{item['count']:>10}{item['bytes']:>14}"
+                f"{item['per_instance']:>10.0f}{item['dict_backed']:>8}"
+            )
+
+    return "\n".join(lines)
@@ -0,0 +1,58 @@
+from typing import Any, Dict, List, Optional
+
+POOL_DEFAULT_LIMIT = 256
+
+# Пулы по имени класса сущности или компонента. Тип, которого здесь нет, не пулится
+POOLS: Dict[str, "ObjectPool"] = {}
+
+
+class ObjectPool:
+    """Ограниченный пул освобожденных объектов одного типа со счетчиками попаданий."""
+    __slots__ = ["limit", "hits", "misses", "dropped", "_free"]
+
+    def __init__(self, limit: int = POOL_DEFAULT_LIMIT) -> None:
+        self.limit: int = limit
+        self.hits: int = 0
+        self.misses: int = 0
+        self.dropped: int = 0
+        self._free: List[Any] = []
+
+    def acquire(self) -> Optional[Any]:
+        """Возвращает объект из пула или None, если пул пуст."""
+        if self._free:
+            self.hits += 1
+            return self._free.pop()
+
+        self.misses += 1
+        return None
+
+    def release(self, obj: Any) -> bool:
+        """Кладет объект в пул.
+
+        Returns:
+            bool: False, если пул полон и объект отброшен.
+        """
+        if len(self._free) >= self.limit:
+            self.dropped += 1
+            return False
+
+        self._free.append(obj)
+        return True
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._free),
+            "limit": self.limit,
+            "hits": self.hits,
+            "misses": self.misses,
+            "dropped": self.dropped,
+            "hit_rate": self.hit_rate,
+        }
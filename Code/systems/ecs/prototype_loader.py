@@ -0,0 +1,261 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import msgpack
+import yaml
+
+from .factory import Factory
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+
+except ImportError:  # PyYAML собран без libyaml
+    from yaml import SafeLoader as YamlLoader  # type: ignore
+
+CACHE_VERSION = 1
+PROTOTYPE_SUFFIXES = (".yml", ".yaml")
+
+
+class PrototypeLoader:
+    """Загружает прототипы сущностей из YAML-файлов с кэшем на диске.
+
+    Файлы ищутся рекурсивно во всех директориях roots. Разобранные и
+    проверенные прототипы каждого файла кэшируются в одном msgpack-файле.
+    Запись кэша действительна, пока у файла не изменились mtime и размер,
+    а если изменились - пока совпадает sha256 содержимого. Заново
+    разбираются только изменившиеся файлы.
+
+    Компоненты в YAML можно задавать списком (`- type: HealthComponent`)
+    или словарем по типу, в кэше и результате они всегда словарь, как
+    ожидает BaseEntity._restore_components.
+
+    Args:
+        roots (Iterable[Union[str, Path]]): Директории с прототипами.
+        cache_path (Optional[Union[str, Path]]): Файл кэша. None - без кэша.
+    """
+    __slots__ = ["_roots", "_cache_path", "stats"]
+
+    def __init__(
+        self, roots: Iterable[Union[str, Path]], cache_path: Optional[Union[str, Path]] = None
+    ) -> None:
+        self._roots = [Path(root) for root in roots]
+        self._cache_path = Path(cache_path) if cache_path is not None else None
+        self.stats: Dict[str, int] = {"files": 0, "parsed": 0, "cached": 0}
+
+    def iter_files(self) -> List[Path]:
+        files = []
+        for root in self._roots:
+            if root.is_dir():
+                files.extend(
+                    path for path in root.rglob("*")
+                    if path.suffix in PROTOTYPE_SUFFIXES and path.is_file()
+                )
+
+        return sorted(files)
+
+    def stale_files(self) -> List[Path]:
+        """Файлы, у которых mtime или размер не совпадают с кэшем.
+
+        Их можно заранее разобрать parse_prototype_file (например, в других
+        процессах) и передать результат в load.
+        """
+        entries = self._read_cache()
+        stale = []
+        for path in self.iter_files():
+            entry = entries.get(str(path))
+            stat = path.stat()
+            if entry is None or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                stale.append(path)
+
+        return stale
+
+    def load(
+        self, parsed: Optional[Dict[Path, Tuple[str, List[Dict[str, Any]]]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Возвращает все прототипы в порядке файлов.
+
+        Args:
+            parsed (Optional[Dict[Path, Tuple[str, List[Dict[str, Any]]]]]):
+                Результаты parse_prototype_file по путям. Используются, если
+                sha256 совпадает с текущим содержимым файла.
+
+        Raises:
+            ValueError: Если прототип в файле некорректен или id повторяется.
+
+        Returns:
+            List[Dict[str, Any]]: Данные прототипов для Factory.register_base_entity.
+        """
+        old_entries = self._read_cache()
+        new_entries: Dict[str, Dict[str, Any]] = {}
+        prototypes: List[Dict[str, Any]] = []
+        origins: Dict[str, Path] = {}
+        self.stats = {"files": 0, "parsed": 0, "cached": 0}
+
+        for path in self.iter_files():
+            entry = self._load_entry(path, old_entries.get(str(path)), (parsed or {}).get(path))
+            new_entries[str(path)] = entry
+            self.stats["files"] += 1
+
+            for prototype in msgpack.unpackb(entry["blob"], strict_map_key=False):
+                other = origins.setdefault(prototype["id"], path)
+                if other is not path:
+                    raise ValueError(
+                        f"Prototype id {prototype['id']!r} in {path} is already defined in {other}"
+                    )
+
+                prototypes.append(prototype)
+
+        if new_entries != old_entries:
+            self._write_cache(new_entries)
+
+        return prototypes
+
+    def register_all(self) -> int:
+        """Загружает прототипы и регистрирует их в Factory.
+
+        Returns:
+            int: Количество зарегистрированных прототипов.
+        """
+        prototypes = self.load()
+        for prototype in prototypes:
+            Factory.register_base_entity(prototype)
+
+        return len(prototypes)
+
+    def _load_entry(
+        self,
+        path: Path,
+        entry: Optional[Dict[str, Any]],
+        parsed: Optional[Tuple[str, List[Dict[str, Any]]]],
+    ) -> Dict[str, Any]:
+        stat = path.stat()
+        if entry is not None and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            self.stats["cached"] += 1
+            return entry
+
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        if entry is not None and entry["hash"] == digest:
+            self.stats["cached"] += 1
+            return {**entry, "mtime": stat.st_mtime_ns, "size": stat.st_size}
+
+        self.stats["parsed"] += 1
+        if parsed is not None and parsed[0] == digest:
+            prototypes = parsed[1]
+
+        else:
+            prototypes = parse_prototypes(raw, path)
+
+        try:
+            blob = msgpack.packb(prototypes)
+
+        except TypeError as err:
+            raise ValueError(f"Prototype file {path} contains unsupported values: {err}") from err
+
+        return {"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": digest, "blob": blob}
+
+    def _read_cache(self) -> Dict[str, Dict[str, Any]]:
+        if self._cache_path is None or not self._cache_path.is_file():
+            return {}
+
+        try:
+            cache = msgpack.unpackb(self._cache_path.read_bytes())
+
+        except (ValueError, msgpack.UnpackException):
+            return {}
+
+        if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+            return {}
+
+        return cache["files"]
+
+    def _write_cache(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        if self._cache_path is None:
+            return
+
+        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._cache_path.with_name(self._cache_path.name + ".tmp")
+        temp_path.write_bytes(msgpack.packb({"version": CACHE_VERSION, "files": entries}))
+        os.replace(temp_path, self._cache_path)
+
+
+def parse_prototype_file(path: Union[str, Path]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Читает и разбирает файл прототипов.
+
+    Returns:
+        Tuple[str, List[Dict[str, Any]]]: sha256 содержимого и прототипы.
+    """
+    raw = Path(path).read_bytes()
+    return hashlib.sha256(raw).hexdigest(), parse_prototypes(raw, path)
+
+
+def parse_prototypes(raw: Union[bytes, str], path: Union[str, Path] = "<string>") -> List[Dict[str, Any]]:
+    """Разбирает и проверяет YAML-файл прототипов.
+
+    Args:
+        raw (Union[bytes, str]): Содержимое файла.
+        path (Union[str, Path]): Путь к файлу для сообщений об ошибках.
+
+    Raises:
+        ValueError: Если файл не является списком прототипов или у прототипа
+            нет type/id, либо компоненты заданы неверно.
+
+    Returns:
+        List[Dict[str, Any]]: Прототипы с компонентами в виде словаря.
+    """
+    try:
+        document = yaml.load(raw, Loader=YamlLoader)
+
+    except yaml.YAMLError as err:
+        raise ValueError(f"Invalid YAML in prototype file {path}: {err}") from err
+
+    if document is None:
+        return []
+
+    if not isinstance(document, list):
+        raise ValueError(f"Prototype file {path} must contain a list of prototypes")
+
+    return [_normalize_prototype(item, path) for item in document]
+
+
+def _normalize_prototype(item: Any, path: Union[str, Path]) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        raise ValueError(f"Prototype in {path} must be a mapping")
+
+    for key in ("type", "id"):
+        if item.get(key) in (None, ""):
+            raise ValueError(f"Prototype in {path} has no {key!r}")
+
+    prototype = dict(item)
+    prototype["id"] = str(prototype["id"])
+    components = prototype.get("components") or {}
+
+    if isinstance(components, list):
+        by_type = {}
+        for comp in components:
+            if not isinstance(comp, dict) or not comp.get("type"):
+                raise ValueError(f"Component of prototype {prototype['id']!r} in {path} has no 'type'")
+
+            if comp["type"] in by_type:
+                raise ValueError(
+                    f"Prototype {prototype['id']!r} in {path} has duplicate component {comp['type']}"
+                )
+
+            by_type[comp["type"]] = comp
+
+        components = by_type
+
+    elif isinstance(components, dict):
+        # Список значений - упакованная форма компонента со схемой
+        components = {
+            comp_type: comp if isinstance(comp, list) else {"type": comp_type, **(comp or {})}
+            for comp_type, comp in components.items()
+        }
+
+    else:
+        raise ValueError(f"Components of prototype {prototype['id']!r} in {path} must be a list or mapping")
+
+    prototype["components"] = components
+    return prototype
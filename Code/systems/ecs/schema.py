@@ -0,0 +1,382 @@
+import abc
+import copy
+import typing
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+_MISSING = object()
+_MUTABLE_TYPES = (list, dict, set, bytearray)
+
+
+class FieldCodec(NamedTuple):
+    """Преобразование значения поля схемы при записи и чтении.
+
+    Поле объявляется как Annotated[тип, FieldCodec(encode, decode)]: dump и
+    dump_values пишут encode(значение), restore и restore_values читают
+    decode(данные). Значение по умолчанию не декодируется.
+    """
+    encode: Callable[[Any], Any]
+    decode: Callable[[Any], Any]
+
+
+class SchemaField(NamedTuple):
+    name: str
+    annotation: Any
+    default: Any
+    codec: Optional[FieldCodec] = None
+
+    @property
+    def required(self) -> bool:
+        return self.default is _MISSING
+
+
+def schema_fields(cls: type) -> Tuple[SchemaField, ...]:
+    """Собирает поля схемы из аннотаций класса и его предков.
+
+    Полем считается публичный атрибут с аннотацией на уровне класса, кроме
+    ClassVar. Значение атрибута класса становится значением по умолчанию,
+    FieldCodec из Annotated - преобразованием поля.
+    """
+    fields: Dict[str, SchemaField] = {}
+    for klass in reversed(cls.__mro__):
+        annotations = klass.__dict__.get("__annotations__", {})
+        for name, annotation in annotations.items():
+            if name.startswith("_") or _is_class_var(annotation):
+                continue
+
+            default = klass.__dict__.get(name, _MISSING)
+            # Слот на уровне класса - это дескриптор, а не значение по умолчанию
+            if hasattr(default, "__get__") and not callable(default):
+                default = _MISSING
+
+            fields[name] = SchemaField(name, annotation, default, _field_codec(annotation))
+
+    return tuple(fields.values())
+
+
+def _field_codec(annotation: Any) -> Optional[FieldCodec]:
+    if typing.get_origin(annotation) is not typing.Annotated:
+        return None
+
+    return next((meta for meta in annotation.__metadata__ if isinstance(meta, FieldCodec)), None)
+
+
+def _is_class_var(annotation: Any) -> bool:
+    if isinstance(annotation, str):
+        return annotation.startswith(("ClassVar", "typing.ClassVar"))
+
+    return typing.get_origin(annotation) is typing.ClassVar
+
+
+def _function(method: Any) -> Any:
+    return getattr(method, "__func__", method)
+
+
+def _is_replaceable(cls: type, name: str, base: type) -> bool:
+    """Можно ли сгенерировать метод: класс не задал его сам, а унаследованный -
+    абстрактный, взят у базового класса base (или нет ни там, ни там) или
+    сгенерирован для предка."""
+    if name in cls.__dict__:
+        return False
+
+    method = _function(getattr(cls, name, None))
+    return (
+        method is _function(getattr(base, name, None))
+        or getattr(method, "__isabstractmethod__", False)
+        or getattr(method, "_schema_generated", False)
+    )
+
+
+def _install(cls: type, namespace: Dict[str, Any], names: Tuple[str, ...]) -> None:
+    for name in names:
+        func = namespace[name]
+        func._schema_generated = True
+        setattr(cls, name, classmethod(func) if name.startswith("restore") else func)
+
+    abc.update_abstractmethods(cls)
+
+
+class _Codegen:
+    """Собирает исходный код функций и общее пространство имен для exec."""
+    __slots__ = ["namespace", "lines"]
+
+    def __init__(self, cls: type) -> None:
+        self.namespace: Dict[str, Any] = {"cls": cls, "_deepcopy": copy.deepcopy}
+        self.lines: List[str] = []
+
+    def default_expr(self, field: SchemaField) -> str:
+        key = f"_d_{field.name}"
+        self.namespace[key] = field.default
+        if isinstance(field.default, _MUTABLE_TYPES):
+            return f"_deepcopy({key})"
+
+        return key
+
+    def encode_expr(self, field: SchemaField, value: str) -> str:
+        if field.codec is None:
+            return value
+
+        self.namespace[f"_enc_{field.name}"] = field.codec.encode
+        return f"_enc_{field.name}({value})"
+
+    def decode_expr(self, field: SchemaField, value: str) -> str:
+        if field.codec is None:
+            return value
+
+        self.namespace[f"_dec_{field.name}"] = field.codec.decode
+        return f"_dec_{field.name}({value})"
+
+    def value_expr(self, field: SchemaField) -> str:
+        value = self.decode_expr(field, f"data[{field.name!r}]")
+        if field.required:
+            return value
+
+        if isinstance(field.default, _MUTABLE_TYPES) or field.codec is not None:
+            # Копия значения по умолчанию и декодирование нужны только по
+            # своей ветке
+            return f"{value} if {field.name!r} in data else {self.default_expr(field)}"
+
+        return f"data.get({field.name!r}, {self.default_expr(field)})"
+
+    def values_unpack(self, fields: Tuple[SchemaField, ...], target: str) -> List[str]:
+        """Строки, раскладывающие список values по полям. target - объект,
+        в атрибуты которого пишутся значения, или None: тогда значения
+        остаются в локальных _v0, _v1, ... (уже декодированными)."""
+        targets = [
+            f"{target}.{field.name}" if target and field.codec is None else f"_v{i}"
+            for i, field in enumerate(fields)
+        ]
+        lines = [f"    {', '.join(targets)}, = values"]
+        for i, field in enumerate(fields):
+            if field.codec is not None:
+                value = self.decode_expr(field, f"_v{i}")
+                lines.append(f"    {target}.{field.name} = {value}" if target else f"    _v{i} = {value}")
+
+        return lines
+
+    def call_args(self, fields: Tuple[SchemaField, ...], values: List[str]) -> str:
+        return ", ".join(f"{field.name}={value}" for field, value in zip(fields, values))
+
+    def init_signature(self, fields: Tuple[SchemaField, ...]) -> str:
+        params = [
+            field.name if field.required else f"{field.name}=_MISSING" for field in fields
+        ]
+        # Обязательное поле после необязательного можно передать только по имени
+        first_optional = next(
+            (i for i, field in enumerate(fields) if not field.required), len(fields)
+        )
+        if any(field.required for field in fields[first_optional:]):
+            params.insert(0, "*")
+
+        self.namespace["_MISSING"] = _MISSING
+        return ", ".join(params)
+
+    def init_assignments(self, fields: Tuple[SchemaField, ...]) -> List[str]:
+        body = []
+        for field in fields:
+            if field.required:
+                body.append(f"    self.{field.name} = {field.name}")
+
+            else:
+                body.append(
+                    f"    self.{field.name} = {self.default_expr(field)} "
+                    f"if {field.name} is _MISSING else {field.name}"
+                )
+
+        return body
+
+    def add(self, *lines: str) -> None:
+        self.lines.extend(lines)
+        self.lines.append("")
+
+    def build(self) -> Dict[str, Callable]:
+        exec("\n".join(self.lines), self.namespace)
+        return self.namespace
+
+
+def compile_component_schema(cls: type) -> None:
+    """Генерирует __init__, dump, restore, reset и упакованную форму компонента.
+
+    Работает, если у класса есть поля схемы, а dump и restore он не реализует
+    сам. Кроме словаря, компонент получает dump_values()/restore_values():
+    значения полей списком в порядке схемы, компактная форма для msgpack.
+    Если класс задает __init__ сам, restore и reset вызывают его с полями
+    схемы по имени, иначе объект собирается без вызова __init__.
+    """
+    from .base_struct import BaseComponent
+
+    fields = schema_fields(cls)
+    if not fields or not all(
+        _is_replaceable(cls, name, BaseComponent) for name in ("dump", "restore")
+    ):
+        return
+
+    gen = _Codegen(cls)
+    type_name = cls.__name__
+    names = [field.name for field in fields]
+    methods = ["dump", "restore", "dump_values", "restore_values"]
+    own_init = not _is_replaceable(cls, "__init__", BaseComponent)
+    data_values = [gen.value_expr(field) for field in fields]
+
+    if not own_init:
+        methods.append("__init__")
+        gen.add(
+            f"def __init__(self, {gen.init_signature(fields)}):",
+            "    self._owner = None",
+            *gen.init_assignments(fields),
+        )
+
+    if _is_replaceable(cls, "reset", BaseComponent):
+        methods.append("reset")
+        if own_init:
+            gen.add("def reset(self, data):", f"    self.__init__({gen.call_args(fields, data_values)})")
+
+        else:
+            gen.add(
+                "def reset(self, data):",
+                *[f"    self.{name} = {value}" for name, value in zip(names, data_values)],
+            )
+
+    gen.add(
+        "def dump(self):",
+        "    return {" + ", ".join(
+            [f"'type': {type_name!r}"]
+            + [f"{field.name!r}: {gen.encode_expr(field, f'self.{field.name}')}" for field in fields]
+        ) + "}",
+    )
+    gen.add(
+        "def dump_values(self):",
+        "    return [" + ", ".join(gen.encode_expr(field, f"self.{field.name}") for field in fields) + "]",
+    )
+    gen.namespace["_restore_values_partial"] = _restore_values_partial
+    if own_init:
+        gen.add("def restore(cls, data):", f"    return cls({gen.call_args(fields, data_values)})")
+        gen.add(
+            "def restore_values(cls, values):",
+            f"    if len(values) != {len(names)}:",
+            "        return _restore_values_partial(cls, values)",
+            *gen.values_unpack(fields, ""),
+            f"    return cls({gen.call_args(fields, [f'_v{i}' for i in range(len(fields))])})",
+        )
+
+    else:
+        gen.add(
+            "def restore(cls, data):",
+            "    self = cls.__new__(cls)",
+            "    self._owner = None",
+            *[f"    self.{name} = {value}" for name, value in zip(names, data_values)],
+            "    return self",
+        )
+        gen.add(
+            "def restore_values(cls, values):",
+            f"    if len(values) != {len(names)}:",
+            "        return _restore_values_partial(cls, values)",
+            "    self = cls.__new__(cls)",
+            "    self._owner = None",
+            *gen.values_unpack(fields, "self"),
+            "    return self",
+        )
+
+    _install(cls, gen.build(), tuple(methods))
+    cls.schema_names = tuple(names)
+
+
+def _restore_values_partial(cls: type, values: List[Any]) -> Any:
+    """Восстанавливает компонент из списка короче схемы: недостающие поля в
+    конце берутся по умолчанию. Так читаются данные, записанные до
+    добавления полей в конец схемы.
+
+    Raises:
+        ValueError: Если значений больше, чем полей, или не хватает
+            обязательного поля.
+    """
+    names = cls.schema_names  # type: ignore
+    if len(values) > len(names):
+        raise ValueError(f"{cls.__name__} expects at most {len(names)} values, got {len(values)}")
+
+    try:
+        return cls.restore(dict(zip(names, values)))  # type: ignore
+
+    except KeyError as err:
+        raise ValueError(f"{cls.__name__} is missing required field {err}") from None
+
+
+def compile_entity_schema(cls: type) -> None:
+    """Генерирует __init__, dump, restore и reset сущности по полям схемы.
+
+    Работает, если у класса есть поля схемы, а dump и restore он не реализует
+    сам. Компоненты сущности пишутся и восстанавливаются как обычно, а
+    dump_values() дает значения собственных полей списком в порядке схемы.
+    Свой __init__ класса вызывается так же, как у компонентов.
+    """
+    from .base_struct import BaseEntity
+
+    fields = schema_fields(cls)
+    if not fields or not all(
+        _is_replaceable(cls, name, BaseEntity) for name in ("dump", "restore")
+    ):
+        return
+
+    gen = _Codegen(cls)
+    type_name = cls.__name__
+    names = [field.name for field in fields]
+    methods = ["dump", "restore", "dump_values"]
+    own_init = not _is_replaceable(cls, "__init__", BaseEntity)
+    data_values = [gen.value_expr(field) for field in fields]
+    init_call = f"id=data['id'], {gen.call_args(fields, data_values)}"
+
+    if not own_init:
+        methods.append("__init__")
+        gen.add(
+            f"def __init__(self, id='', {gen.init_signature(fields)}):",
+            "    self._id = id",
+            "    self._uid = 0",
+            "    self._components = {}",
+            *gen.init_assignments(fields),
+        )
+
+    if _is_replaceable(cls, "reset", BaseEntity):
+        methods.append("reset")
+        if own_init:
+            body = [f"    self.__init__({init_call})"]
+
+        else:
+            body = [
+                "    self._id = data['id']",
+                *[f"    self.{name} = {value}" for name, value in zip(names, data_values)],
+            ]
+
+        gen.add("def reset(self, data):", *body, "    self._restore_components(self, data)")
+
+    gen.add(
+        "def dump(self):",
+        "    return {" + ", ".join(
+            ["'id': self._id", f"'type': {type_name!r}"]
+            + [f"{field.name!r}: {gen.encode_expr(field, f'self.{field.name}')}" for field in fields]
+            + ["'components': {name: comp.dump() for name, comp in self._components.items()}"]
+        ) + "}",
+    )
+    gen.add(
+        "def dump_values(self):",
+        "    return [" + ", ".join(gen.encode_expr(field, f"self.{field.name}") for field in fields) + "]",
+    )
+    if own_init:
+        body = [f"    self = cls({init_call})"]
+
+    else:
+        body = [
+            "    self = cls.__new__(cls)",
+            "    self._id = data['id']",
+            "    self._uid = 0",
+            "    self._components = {}",
+            *[f"    self.{name} = {value}" for name, value in zip(names, data_values)],
+        ]
+
+    gen.add(
+        "def restore(cls, data):",
+        *body,
+        "    cls._restore_components(self, data)",
+        "    return self",
+    )
+
+    _install(cls, gen.build(), tuple(methods))
+    cls.schema_names = tuple(names)
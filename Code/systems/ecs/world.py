@@ -0,0 +1,163 @@
+import weakref
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from .base_struct import BaseComponent, BaseEntity
+from .component_store import ComponentStore
+
+ComponentKey = Union[str, Type[BaseComponent]]
+
+
+class QueryView:
+    """Закэшированный результат запроса по набору типов компонентов.
+
+    Состав обновляется точечно из хуков add_component/remove_component и при
+    регистрации сущностей, без повторного обхода индексов. Итерация идет по
+    снимку, поэтому внутри цикла можно менять компоненты: изменения будут
+    видны при следующем обходе.
+    """
+    __slots__ = ["_types", "_rows", "_snapshot", "_weak"]
+
+    def __init__(self, comp_types: Tuple[str, ...]) -> None:
+        self._types: Tuple[str, ...] = comp_types
+        # uid -> строка результата, а в слабом режиме uid -> сущность
+        self._rows: Dict[int, Any] = {}
+        self._snapshot: Optional[List[Tuple[BaseEntity, ...]]] = None
+        self._weak: bool = False
+
+        for row in ComponentStore.query(*comp_types):
+            self._rows[row[0].uid] = row
+
+        self._set_weak(ComponentStore._weak)
+
+    @property
+    def types(self) -> Tuple[str, ...]:
+        return self._types
+
+    def _update(self, entity: BaseEntity) -> None:
+        components = entity._components
+        row: List[Any] = [entity]
+        for comp_type in self._types:
+            comp = components.get(comp_type)
+            if comp is None:
+                self._discard(entity.uid)
+                return
+
+            row.append(comp)
+
+        self._rows[entity.uid] = entity if self._weak else tuple(row)
+        self._snapshot = None
+
+    def _discard(self, uid: int) -> None:
+        if self._rows.pop(uid, None) is not None:
+            self._snapshot = None
+
+    def _reset(self) -> None:
+        self._rows.clear()
+        self._snapshot = None
+
+    def _set_weak(self, enabled: bool) -> None:
+        # Строки и снимок держали бы сущности сильными ссылками, поэтому в слабом
+        # режиме хранятся только слабые ссылки на сущности, а строки собираются
+        # при каждом обращении
+        if enabled == self._weak:
+            return
+
+        entities = list(self._rows.values()) if self._weak else [row[0] for row in self._rows.values()]
+        self._weak = enabled
+        self._snapshot = None
+        self._rows = weakref.WeakValueDictionary() if enabled else {}  # type: ignore
+        for entity in entities:
+            self._update(entity)
+
+    def rows(self) -> List[Tuple[BaseEntity, ...]]:
+        """Возвращает кортежи (сущность, компоненты в порядке типов запроса).
+
+        Список пересобирается только после изменения состава (в слабом режиме -
+        при каждом вызове), его нельзя менять.
+        """
+        if self._weak:
+            types = self._types
+            return [
+                (entity, *[entity._components[comp_type] for comp_type in types])
+                for entity in list(self._rows.values())
+            ]
+
+        if self._snapshot is None:
+            self._snapshot = list(self._rows.values())
+
+        return self._snapshot
+
+    def entities(self) -> List[BaseEntity]:
+        return [row[0] for row in self.rows()]
+
+    def __iter__(self) -> Iterator[Tuple[BaseEntity, ...]]:
+        return iter(self.rows())
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, entity: BaseEntity) -> bool:
+        row = self._rows.get(entity.uid)
+        if row is None:
+            return False
+
+        return (row if self._weak else row[0]) is entity
+
+    def __repr__(self) -> str:
+        return f"QueryView(types={self._types}, size={len(self._rows)})"
+
+
+class World:
+    """Точка входа для запросов по компонентам зарегистрированных сущностей."""
+    __slots__ = []
+
+    _views: Dict[Tuple[ComponentKey, ...], QueryView] = {}
+
+    @staticmethod
+    def query(*comp_types: ComponentKey) -> QueryView:
+        """Возвращает представление сущностей со всеми указанными компонентами.
+
+        Повторный запрос с теми же типами возвращает тот же объект, который
+        поддерживается в актуальном состоянии.
+
+        Args:
+            *comp_types (ComponentKey): Классы компонентов или их имена.
+
+        Raises:
+            ValueError: Если не указан ни один тип.
+
+        Returns:
+            QueryView: Представление результата.
+        """
+        view = World._views.get(comp_types)
+        if view is None:
+            view = World._create_view(comp_types)
+
+        return view
+
+    @staticmethod
+    def _create_view(comp_types: Tuple[ComponentKey, ...]) -> QueryView:
+        if not comp_types:
+            raise ValueError("At least one component type is required")
+
+        names = tuple(
+            comp_type if isinstance(comp_type, str) else comp_type.get_type()
+            for comp_type in comp_types
+        )
+        view = World._views.get(names)
+        if view is None:
+            view = QueryView(names)
+            ComponentStore.watch(view)
+            World._views[names] = view
+
+        World._views[comp_types] = view
+        return view
+
+    @staticmethod
+    def clear() -> None:
+        """Сбрасывает индексы компонентов и забывает все представления."""
+        for view in set(World._views.values()):
+            ComponentStore.unwatch(view)
+
+        World._views.clear()
+        ComponentStore.clear()
@@ -0,0 +1,2 @@
+from .loc_parser import (iter_loc_files, load_locales, merge_locales, parse_loc,
+                         parse_loc_file)
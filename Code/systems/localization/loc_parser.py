@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+LOC_SUFFIX = ".loc"
+
+
+def parse_loc(text: str, path: Union[str, Path] = "<string>") -> Dict[str, str]:
+    """Разбирает файл локализации из строк вида `ключ = значение`.
+
+    Пустые строки и строки, начинающиеся с #, пропускаются. Пробелы вокруг
+    ключа и значения отбрасываются.
+
+    Args:
+        text (str): Содержимое файла.
+        path (Union[str, Path]): Путь к файлу для сообщений об ошибках.
+
+    Raises:
+        ValueError: Если строка без `=`, с пустым ключом или ключ повторяется.
+
+    Returns:
+        Dict[str, str]: Ключ -> текст.
+    """
+    entries: Dict[str, str] = {}
+    for number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        key, sep, value = line.partition("=")
+        key = key.strip()
+        if not sep or not key:
+            raise ValueError(f"Invalid localization line {number} in {path}: {line!r}")
+
+        if key in entries:
+            raise ValueError(f"Duplicate localization key {key!r} at line {number} in {path}")
+
+        entries[key] = value.strip()
+
+    return entries
+
+
+def parse_loc_file(path: Union[str, Path]) -> Dict[str, str]:
+    path = Path(path)
+    return parse_loc(path.read_text(encoding="utf-8"), path)
+
+
+def iter_loc_files(base_path: Union[str, Path]) -> List[Tuple[str, Path]]:
+    """Возвращает пары (язык, файл) для всех .loc файлов в base_path/<язык>/.
+
+    Порядок детерминирован: по языку, затем по пути файла.
+    """
+    base_path = Path(base_path)
+    if not base_path.is_dir():
+        return []
+
+    files = []
+    for lang_dir in sorted(path for path in base_path.iterdir() if path.is_dir()):
+        for path in sorted(lang_dir.rglob(f"*{LOC_SUFFIX}")):
+            files.append((lang_dir.name, path))
+
+    return files
+
+
+def merge_locales(parsed: Iterable[Tuple[str, Path, Dict[str, str]]]) -> Dict[str, Dict[str, str]]:
+    """Собирает таблицы языков из разобранных файлов.
+
+    Args:
+        parsed (Iterable[Tuple[str, Path, Dict[str, str]]]): Тройки
+            (язык, файл, ключи) в порядке iter_loc_files.
+
+    Raises:
+        ValueError: Если ключ одного языка задан в нескольких файлах.
+
+    Returns:
+        Dict[str, Dict[str, str]]: Язык -> ключ -> текст.
+    """
+    locales: Dict[str, Dict[str, str]] = {}
+    origins: Dict[Tuple[str, str], Path] = {}
+    for lang, path, entries in parsed:
+        table = locales.setdefault(lang, {})
+        for key, value in entries.items():
+            other = origins.setdefault((lang, key), path)
+            if other != path:
+                raise ValueError(f"Localization key {key!r} in {path} is already defined in {other}")
+
+            table[key] = value
+
+    return locales
+
+
+def load_locales(base_path: Union[str, Path]) -> Dict[str, Dict[str, str]]:
+    """Загружает все языки из base_path (например, Content/loc)."""
+    return merge_locales(
+        (lang, path, parse_loc_file(path)) for lang, path in iter_loc_files(base_path)
+    )
@@ -0,0 +1,424 @@
+import heapq
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from systems.ecs import BaseEntity
+
+from .coordinate import pack_xy
+
+try:
+    import numpy as np
+
+except ImportError:
+    np = None
+
+
+CHUNK_SHIFT = 4
+CHUNK_SIZE = 1 << CHUNK_SHIFT
+CHUNK_MASK = CHUNK_SIZE - 1
+
+# Сущности клетки. Обычно их единицы, и список заметно компактнее словаря;
+# клетка, в которой набралось больше BUCKET_SET_THRESHOLD сущностей,
+# переводится на словарь-множество с удалением за O(1)
+Bucket = Union[List[BaseEntity], Dict[BaseEntity, None]]
+BUCKET_SET_THRESHOLD = 8
+
+# Меньше пар "запрос x клетка" в чанке дешевле проверить без NumPy
+NUMPY_BATCH_THRESHOLD = 64
+
+
+class Chunk:
+    """Квадрат карты CHUNK_SIZE x CHUNK_SIZE клеток.
+
+    Клетки хранятся по локальному индексу `(ly << CHUNK_SHIFT) | lx`, поэтому
+    ключи словаря - маленькие int'ы, а пустые клетки не занимают памяти.
+    """
+    __slots__ = ["cx", "cy", "cells"]
+
+    def __init__(self, cx: int, cy: int) -> None:
+        self.cx: int = cx
+        self.cy: int = cy
+        self.cells: Dict[int, Bucket] = {}
+
+    @property
+    def origin(self) -> Tuple[int, int]:
+        return self.cx << CHUNK_SHIFT, self.cy << CHUNK_SHIFT
+
+    def iter_cells(self) -> Iterator[Tuple[int, int, Bucket]]:
+        """Итерирует занятые клетки чанка в мировых координатах.
+
+        Yields:
+            Tuple[int, int, Bucket]: x, y и сущности клетки.
+        """
+        base_x, base_y = self.origin
+        for index, bucket in self.cells.items():
+            yield base_x + (index & CHUNK_MASK), base_y + (index >> CHUNK_SHIFT), bucket
+
+
+class ChunkStorage:
+    """Разреженное хранилище сущностей карты, разбитое на чанки.
+
+    Чанк создается при первой сущности в нем и удаляется вместе с последней.
+    """
+    __slots__ = ["_chunks", "_bounds"]
+
+    def __init__(self) -> None:
+        # Ключ чанка - pack_xy(cx, cy)
+        self._chunks: Dict[int, Chunk] = {}
+        # Границы когда-либо выделенных чанков (min_cx, min_cy, max_cx, max_cy).
+        # При удалении чанков не сужаются, поэтому всегда покрывают все чанки.
+        self._bounds: Optional[Tuple[int, int, int, int]] = None
+
+    def __len__(self) -> int:
+        return sum(len(chunk.cells) for chunk in self._chunks.values())
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._chunks)
+
+    @staticmethod
+    def split(x: int, y: int) -> Tuple[int, int]:
+        """Разбивает мировую координату на ключ чанка и локальный индекс клетки.
+
+        Args:
+            x (int): Координата X.
+            y (int): Координата Y.
+
+        Returns:
+            Tuple[int, int]: Упакованный ключ чанка и индекс клетки внутри него.
+        """
+        return pack_xy(x >> CHUNK_SHIFT, y >> CHUNK_SHIFT), ((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)
+
+    def add(self, x: int, y: int, entity: BaseEntity) -> None:
+        key, index = self.split(x, y)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = Chunk(x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+            self._chunks[key] = chunk
+            self._extend_bounds(chunk.cx, chunk.cy)
+
+        bucket = chunk.cells.get(index)
+        if bucket is None:
+            chunk.cells[index] = [entity]
+
+        elif bucket.__class__ is dict:
+            bucket[entity] = None  # type: ignore
+
+        elif entity not in bucket:
+            if len(bucket) < BUCKET_SET_THRESHOLD:
+                bucket.append(entity)  # type: ignore
+
+            else:
+                bucket = dict.fromkeys(bucket)
+                bucket[entity] = None
+                chunk.cells[index] = bucket
+
+    def remove(self, x: int, y: int, entity: BaseEntity) -> bool:
+        key, index = self.split(x, y)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            return False
+
+        bucket = chunk.cells.get(index)
+        if bucket is None or entity not in bucket:
+            return False
+
+        if bucket.__class__ is dict:
+            del bucket[entity]  # type: ignore
+
+        else:
+            bucket.remove(entity)  # type: ignore
+
+        if not bucket:
+            del chunk.cells[index]
+
+            if not chunk.cells:
+                del self._chunks[key]
+
+        return True
+
+    def move(self, old_x: int, old_y: int, new_x: int, new_y: int, entity: BaseEntity) -> bool:
+        """Переносит сущность между клетками без пересоздания ее данных.
+
+        Returns:
+            bool: False, если в исходной клетке сущности нет.
+        """
+        if not self.remove(old_x, old_y, entity):
+            return False
+
+        self.add(new_x, new_y, entity)
+        return True
+
+    def _extend_bounds(self, cx: int, cy: int) -> None:
+        if self._bounds is None:
+            self._bounds = (cx, cy, cx, cy)
+            return
+
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+        self._bounds = (min(min_cx, cx), min(min_cy, cy), max(max_cx, cx), max(max_cy, cy))
+
+    def get(self, x: int, y: int) -> Optional[Bucket]:
+        key, index = self.split(x, y)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            return None
+
+        return chunk.cells.get(index)
+
+    def get_chunk(self, cx: int, cy: int) -> Optional[Chunk]:
+        return self._chunks.get(pack_xy(cx, cy))
+
+    def iter_chunks(self) -> Iterator[Chunk]:
+        return iter(self._chunks.values())
+
+    def iter_chunks_in_rect(
+        self, min_x: int, min_y: int, max_x: int, max_y: int
+    ) -> Iterator[Chunk]:
+        """Итерирует существующие чанки, пересекающие прямоугольник (границы включительно).
+
+        Если прямоугольник покрывает больше чанков, чем выделено на карте,
+        перебираются выделенные чанки, а не ключи прямоугольника.
+        """
+        min_cx, max_cx = min_x >> CHUNK_SHIFT, max_x >> CHUNK_SHIFT
+        min_cy, max_cy = min_y >> CHUNK_SHIFT, max_y >> CHUNK_SHIFT
+
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self._chunks):
+            for chunk in list(self._chunks.values()):
+                if min_cx <= chunk.cx <= max_cx and min_cy <= chunk.cy <= max_cy:
+                    yield chunk
+
+            return
+
+        chunks = self._chunks
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                chunk = chunks.get(pack_xy(cx, cy))
+                if chunk is not None:
+                    yield chunk
+
+    def iter_cells(self) -> Iterator[Tuple[int, int, Bucket]]:
+        for chunk in list(self._chunks.values()):
+            yield from chunk.iter_cells()
+
+    def iter_cells_in_rect(
+        self, min_x: int, min_y: int, max_x: int, max_y: int
+    ) -> Iterator[Tuple[int, int, Bucket]]:
+        """Итерирует занятые клетки внутри прямоугольника (границы включительно).
+
+        Чанки, целиком лежащие в прямоугольнике, отдаются без проверки клеток.
+
+        Yields:
+            Tuple[int, int, Bucket]: x, y и сущности клетки.
+        """
+        for chunk in self.iter_chunks_in_rect(min_x, min_y, max_x, max_y):
+            base_x, base_y = chunk.origin
+            if (
+                min_x <= base_x and base_x + CHUNK_MASK <= max_x
+                and min_y <= base_y and base_y + CHUNK_MASK <= max_y
+            ):
+                yield from chunk.iter_cells()
+                continue
+
+            for x, y, bucket in chunk.iter_cells():
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    yield x, y, bucket
+
+    def iter_cells_in_radius(
+        self, cx: int, cy: int, radius: float
+    ) -> Iterator[Tuple[int, int, Bucket]]:
+        """Итерирует занятые клетки на расстоянии не больше `radius` от точки.
+
+        Расстояния сравниваются в квадрате. Чанки вне круга отбрасываются целиком,
+        чанки внутри круга отдаются без проверки клеток.
+
+        Yields:
+            Tuple[int, int, Bucket]: x, y и сущности клетки.
+        """
+        if radius < 0:
+            return
+
+        radius_sq = radius * radius
+        min_x, max_x = int(cx - radius), int(cx + radius)
+        min_y, max_y = int(cy - radius), int(cy + radius)
+
+        for chunk in self.iter_chunks_in_rect(min_x, min_y, max_x, max_y):
+            base_x, base_y = chunk.origin
+            far_x = max(cx - base_x, base_x + CHUNK_MASK - cx)
+            far_y = max(cy - base_y, base_y + CHUNK_MASK - cy)
+            if far_x * far_x + far_y * far_y <= radius_sq:
+                yield from chunk.iter_cells()
+                continue
+
+            near_x = max(base_x - cx, 0, cx - base_x - CHUNK_MASK)
+            near_y = max(base_y - cy, 0, cy - base_y - CHUNK_MASK)
+            if near_x * near_x + near_y * near_y > radius_sq:
+                continue
+
+            for x, y, bucket in chunk.iter_cells():
+                dx = x - cx
+                dy = y - cy
+                if dx * dx + dy * dy <= radius_sq:
+                    yield x, y, bucket
+
+    def query_radius_batch(
+        self, queries: Sequence[Tuple[int, int, float]]
+    ) -> List[List[Bucket]]:
+        """Выполняет пачку запросов по радиусу за один проход по чанкам.
+
+        Каждый затронутый чанк распаковывается один раз и проверяется сразу против
+        всех пересекающих его запросов. Если доступен NumPy, расстояния считаются
+        векторно по массивам координат клеток.
+
+        Args:
+            queries (Sequence[Tuple[int, int, float]]): Тройки (x, y, радиус).
+
+        Returns:
+            List[List[Bucket]]: Для каждого запроса - сущности попавших клеток.
+        """
+        results: List[List[Bucket]] = [[] for _ in queries]
+        by_chunk: Dict[int, Tuple[Chunk, List[int]]] = {}
+
+        for index, (cx, cy, radius) in enumerate(queries):
+            if radius < 0:
+                continue
+
+            for chunk in self.iter_chunks_in_rect(
+                int(cx - radius), int(cy - radius), int(cx + radius), int(cy + radius)
+            ):
+                entry = by_chunk.get(id(chunk))
+                if entry is None:
+                    by_chunk[id(chunk)] = (chunk, [index])
+
+                else:
+                    entry[1].append(index)
+
+        for chunk, indexes in by_chunk.values():
+            if np is not None and len(indexes) * len(chunk.cells) >= NUMPY_BATCH_THRESHOLD:
+                self._batch_chunk_numpy(chunk, indexes, queries, results)
+
+            else:
+                cells = list(chunk.iter_cells())
+                for index in indexes:
+                    cx, cy, radius = queries[index]
+                    radius_sq = radius * radius
+                    found = results[index]
+                    for x, y, bucket in cells:
+                        if (x - cx) * (x - cx) + (y - cy) * (y - cy) <= radius_sq:
+                            found.append(bucket)
+
+        return results
+
+    @staticmethod
+    def _batch_chunk_numpy(
+        chunk: Chunk,
+        indexes: List[int],
+        queries: Sequence[Tuple[int, int, float]],
+        results: List[List[Bucket]],
+    ) -> None:
+        base_x, base_y = chunk.origin
+        cell_count = len(chunk.cells)
+        local = np.fromiter(chunk.cells.keys(), dtype=np.int64, count=cell_count)
+        buckets = list(chunk.cells.values())
+
+        query_arr = np.array([queries[index] for index in indexes], dtype=np.float64)
+        dx = (base_x + (local & CHUNK_MASK))[None, :] - query_arr[:, 0:1]
+        dy = (base_y + (local >> CHUNK_SHIFT))[None, :] - query_arr[:, 1:2]
+        inside = dx * dx + dy * dy <= (query_arr[:, 2:3] * query_arr[:, 2:3])
+
+        for row, index in enumerate(indexes):
+            found = results[index]
+            for cell in np.flatnonzero(inside[row]):
+                found.append(buckets[cell])
+
+    def _iter_chunk_ring(self, ccx: int, ccy: int, ring: int) -> Iterator[Chunk]:
+        if ring == 0:
+            chunk = self._chunks.get(pack_xy(ccx, ccy))
+            if chunk is not None:
+                yield chunk
+
+            return
+
+        chunks = self._chunks
+        for cx in range(ccx - ring, ccx + ring + 1):
+            for cy in (ccy - ring, ccy + ring):
+                chunk = chunks.get(pack_xy(cx, cy))
+                if chunk is not None:
+                    yield chunk
+
+        for cy in range(ccy - ring + 1, ccy + ring):
+            for cx in (ccx - ring, ccx + ring):
+                chunk = chunks.get(pack_xy(cx, cy))
+                if chunk is not None:
+                    yield chunk
+
+    def nearest(
+        self, cx: int, cy: int, count: int, max_radius: Optional[float] = None
+    ) -> List[Tuple[int, BaseEntity]]:
+        """Ищет `count` ближайших к точке сущностей.
+
+        Чанки обходятся кольцами от центрального; поиск останавливается, как только
+        следующее кольцо заведомо дальше уже найденных кандидатов.
+
+        Args:
+            cx (int): Координата X центра.
+            cy (int): Координата Y центра.
+            count (int): Сколько сущностей вернуть.
+            max_radius (Optional[float]): Максимальное расстояние поиска. По умолчанию без ограничений.
+
+        Returns:
+            List[Tuple[int, BaseEntity]]: Пары (квадрат расстояния, сущность) по возрастанию расстояния.
+        """
+        if count <= 0 or self._bounds is None:
+            return []
+
+        radius_sq = None if max_radius is None else max_radius * max_radius
+        best: Dict[BaseEntity, int] = {}
+
+        def visit(chunk: Chunk) -> None:
+            for x, y, bucket in chunk.iter_cells():
+                dist_sq = (x - cx) ** 2 + (y - cy) ** 2
+                if radius_sq is not None and dist_sq > radius_sq:
+                    continue
+
+                for entity in bucket:
+                    if dist_sq < best.get(entity, dist_sq + 1):
+                        best[entity] = dist_sq
+
+        ccx, ccy = cx >> CHUNK_SHIFT, cy >> CHUNK_SHIFT
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+        max_ring = max(ccx - min_cx, max_cx - ccx, ccy - min_cy, max_cy - ccy, 0)
+
+        ring = 0
+        while ring <= max_ring:
+            # Кольца стали дороже полного перебора: досматриваем оставшиеся чанки разом
+            if (2 * ring + 1) ** 2 > len(self._chunks):
+                for chunk in self._chunks.values():
+                    if max(abs(chunk.cx - ccx), abs(chunk.cy - ccy)) >= ring:
+                        visit(chunk)
+
+                break
+
+            for chunk in self._iter_chunk_ring(ccx, ccy, ring):
+                visit(chunk)
+
+            ring += 1
+            # Просмотренные кольца покрывают квадрат клеток [low, high] по каждой оси,
+            # любая клетка следующего кольца лежит за его границей
+            low_x, high_x = (ccx - ring + 1) << CHUNK_SHIFT, ((ccx + ring) << CHUNK_SHIFT) - 1
+            low_y, high_y = (ccy - ring + 1) << CHUNK_SHIFT, ((ccy + ring) << CHUNK_SHIFT) - 1
+            next_ring_sq = min(cx - low_x, high_x - cx, cy - low_y, high_y - cy) + 1
+            next_ring_sq *= next_ring_sq
+            if radius_sq is not None and next_ring_sq > radius_sq:
+                break
+
+            if len(best) >= count and heapq.nsmallest(count, best.values())[-1] < next_ring_sq:
+                break
+
+        return heapq.nsmallest(
+            count,
+            ((dist_sq, entity) for entity, dist_sq in best.items()),
+            key=lambda item: item[0],
+        )
+
+    def clear(self) -> None:
+        self._chunks.clear()
+        self._bounds = None
@@ -1,25 +1,24 @@
-from typing import Any, Dict
+from typing import Annotated
 
-from systems.ecs import BaseComponent, register_component
+from systems.ecs import BaseComponent, FieldCodec, register_component
 from systems.map.coordinate import Coordinate
 
+# Координата пишется строкой "x y", как в формате карты
+COORDINATE_CODEC = FieldCodec(str, Coordinate.from_str)
+
 
 @register_component
 class CoordinateComponent(BaseComponent):
+    __slots__ = ["mapuid", "coord"]
+
+    # Поле схемы; хранится в coord, dump/restore генерируются по схеме
+    coordinate: Annotated[Coordinate, COORDINATE_CODEC]
+
     def __init__(self, coordinate: Coordinate, mapuid: int = 0) -> None:
         super().__init__()
         self.mapuid: int = 0
         self.coord: Coordinate = coordinate
 
-    def dump(self) -> Dict[str, Any]:
-        return {
-            "type": self.type,
-            "coordinate": str(self.coord),
-        }
-
-    @classmethod
-    def restore(cls, data: Dict[str, Any]) -> "CoordinateComponent":
-        coord_str = data.get("coordinate", "0 0")
-        coord = Coordinate.from_str(coord_str)
-
-        return cls(coord)
+    @property
+    def coordinate(self) -> Coordinate:
+        return self.coord
@@ -1,11 +1,22 @@
-from typing import Any, Dict, List, Optional
+from typing import Annotated, List, Optional, Set
 
-from systems.ecs import BaseComponent, register_component
+from systems.ecs import BaseComponent, FieldCodec, register_component
 from systems.map.coordinate import Coordinate
 
+# Координаты пишутся списком строк "x y", как в формате карты
+COORDINATES_CODEC = FieldCodec(
+    lambda coords: [str(coord) for coord in coords],
+    lambda values: [Coordinate.from_str(value) for value in values],
+)
+
 
 @register_component
 class MultiCoordinateComponent(BaseComponent):
+    __slots__ = ["mapuid", "_coordinates", "_keys"]
+
+    # Поле схемы; хранится в _coordinates, dump/restore генерируются по схеме
+    coordinates: Annotated[List[Coordinate], COORDINATES_CODEC]
+
     def __init__(self, coordinates: Optional[Coordinate | List[Coordinate]] = None, mapuid: int = 0) -> None:
         super().__init__()
         
@@ -18,6 +29,7 @@ class MultiCoordinateComponent(BaseComponent):
             coordinates = [coordinates]
 
         self._coordinates: List[Coordinate] = coordinates
+        self._keys: Set[int] = {coord.key for coord in coordinates}
 
     @property
     def coordinates(self) -> List[Coordinate]:
@@ -28,7 +40,8 @@ class MultiCoordinateComponent(BaseComponent):
             coordinates = [coordinates]
 
         for coord in coordinates:
-            if coord in self._coordinates:
+            if coord.key in self._keys:
+                self._keys.discard(coord.key)
                 self._coordinates.remove(coord)
 
     def add_coordinate(self, coordinate: Coordinate | List[Coordinate]) -> None:
@@ -36,23 +49,15 @@ class MultiCoordinateComponent(BaseComponent):
             coordinate = [coordinate]
 
         for coord in coordinate:
-            if coord not in self._coordinates:
+            if coord.key not in self._keys:
+                self._keys.add(coord.key)
                 self._coordinates.append(coord)
 
         self._coordinates.sort()
 
-    def dump(self) -> Dict[str, Any]:
-        return {
-            "type": self.type,
-            "coordinates": [str(coord) for coord in self._coordinates],
-        }
-
-    @classmethod
-    def restore(cls, data: Dict[str, Any]) -> "MultiCoordinateComponent":
-        coord_str_l = data.get("coordinates", [])
-
-        coord_l = []
-        for coord_str in coord_str_l:
-            coord_l.append(Coordinate.from_str(coord_str))
-
-        return cls(coord_l)
+    def shift(self, dx: int, dy: int) -> None:
+        """Сдвигает все координаты на смещение (dx, dy), сохраняя порядок."""
+        self._coordinates = [
+            Coordinate(coord.x + dx, coord.y + dy) for coord in self._coordinates
+        ]
+        self._keys = {coord.key for coord in self._coordinates}
@@ -1,17 +1,93 @@
 import math
+from typing import Dict, Tuple
+
+PACK_BITS = 32
+PACK_OFFSET = 1 << (PACK_BITS - 1)
+PACK_MASK = (1 << PACK_BITS) - 1
+
+INTERN_LIMIT = 1 << 16
+
+
+def pack_xy(x: int, y: int) -> int:
+    """Упаковывает пару координат в один неотрицательный int.
+
+    Args:
+        x (int): Координата X в диапазоне [-2**31, 2**31).
+        y (int): Координата Y в диапазоне [-2**31, 2**31).
+
+    Returns:
+        int: Упакованный ключ.
+    """
+    return ((x + PACK_OFFSET) << PACK_BITS) | (y + PACK_OFFSET)
+
+
+def unpack_xy(key: int) -> Tuple[int, int]:
+    """Распаковывает ключ, полученный из pack_xy.
+
+    Args:
+        key (int): Упакованный ключ.
+
+    Returns:
+        Tuple[int, int]: Координаты X и Y.
+    """
+    return (key >> PACK_BITS) - PACK_OFFSET, (key & PACK_MASK) - PACK_OFFSET
 
 
 class Coordinate:
+    """Неизменяемая координата клетки карты.
+
+    Сравнение координат идет через упакованный ключ `key`. Хеш совпадает с
+    хешем кортежа `(x, y)`, так как координата равна такому кортежу, и
+    считается один раз при создании. Экземпляры могут разделяться через
+    `intern`, поэтому присваивание атрибутов запрещено.
+    """
+    __slots__ = ["x", "y", "key", "_hash"]
+
+    _interned: Dict[int, "Coordinate"] = {}
+
     def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
+        _set = object.__setattr__
+        _set(self, "x", x)
+        _set(self, "y", y)
+        _set(self, "key", ((x + PACK_OFFSET) << PACK_BITS) | (y + PACK_OFFSET))
+        _set(self, "_hash", hash((x, y)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Coordinate is immutable, cannot set '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Coordinate is immutable, cannot delete '{name}'")
+
+    def __reduce__(self):
+        return Coordinate, (self.x, self.y)
+
+    @classmethod
+    def intern(cls, x: int, y: int) -> "Coordinate":
+        """Возвращает общий экземпляр координаты, создавая его при первом обращении.
+
+        Кэш ограничен INTERN_LIMIT записями и сбрасывается при переполнении.
+        """
+        key = pack_xy(x, y)
+        coord = cls._interned.get(key)
+        if coord is None:
+            if len(cls._interned) >= INTERN_LIMIT:
+                cls._interned.clear()
+
+            coord = cls(x, y)
+            cls._interned[key] = coord
+
+        return coord
+
+    @classmethod
+    def from_key(cls, key: int) -> "Coordinate":
+        return cls.intern(*unpack_xy(key))
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self._hash
 
     def __eq__(self, other):
-        if isinstance(other, Coordinate):
-            return self.x == other.x and self.y == other.y
+        if other.__class__ is Coordinate or isinstance(other, Coordinate):
+            return self.key == other.key
 
         elif isinstance(other, tuple):
             return self.x == other[0] and self.y == other[1]
@@ -21,7 +97,7 @@ class Coordinate:
     def __lt__(self, other):
         if self.x == other.x:
             return self.y < other.y
-        
+
         return self.x < other.x
 
     def distance_to(self, other: "Coordinate") -> float:
@@ -36,4 +112,4 @@ class Coordinate:
     @classmethod
     def from_str(cls, coord_str: str) -> "Coordinate":
         x, y = map(int, coord_str.split())
-        return cls(x, y)
+        return cls.intern(x, y)
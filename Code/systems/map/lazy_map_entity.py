@@ -0,0 +1,417 @@
+import io
+import os
+import struct
+from collections import OrderedDict
+from pathlib import Path
+from typing import (Any, Dict, Iterable, Iterator, List, Optional, Sequence,
+                    Set, Tuple, Union)
+
+import msgpack
+from systems.ecs import BaseEntity, Factory, register_entity
+
+from .chunk_storage import CHUNK_SHIFT, Chunk
+from .components import MultiCoordinateComponent
+from .coordinate import Coordinate, pack_xy, unpack_xy
+from .map_entity import MapEntity
+from .map_snapshot import MapSnapshot, PackedCoords, pair_xy
+
+CHUNKED_MAGIC = "DMMAPC"
+CHUNKED_VERSION = 1
+
+# В конце файла лежит смещение индекса чанков
+_FOOTER = struct.Struct("<Q")
+
+# Где лежат данные выгруженного чанка: сами байты или (смещение, длина) в файле карты
+StoredChunk = Union[bytes, Tuple[int, int]]
+
+
+def chunk_key(x: int, y: int) -> int:
+    return pack_xy(x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+
+
+def iter_homed(
+    chunks: Iterable[Chunk], deps: Dict[int, Set[int]]
+) -> Iterator[Tuple[int, BaseEntity, PackedCoords]]:
+    """Итерирует сущности чанков по одному разу вместе с чанком-владельцем.
+
+    Для многоклеточных сущностей попутно дополняет `deps`: каждый занятый
+    ими чанк, кроме владельца, зависит от чанка-владельца.
+
+    Yields:
+        Tuple[int, BaseEntity, PackedCoords]: Чанк-владелец, сущность и упакованные координаты.
+    """
+    multi_type = MultiCoordinateComponent.get_type()
+    seen_multi = set()
+    for chunk in list(chunks):
+        for x, y, bucket in chunk.iter_cells():
+            for entity in list(bucket):
+                multi_comp: Optional[MultiCoordinateComponent] = entity.get_component(multi_type)  # type: ignore
+                if multi_comp is None:
+                    yield chunk_key(x, y), entity, pair_xy(x, y)
+                    continue
+
+                if entity.uid in seen_multi:
+                    continue
+
+                seen_multi.add(entity.uid)
+                coords = multi_comp.coordinates
+                home = chunk_key(coords[0].x, coords[0].y)
+                for coord in coords:
+                    other = chunk_key(coord.x, coord.y)
+                    if other != home:
+                        deps.setdefault(other, set()).add(home)
+
+                yield home, entity, [pair_xy(coord.x, coord.y) for coord in coords]
+
+
+@register_entity
+class LazyMapEntity(MapEntity):
+    """Карта, чанки которой восстанавливаются при первом обращении.
+
+    Чанк загружается, когда его касается запрос или изменение. Если загруженных
+    чанков больше `max_loaded_chunks`, давно не использованные сериализуются в
+    память и выгружаются. Многоклеточная сущность принадлежит чанку своей первой
+    клетки; чанки, которые она дополнительно занимает, при загрузке подтягивают
+    чанк-владелец.
+
+    Выгрузка и повторная загрузка пересоздают сущности: ссылки на них, взятые
+    до выгрузки, становятся устаревшими, а в журнале изменений появляются
+    пары удаления и добавления.
+    """
+
+    def __init__(self, id: str, max_loaded_chunks: int = 1024) -> None:
+        super().__init__(id)
+        self._max_loaded_chunks: int = max_loaded_chunks
+        self._source: Optional[Path] = None
+        self._stored: Dict[int, StoredChunk] = {}
+        self._deps: Dict[int, Set[int]] = {}
+        self._resident: "OrderedDict[int, None]" = OrderedDict()
+        self._restoring: bool = False
+
+    @property
+    def loaded_chunk_count(self) -> int:
+        return len(self._resident)
+
+    @property
+    def stored_chunk_count(self) -> int:
+        return len(self._stored)
+
+    def _ensure(self, keys: Iterable[int], mark: bool = False) -> None:
+        """Загружает чанки и чанки-владельцы их многоклеточных сущностей.
+
+        Args:
+            keys (Iterable[int]): Ключи чанков из chunk_key.
+            mark (bool): Считать чанки загруженными, даже если данных у них нет.
+                Нужно для изменений, которые могут создать новый чанк.
+        """
+        if self._restoring:
+            return
+
+        pinned: Set[int] = set()
+        stack = list(keys)
+        while stack:
+            key = stack.pop()
+            if key in pinned:
+                continue
+
+            pinned.add(key)
+            stack.extend(self._deps.get(key, ()))
+
+        for key in pinned:
+            if key in self._resident:
+                self._resident.move_to_end(key)
+                continue
+
+            stored = self._stored.pop(key, None)
+            if stored is not None:
+                self._resident[key] = None
+                self._load_chunk(stored)
+
+            elif mark or self.entities.get_chunk(*unpack_xy(key)) is not None:
+                self._resident[key] = None
+
+        self._enforce_budget(pinned)
+
+    def _load_chunk(self, stored: StoredChunk) -> None:
+        blob = self._read_stored(stored)
+        unpacker = msgpack.Unpacker(io.BytesIO(blob), raw=False, strict_map_key=False)
+
+        self._restoring = True
+        try:
+            MapSnapshot.read_entities(unpacker, self)
+
+        finally:
+            self._restoring = False
+
+    def _read_stored(self, stored: StoredChunk) -> bytes:
+        if isinstance(stored, bytes):
+            return stored
+
+        if self._source is None:
+            raise ValueError(f"Map {self.id} has no source file to read chunks from")
+
+        offset, length = stored
+        with self._source.open("rb") as file:
+            file.seek(offset)
+            return file.read(length)
+
+    def _enforce_budget(self, pinned: Set[int]) -> None:
+        while len(self._resident) > self._max_loaded_chunks:
+            victim = next((key for key in self._resident if key not in pinned), None)
+            if victim is None:
+                return
+
+            self.evict_chunk(victim)
+
+    def evict_chunk(self, key: int) -> None:
+        """Сериализует сущности чанка в память и убирает их с карты.
+
+        Args:
+            key (int): Ключ чанка из chunk_key.
+        """
+        self._resident.pop(key, None)
+        chunk = self.entities.get_chunk(*unpack_xy(key))
+        entries = [
+            (entity, coords)
+            for home, entity, coords in iter_homed([] if chunk is None else [chunk], self._deps)
+            if home == key
+        ]
+        if not entries:
+            return
+
+        stream = io.BytesIO()
+        MapSnapshot.write_entities(entries, stream)
+        self._stored[key] = stream.getvalue()
+
+        self._restoring = True
+        try:
+            for entity, _ in entries:
+                self.remove_entity(self._get_entity_coords(entity)[0], entity)
+                Factory.destroy_entity(entity)
+
+        finally:
+            self._restoring = False
+
+    def _keys_in_rect(self, min_x: int, min_y: int, max_x: int, max_y: int) -> List[int]:
+        min_cx, max_cx = min_x >> CHUNK_SHIFT, max_x >> CHUNK_SHIFT
+        min_cy, max_cy = min_y >> CHUNK_SHIFT, max_y >> CHUNK_SHIFT
+
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) <= len(self._stored) + len(self._resident):
+            return [
+                pack_xy(cx, cy)
+                for cx in range(min_cx, max_cx + 1)
+                for cy in range(min_cy, max_cy + 1)
+            ]
+
+        keys = []
+        for key in (*self._stored, *self._resident):
+            cx, cy = unpack_xy(key)
+            if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                keys.append(key)
+
+        return keys
+
+    def _radius_keys(self, center: Coordinate, radius: float) -> List[int]:
+        if radius < 0:
+            return []
+
+        return self._keys_in_rect(
+            int(center.x - radius), int(center.y - radius),
+            int(center.x + radius), int(center.y + radius),
+        )
+
+    def _ensure_radius(self, center: Coordinate, radius: float) -> None:
+        self._ensure(self._radius_keys(center, radius))
+
+    def _ensure_all(self) -> None:
+        self._ensure([*self._stored, *self._resident])
+
+    def _entity_keys(self, entity: BaseEntity, dx: int = 0, dy: int = 0) -> List[int]:
+        return [
+            chunk_key(coord.x + dx, coord.y + dy)
+            for coord in self._get_entity_coords(entity)
+        ]
+
+    def add_entity(
+        self, coords: Coordinate | List[Coordinate], entity: BaseEntity
+    ) -> None:
+        coord_list = coords if isinstance(coords, list) else [coords]
+        self._ensure([chunk_key(coord.x, coord.y) for coord in coord_list], mark=True)
+        super().add_entity(coords, entity)
+
+    def get_entities(
+        self, coord: Coordinate | int, y: Optional[int] = None
+    ) -> Optional[List[BaseEntity]]:
+        if isinstance(coord, Coordinate):
+            self._ensure([chunk_key(coord.x, coord.y)])
+
+        else:
+            self._ensure([chunk_key(coord, y)])  # type: ignore
+
+        return super().get_entities(coord, y)
+
+    def remove_entity(self, coords: Coordinate, entity: BaseEntity) -> None:
+        self._ensure([chunk_key(coords.x, coords.y)])
+        super().remove_entity(coords, entity)
+
+    def teleport_entity(
+        self, old_coords: Coordinate, new_coords: Coordinate, entity: BaseEntity
+    ) -> None:
+        keys = [chunk_key(old_coords.x, old_coords.y), chunk_key(new_coords.x, new_coords.y)]
+        if entity.has_component(MultiCoordinateComponent.get_type()):
+            keys.extend(self._entity_keys(
+                entity, new_coords.x - old_coords.x, new_coords.y - old_coords.y
+            ))
+
+        self._ensure(keys, mark=True)
+        super().teleport_entity(old_coords, new_coords, entity)
+
+    def move_entity(self, entity: BaseEntity, dx: int, dy: int) -> None:
+        self._ensure(self._entity_keys(entity) + self._entity_keys(entity, dx, dy), mark=True)
+        super().move_entity(entity, dx, dy)
+
+    def get_entities_in_radius(
+        self, center: Coordinate, radius: float
+    ) -> List[BaseEntity]:
+        self._ensure_radius(center, radius)
+        return super().get_entities_in_radius(center, radius)
+
+    def get_entities_in_radius_batch(
+        self, queries: Sequence[Tuple[Coordinate, float]]
+    ) -> List[List[BaseEntity]]:
+        # Чанки всех запросов загружаются одним вызовом: иначе бюджет
+        # выгрузил бы чанки предыдущих запросов до ответа на них
+        keys: Set[int] = set()
+        for center, radius in queries:
+            keys.update(self._radius_keys(center, radius))
+
+        self._ensure(keys)
+        return super().get_entities_in_radius_batch(queries)
+
+    def get_entities_in_rect(
+        self, first: Coordinate, second: Coordinate
+    ) -> List[BaseEntity]:
+        self._ensure(self._keys_in_rect(
+            min(first.x, second.x), min(first.y, second.y),
+            max(first.x, second.x), max(first.y, second.y),
+        ))
+        return super().get_entities_in_rect(first, second)
+
+    def get_nearest_entities(
+        self, center: Coordinate, count: int, max_radius: Optional[float] = None
+    ) -> List[BaseEntity]:
+        if max_radius is None:
+            self._ensure_all()
+
+        else:
+            self._ensure_radius(center, max_radius)
+
+        return super().get_nearest_entities(center, count, max_radius)
+
+    def dump(self) -> Dict[str, Any]:
+        self._ensure_all()
+        return super().dump()
+
+    @staticmethod
+    def save_chunked(map_entity: MapEntity, path: Union[str, Path]) -> None:
+        """Сохраняет карту в файл, который LazyMapEntity.open читает по чанкам.
+
+        Выгруженные чанки LazyMapEntity переписываются как есть, без загрузки.
+        Если ленивая карта сохраняется в свой же исходный файл, ее выгруженные
+        чанки после записи указывают в новый файл.
+
+        Args:
+            map_entity (MapEntity): Карта, обычная или ленивая.
+            path (Union[str, Path]): Путь к файлу.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        stored: Dict[int, StoredChunk] = {}
+        deps: Dict[int, Set[int]] = {}
+        if isinstance(map_entity, LazyMapEntity):
+            stored = map_entity._stored
+            deps = map_entity._deps
+
+        groups: Dict[int, List[Tuple[BaseEntity, PackedCoords]]] = {}
+        for home, entity, coords in iter_homed(map_entity.entities.iter_chunks(), deps):
+            groups.setdefault(home, []).append((entity, coords))
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        packer = msgpack.Packer(use_bin_type=True)
+        index: Dict[int, List[Any]] = {}
+
+        with tmp_path.open("wb") as file:
+            file.write(packer.pack([
+                CHUNKED_MAGIC,
+                CHUNKED_VERSION,
+                map_entity.id,
+                {name: comp.dump() for name, comp in map_entity._components.items()},
+            ]))
+
+            for key, entries in groups.items():
+                stream = io.BytesIO()
+                MapSnapshot.write_entities(entries, stream)
+                index[key] = [file.tell(), file.write(stream.getvalue())]
+
+            for key, chunk_data in stored.items():
+                index[key] = [file.tell(), file.write(map_entity._read_stored(chunk_data))]  # type: ignore
+
+            for key, item in index.items():
+                item.append(sorted(deps.get(key, ())))
+
+            index_offset = file.tell()
+            file.write(packer.pack(index))
+            file.write(_FOOTER.pack(index_offset))
+
+        os.replace(tmp_path, path)
+
+        if (
+            isinstance(map_entity, LazyMapEntity)
+            and map_entity._source is not None
+            and map_entity._source.resolve() == path.resolve()
+        ):
+            # Старый файл заменен: смещения выгруженных чанков берутся из нового индекса
+            map_entity._source = path
+            for key in stored:
+                offset, length, _ = index[key]
+                stored[key] = (offset, length)
+
+    @classmethod
+    def open(cls, path: Union[str, Path], max_loaded_chunks: int = 1024) -> "LazyMapEntity":
+        """Открывает файл из save_chunked, не загружая ни одного чанка.
+
+        Raises:
+            ValueError: Если файл не является картой по чанкам или версия не поддерживается.
+        """
+        path = Path(path)
+        with path.open("rb") as file:
+            try:
+                header = msgpack.Unpacker(file, raw=False).unpack()
+
+            except (msgpack.OutOfData, ValueError):
+                raise ValueError(f"{path} is not a chunked map file")
+
+            if not isinstance(header, list) or len(header) != 4 or header[0] != CHUNKED_MAGIC:
+                raise ValueError(f"{path} is not a chunked map file")
+
+            if header[1] != CHUNKED_VERSION:
+                raise ValueError(f"Unsupported chunked map version: {header[1]}")
+
+            file.seek(-_FOOTER.size, os.SEEK_END)
+            footer_offset = file.tell()
+            (index_offset,) = _FOOTER.unpack(file.read(_FOOTER.size))
+            file.seek(index_offset)
+            index = msgpack.unpackb(
+                file.read(footer_offset - index_offset), raw=False, strict_map_key=False
+            )
+
+        map_entity = cls(header[2], max_loaded_chunks)
+        cls._restore_components(map_entity, {"components": header[3]})
+        map_entity._source = path
+        for key, (offset, length, deps) in index.items():
+            map_entity._stored[key] = (offset, length)
+            if deps:
+                map_entity._deps[key] = set(deps)
+
+        return map_entity
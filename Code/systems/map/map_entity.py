@@ -1,16 +1,24 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from systems.ecs import BaseEntity, Factory, register_entity
 
+from .chunk_storage import ChunkStorage
 from .components import CoordinateComponent, MultiCoordinateComponent
 from .coordinate import Coordinate
+from .map_journal import EVENT_ADD, EVENT_MOVE, EVENT_REMOVE, MapJournal
 
 
 @register_entity
 class MapEntity(BaseEntity):
     def __init__(self, id: str) -> None:
         super().__init__(id)
-        self.entities: Dict[Coordinate, List[BaseEntity]] = {}
+        self.entities: ChunkStorage = ChunkStorage()
+        self._placed: Dict[int, BaseEntity] = {}
+        self._journal: MapJournal = MapJournal()
+
+    @property
+    def version(self) -> int:
+        return self._journal.version
 
     def add_entity(
         self, coords: Coordinate | List[Coordinate], entity: BaseEntity
@@ -24,72 +32,198 @@ class MapEntity(BaseEntity):
             coords = [coords]
 
         for cord in coords:
-            if cord not in self.entities:
-                self.entities[cord] = []
+            self.entities.add(cord.x, cord.y, entity)
 
-            self.entities[cord].append(entity)
+        if entity.uid == 0:
+            Factory.assign_new_uid_if_needed(entity)
 
-    def get_entities(self, coord: Coordinate, y: int) -> Optional[List[BaseEntity]]:
-        return self.entities.get(coord, None)
+        self._placed[entity.uid] = entity
+        self._journal.record(entity.uid, EVENT_ADD)
 
-    def remove_entity(self, coords: Coordinate, entity: BaseEntity) -> None:
-        if coords in self.entities:
-            if entity in self.entities[coords]:
-                comp: MultiCoordinateComponent = entity.get_component(
-                    MultiCoordinateComponent.get_type()
-                )  # type: ignore
-                if comp:
-                    for coord in comp.coordinates:
-                        self.entities[coord].remove(entity)
+    def get_entities(
+        self, coord: Coordinate | int, y: Optional[int] = None
+    ) -> Optional[List[BaseEntity]]:
+        """Получаем сущности клетки. Принимает Coordinate или пару x, y.
 
-                        if not self.entities[coord]:
-                            del self.entities[coord]
+        Возвращается новый список: клетка с большим числом сущностей хранится
+        словарем, поэтому живого списка у нее нет. Изменение результата не
+        меняет карту, добавлять и убирать сущности нужно через add_entity и
+        remove_entity, чтобы изменения попали в журнал.
+        """
+        if isinstance(coord, Coordinate):
+            bucket = self.entities.get(coord.x, coord.y)
 
-                    entity.remove_component(MultiCoordinateComponent.get_type())
+        else:
+            bucket = self.entities.get(coord, y)  # type: ignore
 
-                else:
-                    self.entities[coords].remove(entity)
+        return None if bucket is None else list(bucket)
 
-                    if not self.entities[coords]:
-                        del self.entities[coords]
+    def remove_entity(self, coords: Coordinate, entity: BaseEntity) -> None:
+        bucket = self.entities.get(coords.x, coords.y)
+        if bucket is None or entity not in bucket:
+            return
+
+        comp: MultiCoordinateComponent = entity.get_component(
+            MultiCoordinateComponent.get_type()
+        )  # type: ignore
+        if comp:
+            for coord in comp.coordinates:
+                self.entities.remove(coord.x, coord.y, entity)
+
+            entity.remove_component(MultiCoordinateComponent.get_type())
+
+        else:
+            self.entities.remove(coords.x, coords.y, entity)
+            entity.remove_component(CoordinateComponent.get_type())
 
-                    entity.remove_component(CoordinateComponent.get_type())
+        self._placed.pop(entity.uid, None)
+        self._journal.record(entity.uid, EVENT_REMOVE)
 
     def get_entities_in_radius(
         self, center: Coordinate, radius: float
     ) -> List[BaseEntity]:
         """Получаем все сущности в заданном радиусе от точки"""
-        entities_in_radius = set()
+        entities_in_radius: Dict[BaseEntity, None] = {}
 
-        min_x, max_x = center.x - radius, center.x + radius
-        min_y, max_y = center.y - radius, center.y + radius
-
-        for dx in range(int(min_x), int(max_x) + 1):
-            for dy in range(int(min_y), int(max_y) + 1):
-                current_coords = Coordinate(dx, dy)
-                if current_coords in self.entities:
-                    if center.distance_to(current_coords) <= radius:
-                        entities_in_radius.update(self.entities[current_coords])
+        for _, _, bucket in self.entities.iter_cells_in_radius(center.x, center.y, radius):
+            entities_in_radius.update(dict.fromkeys(bucket))
 
         return list(entities_in_radius)
 
+    def get_entities_in_radius_batch(
+        self, queries: Sequence[Tuple[Coordinate, float]]
+    ) -> List[List[BaseEntity]]:
+        """Получаем сущности для набора пар (центр, радиус) за один проход по карте.
+
+        Результат для каждой пары совпадает с get_entities_in_radius.
+        """
+        results: List[List[BaseEntity]] = []
+
+        for buckets in self.entities.query_radius_batch(
+            [(center.x, center.y, radius) for center, radius in queries]
+        ):
+            found: Dict[BaseEntity, None] = {}
+            for bucket in buckets:
+                found.update(dict.fromkeys(bucket))
+
+            results.append(list(found))
+
+        return results
+
+    def get_entities_in_rect(
+        self, first: Coordinate, second: Coordinate
+    ) -> List[BaseEntity]:
+        """Получаем все сущности в прямоугольнике между двумя углами (включительно)"""
+        entities_in_rect: Dict[BaseEntity, None] = {}
+
+        for _, _, bucket in self.entities.iter_cells_in_rect(
+            min(first.x, second.x),
+            min(first.y, second.y),
+            max(first.x, second.x),
+            max(first.y, second.y),
+        ):
+            entities_in_rect.update(dict.fromkeys(bucket))
+
+        return list(entities_in_rect)
+
+    def get_nearest_entities(
+        self, center: Coordinate, count: int, max_radius: Optional[float] = None
+    ) -> List[BaseEntity]:
+        """Получаем до `count` ближайших к точке сущностей, от ближней к дальней"""
+        return [
+            entity
+            for _, entity in self.entities.nearest(center.x, center.y, count, max_radius)
+        ]
+
     def teleport_entity(
         self, old_coords: Coordinate, new_coords: Coordinate, entity: BaseEntity
     ) -> None:
+        """Перемещаем сущность из old_coords в new_coords.
+
+        Компонент координат обновляется на месте. Многоклеточная сущность
+        сдвигается целиком на смещение между old_coords и new_coords.
+        """
+        comp: CoordinateComponent = entity.get_component(
+            CoordinateComponent.get_type()
+        )  # type: ignore
+        if comp and self.entities.move(
+            old_coords.x, old_coords.y, new_coords.x, new_coords.y, entity
+        ):
+            comp.coord = new_coords
+            self._journal.record(entity.uid, EVENT_MOVE)
+            return
+
+        bucket = self.entities.get(old_coords.x, old_coords.y)
+        if entity.has_component(MultiCoordinateComponent.get_type()) and bucket and entity in bucket:
+            self.move_entity(
+                entity, new_coords.x - old_coords.x, new_coords.y - old_coords.y
+            )
+            return
+
         self.remove_entity(old_coords, entity)
         self.add_entity(new_coords, entity)
 
+    def move_entity(self, entity: BaseEntity, dx: int, dy: int) -> None:
+        """Сдвигаем размещенную на карте сущность на смещение (dx, dy)"""
+        if self._placed.get(entity.uid) is not entity:
+            raise ValueError(f"Entity {entity.uid} is not placed on map {self.id}")
+
+        if dx == 0 and dy == 0:
+            return
+
+        multi_comp: MultiCoordinateComponent = entity.get_component(
+            MultiCoordinateComponent.get_type()
+        )  # type: ignore
+        if multi_comp:
+            old_coords = list(multi_comp.coordinates)
+            for coord in old_coords:
+                self.entities.remove(coord.x, coord.y, entity)
+
+            multi_comp.shift(dx, dy)
+            for coord in multi_comp.coordinates:
+                self.entities.add(coord.x, coord.y, entity)
+
+        else:
+            comp: CoordinateComponent = entity.get_component(
+                CoordinateComponent.get_type()
+            )  # type: ignore
+            new_coord = Coordinate(comp.coord.x + dx, comp.coord.y + dy)
+            self.entities.move(comp.coord.x, comp.coord.y, new_coord.x, new_coord.y, entity)
+            comp.coord = new_coord
+
+        self._journal.record(entity.uid, EVENT_MOVE)
+
+    @staticmethod
+    def _get_entity_coords(entity: BaseEntity) -> List[Coordinate]:
+        multi_comp: MultiCoordinateComponent = entity.get_component(
+            MultiCoordinateComponent.get_type()
+        )  # type: ignore
+        if multi_comp:
+            return multi_comp.coordinates
+
+        comp: CoordinateComponent = entity.get_component(
+            CoordinateComponent.get_type()
+        )  # type: ignore
+        return [comp.coord] if comp else []
+
+    @staticmethod
+    def _dump_placed_entity(entity: BaseEntity) -> Dict[str, Any]:
+        data = entity.dump()
+        data["uid"] = entity.uid
+        return data
+
     def dump(self) -> Dict[str, Any]:
         """Сериализация карты с вложенными сущностями, используя строки для координат"""
         entity_lt: Dict[Coordinate, List[BaseEntity]] = {}
-        multi_entity_list: List[BaseEntity] = []
+        multi_entity_list: Dict[BaseEntity, None] = {}
 
-        for coords, entity_list in self.entities.items():
+        for x, y, entity_list in self.entities.iter_cells():
+            coords = Coordinate(x, y)
             temp_list = []
 
             for entity in entity_list:
                 if entity.has_component(MultiCoordinateComponent.get_type()):
-                    multi_entity_list.append(entity)
+                    multi_entity_list[entity] = None
 
                 else:
                     temp_list.append(entity)
@@ -100,16 +234,145 @@ class MapEntity(BaseEntity):
         return {
             "id": self.id,
             "type": self.type,
+            "epoch": self._journal.epoch,
+            "version": self._journal.version,
             "entitys": {
-                str(coords): [entity.dump() for entity in entity_list]
+                str(coords): [self._dump_placed_entity(entity) for entity in entity_list]
                 for coords, entity_list in entity_lt.items()
             },
             "components": {
                 type: comp.dump() for type, comp in self._components.items()
             },
-            "multi_entitys": [entity.dump() for entity in multi_entity_list],
+            "multi_entitys": [
+                self._dump_placed_entity(entity) for entity in multi_entity_list
+            ],
         }
 
+    def dump_delta(self, since: int) -> Dict[str, Any]:
+        """Сериализация изменений карты после версии `since`.
+
+        Args:
+            since (int): Версия из предыдущего dump или dump_delta.
+
+        Raises:
+            ValueError: Если изменения с этой версии уже не хранятся и нужен полный dump.
+
+        Returns:
+            Dict[str, Any]: Добавленные сущности целиком, uid удаленных и новые координаты
+            перемещенных. Убранная и возвращенная сущность есть и в removed, и в added.
+        """
+        added, removed, touched = self._journal.changes_since(since)
+
+        return {
+            "id": self.id,
+            "epoch": self._journal.epoch,
+            "base_version": since,
+            "version": self._journal.version,
+            "added": [
+                {
+                    "coordinates": [
+                        str(coord) for coord in self._get_entity_coords(self._placed[uid])
+                    ],
+                    "data": self._dump_placed_entity(self._placed[uid]),
+                }
+                for uid in added
+            ],
+            "removed": removed,
+            "moved": [
+                {
+                    "uid": uid,
+                    "coordinates": [
+                        str(coord) for coord in self._get_entity_coords(self._placed[uid])
+                    ],
+                }
+                for uid in touched
+            ],
+        }
+
+    @staticmethod
+    def apply_delta(data: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+        """Накладывает дельту из dump_delta на полный dump карты.
+
+        Args:
+            data (Dict[str, Any]): Полный dump карты. Изменяется на месте.
+            delta (Dict[str, Any]): Дельта, построенная от версии этого dump.
+
+        Raises:
+            ValueError: Если дельта построена от другой карты или другой версии.
+
+        Returns:
+            Dict[str, Any]: Тот же dump, приведенный к версии дельты.
+        """
+        if data.get("epoch") != delta["epoch"] or data.get("version") != delta["base_version"]:
+            raise ValueError(
+                f"Delta {delta['base_version']}->{delta['version']} does not apply "
+                f"to map version {data.get('version')}"
+            )
+
+        moved: Dict[int, List[str]] = {
+            item["uid"]: item["coordinates"] for item in delta["moved"]
+        }
+        dropped = set(delta["removed"]) | moved.keys()
+        moved_data: Dict[int, Dict[str, Any]] = {}
+
+        entitys: Dict[str, List[Dict[str, Any]]] = data.setdefault("entitys", {})
+        for coord_str, entity_list in list(entitys.items()):
+            if not any(entity_data.get("uid") in dropped for entity_data in entity_list):
+                continue
+
+            kept = []
+            for entity_data in entity_list:
+                uid = entity_data.get("uid")
+                if uid in moved:
+                    moved_data[uid] = entity_data
+
+                elif uid not in dropped:
+                    kept.append(entity_data)
+
+            if kept:
+                entitys[coord_str] = kept
+
+            else:
+                del entitys[coord_str]
+
+        multi_kept = []
+        for entity_data in data.get("multi_entitys", []):
+            uid = entity_data.get("uid")
+            if uid in moved:
+                moved_data[uid] = entity_data
+
+            elif uid not in dropped:
+                multi_kept.append(entity_data)
+
+        data["multi_entitys"] = multi_kept
+
+        for uid, entity_data in moved_data.items():
+            MapEntity._place_entity_data(data, entity_data, moved[uid])
+
+        for item in delta["added"]:
+            MapEntity._place_entity_data(data, item["data"], item["coordinates"])
+
+        data["version"] = delta["version"]
+        return data
+
+    @staticmethod
+    def _place_entity_data(
+        data: Dict[str, Any], entity_data: Dict[str, Any], coordinates: List[str]
+    ) -> None:
+        components = entity_data.setdefault("components", {})
+        multi_type = MultiCoordinateComponent.get_type()
+        single_type = CoordinateComponent.get_type()
+
+        if multi_type in components:
+            components[multi_type]["coordinates"] = list(coordinates)
+            data.setdefault("multi_entitys", []).append(entity_data)
+            return
+
+        if single_type in components:
+            components[single_type]["coordinate"] = coordinates[0]
+
+        data.setdefault("entitys", {}).setdefault(coordinates[0], []).append(entity_data)
+
     @classmethod
     def restore(cls, data: Dict[str, Any]) -> "MapEntity":
         """Восстановление карты из данных"""
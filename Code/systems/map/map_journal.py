@@ -0,0 +1,101 @@
+import bisect
+import uuid
+from typing import Dict, List, Set, Tuple
+
+JOURNAL_LIMIT = 100_000
+
+EVENT_ADD = "add"
+EVENT_REMOVE = "remove"
+EVENT_MOVE = "move"
+
+
+class MapJournal:
+    """Журнал изменений размещения сущностей на карте.
+
+    Каждое изменение увеличивает версию карты. По журналу можно получить
+    итоговые изменения с любой версии, которая еще не вытеснена из него.
+    """
+    __slots__ = ["_epoch", "_version", "_floor", "_events"]
+
+    def __init__(self) -> None:
+        # Новая эпоха у каждой карты: uid сущностей не переживают restore,
+        # поэтому дельты между разными экземплярами карты несовместимы
+        self._epoch: str = uuid.uuid4().hex
+        self._version: int = 0
+        self._floor: int = 0
+        self._events: List[Tuple[int, int, str]] = []
+
+    @property
+    def epoch(self) -> str:
+        return self._epoch
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def floor(self) -> int:
+        """Самая старая версия, с которой еще можно построить дельту."""
+        return self._floor
+
+    def record(self, uid: int, event: str) -> None:
+        self._version += 1
+        self._events.append((self._version, uid, event))
+
+        if len(self._events) > JOURNAL_LIMIT:
+            cut = len(self._events) // 2
+            self._floor = self._events[cut - 1][0]
+            del self._events[:cut]
+
+    def changes_since(self, version: int) -> Tuple[List[int], List[int], List[int]]:
+        """Сворачивает события после версии в итоговые изменения.
+
+        Args:
+            version (int): Версия, относительно которой считаются изменения.
+
+        Raises:
+            ValueError: Если версия вытеснена из журнала или еще не существует.
+
+        Returns:
+            Tuple[List[int], List[int], List[int]]: uid появившихся, исчезнувших и
+            затронутых сущностей, которые были на карте и до, и после. Последние
+            нужно проверить по текущему состоянию карты. Сущность, которую
+            убрали и вернули, попадает и в исчезнувшие, и в появившиеся:
+            вне карты ее данные могли измениться.
+        """
+        if version < self._floor:
+            raise ValueError(f"Version {version} is no longer in the journal, full dump required")
+
+        if version > self._version:
+            raise ValueError(f"Version {version} is newer than current version {self._version}")
+
+        first_event: Dict[int, str] = {}
+        last_event: Dict[int, str] = {}
+        was_removed: Set[int] = set()
+        start = bisect.bisect_right(self._events, version, key=lambda item: item[0])
+        for _, uid, event in self._events[start:]:
+            first_event.setdefault(uid, event)
+            last_event[uid] = event
+            if event == EVENT_REMOVE:
+                was_removed.add(uid)
+
+        added: List[int] = []
+        removed: List[int] = []
+        touched: List[int] = []
+        for uid, event in first_event.items():
+            is_present = last_event[uid] != EVENT_REMOVE
+            if event == EVENT_ADD:
+                if is_present:
+                    added.append(uid)
+
+            elif not is_present:
+                removed.append(uid)
+
+            elif uid in was_removed:
+                removed.append(uid)
+                added.append(uid)
+
+            else:
+                touched.append(uid)
+
+        return added, removed, touched
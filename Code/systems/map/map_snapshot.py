@@ -0,0 +1,321 @@
+import math
+from pathlib import Path
+from typing import (Any, BinaryIO, Dict, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
+
+import msgpack
+from systems.ecs import BaseEntity, Factory
+from systems.ecs.class_roster import COMPONENT_REGISTRY
+from systems.ecs.schema import schema_fields
+
+from .components import CoordinateComponent, MultiCoordinateComponent
+from .coordinate import Coordinate
+from .map_entity import MapEntity
+
+SNAPSHOT_MAGIC = "DMMAP"
+SNAPSHOT_VERSION = 1
+
+REC_STRING = 0
+REC_ENTITY = 1
+REC_END = 2
+
+# Компоненты координат не пишутся: размещение хранится в самой записи сущности,
+# а MapEntity.add_entity создает их заново
+_PLACEMENT_COMPONENTS = (CoordinateComponent.get_type(), MultiCoordinateComponent.get_type())
+_ENTITY_KEYS = ("id", "type", "components")
+
+# Координаты сущности в записи: одно число pair_xy или список для многоклеточной
+PackedCoords = Union[int, List[int]]
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def pair_xy(x: int, y: int) -> int:
+    """Упаковывает координату в одно неотрицательное число (zigzag + пара Szudzik).
+
+    В отличие от pack_xy, результат растет вместе с удаленностью от начала
+    координат, поэтому типичные координаты занимают в msgpack 1-5 байт.
+    """
+    a, b = _zigzag(x), _zigzag(y)
+    return a * a + a + b if a >= b else a + b * b
+
+
+def unpair_xy(value: int) -> Tuple[int, int]:
+    root = math.isqrt(value)
+    rest = value - root * root
+    if rest < root:
+        return _unzigzag(rest), _unzigzag(root)
+
+    return _unzigzag(root), _unzigzag(rest - root)
+
+
+class _StringTable:
+    __slots__ = ["_indexes", "_packer", "_stream"]
+
+    def __init__(self, packer: msgpack.Packer, stream: BinaryIO) -> None:
+        self._indexes: Dict[str, int] = {}
+        self._packer = packer
+        self._stream = stream
+
+    def index(self, value: str) -> int:
+        index = self._indexes.get(value)
+        if index is None:
+            index = len(self._indexes)
+            self._indexes[value] = index
+            self._stream.write(self._packer.pack([REC_STRING, value]))
+
+        return index
+
+
+class MapSnapshot:
+    """Бинарный снимок карты на msgpack.
+
+    Файл - поток записей: заголовок, затем записи строк и сущностей вперемешку
+    и маркер конца. Имена типов и id сущностей попадают в таблицу строк один раз,
+    координаты пишутся числами. Компоненты со схемой пишутся списком
+    dump_values() со ссылкой на строку с именами полей, поэтому снимок
+    читается и после изменения схемы. Загрузка идет потоково, запись за
+    записью. Формат dump()/restore() остается отладочным.
+    """
+    __slots__ = []
+
+    @staticmethod
+    def dump(map_entity: MapEntity, stream: BinaryIO) -> None:
+        """Записывает снимок карты в бинарный поток.
+
+        Args:
+            map_entity (MapEntity): Карта.
+            stream (BinaryIO): Поток, открытый на запись в бинарном режиме.
+        """
+        packer = msgpack.Packer(use_bin_type=True)
+        stream.write(packer.pack([
+            SNAPSHOT_MAGIC,
+            SNAPSHOT_VERSION,
+            map_entity.id,
+            {name: comp.dump() for name, comp in map_entity._components.items()},
+        ]))
+
+        MapSnapshot.write_entities(MapSnapshot.iter_placed(map_entity), stream)
+
+    @staticmethod
+    def iter_placed(map_entity: MapEntity) -> Iterator[Tuple[BaseEntity, PackedCoords]]:
+        """Итерирует сущности карты по одному разу вместе с упакованными координатами."""
+        multi_type = MultiCoordinateComponent.get_type()
+        written_multi = set()
+        for x, y, bucket in map_entity.entities.iter_cells():
+            for entity in bucket:
+                multi_comp: Optional[MultiCoordinateComponent] = entity.get_component(multi_type)  # type: ignore
+                if multi_comp is None:
+                    yield entity, pair_xy(x, y)
+
+                elif entity.uid not in written_multi:
+                    written_multi.add(entity.uid)
+                    yield entity, [pair_xy(coord.x, coord.y) for coord in multi_comp.coordinates]
+
+    @staticmethod
+    def write_entities(
+        entries: Iterable[Tuple[BaseEntity, PackedCoords]], stream: BinaryIO
+    ) -> None:
+        """Пишет записи сущностей со своей таблицей строк и маркер конца.
+
+        Args:
+            entries (Iterable[Tuple[BaseEntity, PackedCoords]]): Сущности и их координаты из pair_xy.
+            stream (BinaryIO): Поток, открытый на запись в бинарном режиме.
+        """
+        packer = msgpack.Packer(use_bin_type=True)
+        strings = _StringTable(packer, stream)
+        for entity, coords in entries:
+            stream.write(packer.pack(MapSnapshot._entity_record(entity, coords, strings)))
+
+        stream.write(packer.pack([REC_END]))
+
+    @staticmethod
+    def _entity_record(
+        entity: BaseEntity, coords: PackedCoords, strings: _StringTable
+    ) -> List[Any]:
+        components = []
+        for comp_type, comp in entity._components.items():
+            if comp_type in _PLACEMENT_COMPONENTS:
+                continue
+
+            names = type(comp).__dict__.get("schema_names")
+            if names is not None:
+                components.append([
+                    strings.index(comp_type), comp.dump_values(), strings.index(",".join(names))  # type: ignore
+                ])
+
+            else:
+                fields = {key: value for key, value in comp.dump().items() if key != "type"}
+                components.append([strings.index(comp_type), fields])
+
+        entity_names = type(entity).__dict__.get("schema_names")
+        if entity_names is not None:
+            extra = dict(zip(entity_names, entity.dump_values()))  # type: ignore
+
+        else:
+            # Собственные поля сущности без схемы известны только ее dump()
+            extra = {
+                key: value for key, value in entity.dump().items() if key not in _ENTITY_KEYS
+            }
+
+        return [
+            REC_ENTITY,
+            coords,
+            strings.index(entity.type),
+            strings.index(entity.id),
+            components,
+            extra or None,
+        ]
+
+    @staticmethod
+    def load(stream: BinaryIO) -> MapEntity:
+        """Восстанавливает карту из бинарного снимка.
+
+        Сущности создаются через Factory.create_entity по мере чтения потока.
+
+        Args:
+            stream (BinaryIO): Поток, открытый на чтение в бинарном режиме.
+
+        Raises:
+            ValueError: Если поток не является снимком карты, версия формата не
+                поддерживается или снимок оборван.
+
+        Returns:
+            MapEntity: Восстановленная карта.
+        """
+        unpacker = msgpack.Unpacker(stream, raw=False, strict_map_key=False)
+
+        try:
+            header = next(unpacker)
+
+        except StopIteration:
+            raise ValueError("Empty map snapshot")
+
+        if not isinstance(header, list) or len(header) != 4 or header[0] != SNAPSHOT_MAGIC:
+            raise ValueError("Stream is not a map snapshot")
+
+        if header[1] != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported map snapshot version: {header[1]}")
+
+        map_entity = MapEntity(header[2])
+        MapEntity._restore_components(map_entity, {"components": header[3]})
+
+        MapSnapshot.read_entities(unpacker, map_entity)
+        return map_entity
+
+    @staticmethod
+    def read_entities(unpacker: msgpack.Unpacker, map_entity: MapEntity) -> None:
+        """Читает записи сущностей до маркера конца и размещает их на карте.
+
+        Raises:
+            ValueError: Если записи оборваны или не распознаны.
+        """
+        strings: List[str] = []
+        # (тип, имена полей) -> имена, если они не совпадают с текущей схемой
+        layouts: Dict[Tuple[int, int], Optional[List[str]]] = {}
+        for record in unpacker:
+            kind = record[0]
+            if kind == REC_STRING:
+                strings.append(record[1])
+
+            elif kind == REC_ENTITY:
+                _, coords, type_index, id_index, components, extra = record
+                data: Dict[str, Any] = dict(extra) if extra else {}
+                data["id"] = strings[id_index]
+                data["type"] = strings[type_index]
+                data["components"] = {
+                    strings[entry[0]]: MapSnapshot._component_data(entry, strings, layouts)
+                    for entry in components
+                }
+
+                entity = Factory.create_entity(data)
+                if isinstance(coords, list):
+                    map_entity.add_entity(
+                        [MapSnapshot._coordinate(value) for value in coords], entity
+                    )
+
+                else:
+                    map_entity.add_entity(MapSnapshot._coordinate(coords), entity)
+
+            elif kind == REC_END:
+                return
+
+            else:
+                raise ValueError(f"Unknown map snapshot record: {kind}")
+
+        raise ValueError("Map snapshot is truncated")
+
+    @staticmethod
+    def _component_data(
+        entry: List[Any], strings: List[str], layouts: Dict[Tuple[int, int], Optional[List[str]]]
+    ) -> Union[Dict[str, Any], List[Any]]:
+        comp_index, fields = entry[0], entry[1]
+        comp_type = strings[comp_index]
+        if not isinstance(fields, list):
+            return {"type": comp_type, **fields}
+
+        key = (comp_index, entry[2])
+        if key not in layouts:
+            layouts[key] = MapSnapshot._changed_layout(comp_type, strings[entry[2]].split(","))
+
+        names = layouts[key]
+        if names is None:
+            return fields
+
+        return {"type": comp_type, **dict(zip(names, fields))}
+
+    @staticmethod
+    def _changed_layout(comp_type: str, names: List[str]) -> Optional[List[str]]:
+        """Сравнивает имена полей из снимка с текущей схемой компонента.
+
+        Если схема с момента записи изменилась, значения сопоставляются по
+        именам: новые поля получат значения по умолчанию, удаленные
+        пропускаются.
+
+        Raises:
+            ValueError: Если в схеме появилось обязательное поле.
+
+        Returns:
+            Optional[List[str]]: None, если схема та же, иначе имена из снимка.
+        """
+        component_class = COMPONENT_REGISTRY.get(comp_type)
+        if component_class is None:
+            # Неизвестный тип отклонит Factory
+            return names
+
+        if getattr(component_class, "schema_names", None) == tuple(names):
+            return None
+
+        missing = [
+            field.name for field in schema_fields(component_class)
+            if field.required and field.name not in names
+        ]
+        if missing:
+            raise ValueError(
+                f"Map snapshot is incompatible with {comp_type}: "
+                f"required fields {', '.join(missing)} are not in the snapshot"
+            )
+
+        return names
+
+    @staticmethod
+    def _coordinate(value: int) -> Coordinate:
+        return Coordinate.intern(*unpair_xy(value))
+
+    @staticmethod
+    def save_file(map_entity: MapEntity, path: Union[str, Path]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as file:
+            MapSnapshot.dump(map_entity, file)
+
+    @staticmethod
+    def load_file(path: Union[str, Path]) -> MapEntity:
+        with Path(path).open("rb") as file:
+            return MapSnapshot.load(file)
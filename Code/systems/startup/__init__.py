@@ -0,0 +1,4 @@
+from .content_phases import (add_localization_phase, add_prototype_phase,
+                             add_texture_phase)
+from .startup_pipeline import (PhaseTiming, StartupError, StartupPipeline,
+                               StartupReport)
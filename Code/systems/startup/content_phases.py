@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from systems.ecs import PrototypeLoader
+from systems.ecs.prototype_loader import parse_prototype_file
+from systems.localization import iter_loc_files, merge_locales, parse_loc_file
+from systems.texture_validator import DMSValidator
+
+from .startup_pipeline import StartupPipeline
+
+
+def add_prototype_phase(pipeline: StartupPipeline, loader: PrototypeLoader) -> None:
+    """Фаза "prototypes": разбирает в исполнителе только файлы, не совпавшие
+    с кэшем по mtime, и собирает прототипы через loader.load.
+
+    Результат фазы - список прототипов, регистрировать их в Factory нужно
+    после запуска (регистрация не потокобезопасна).
+    """
+    stale = loader.stale_files()
+
+    def merge(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return loader.load({path: results[str(path)] for path in stale})
+
+    pipeline.add_phase(
+        "prototypes", [(str(path), parse_prototype_file, (path,)) for path in stale], merge
+    )
+
+
+def add_texture_phase(pipeline: StartupPipeline, sprites_path: Union[str, Path]) -> None:
+    """Фаза "textures": проверяет каждую директорию DMS (и вложенные) отдельно.
+
+    Результат фазы - список проверенных DMS относительно sprites_path.
+    Фаза необязательная: ошибки проверки попадают в StartupReport.warnings
+    и не прерывают запуск.
+    """
+    dms_list = DMSValidator.list_dms(sprites_path, recursive=True)
+    pipeline.add_phase(
+        "textures",
+        [(str(dms), DMSValidator.validate_dms, (Path(sprites_path), dms)) for dms in dms_list],
+        lambda results: dms_list,
+        fatal=False,
+    )
+
+
+def add_localization_phase(pipeline: StartupPipeline, loc_path: Union[str, Path]) -> None:
+    """Фаза "localization": разбирает каждый .loc файл отдельно.
+
+    Результат фазы - язык -> ключ -> текст, как у load_locales.
+    Фаза необязательная: ошибки разбора попадают в StartupReport.warnings
+    и не прерывают запуск.
+    """
+    files = iter_loc_files(loc_path)
+    pipeline.add_phase(
+        "localization",
+        [(str(path), parse_loc_file, (path,)) for _, path in files],
+        lambda results: merge_locales((lang, path, results[str(path)]) for lang, path in files),
+        fatal=False,
+    )
@@ -0,0 +1,178 @@
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Задача фазы: (ключ, функция, аргументы). Ключ - обычно путь к файлу
+StartupJob = Tuple[str, Callable[..., Any], Tuple[Any, ...]]
+MergeFunc = Callable[[Dict[str, Any]], Any]
+
+
+class StartupError(Exception):
+    """Ошибки запуска всех фаз вместе.
+
+    Args:
+        errors (List[str]): Сообщения вида "[фаза] ключ: ошибка".
+        report (StartupReport): Время по фазам до ошибки.
+    """
+    def __init__(self, errors: List[str], report: "StartupReport") -> None:
+        super().__init__(f"{len(errors)} startup error(s):\n" + "\n".join(errors))
+        self.errors = errors
+        self.report = report
+
+
+class PhaseTiming(NamedTuple):
+    name: str
+    jobs: int
+    busy: float
+    merge: float
+    errors: int
+
+
+class StartupReport:
+    """Результат StartupPipeline.run: результаты merge, время по фазам и
+    ошибки необязательных фаз (warnings)."""
+    __slots__ = ["results", "timings", "warnings", "wall"]
+
+    def __init__(self) -> None:
+        self.results: Dict[str, Any] = {}
+        self.warnings: List[str] = []
+        self.timings: List[PhaseTiming] = []
+        self.wall: float = 0.0
+
+    def format(self) -> List[str]:
+        """Строки таблицы для лога: задачи, суммарное время задач и merge по фазам."""
+        lines = [f"{'phase':<16}{'jobs':>6}{'busy, ms':>12}{'merge, ms':>12}{'errors':>8}"]
+        for timing in self.timings:
+            lines.append(
+                f"{timing.name:<16}{timing.jobs:>6}{timing.busy * 1000:>12.1f}"
+                f"{timing.merge * 1000:>12.1f}{timing.errors:>8}"
+            )
+
+        lines.append(f"{'total wall':<16}{'':>6}{self.wall * 1000:>12.1f}")
+        return lines
+
+
+def _run_job(func: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, Optional[str], float]:
+    """Выполняет задачу в исполнителе. Ошибка возвращается строкой: не все
+    исключения (например, SpriteValidationError) переживают pickle между
+    процессами."""
+    start = time.perf_counter()
+    try:
+        return func(*args), None, time.perf_counter() - start
+
+    except Exception as err:
+        return None, f"{type(err).__name__}: {err}", time.perf_counter() - start
+
+
+class StartupPipeline:
+    """Запускает независимые загрузчики контента параллельно.
+
+    Фаза - это набор задач (обычно по одной на файл) и функция merge,
+    которая собирает их результаты в главном процессе. Задачи всех фаз
+    отправляются в исполнитель сразу. merge фазы вызывается с результатами
+    в порядке добавления задач, а фазы сливаются в порядке добавления,
+    поэтому результат не зависит от порядка завершения задач.
+
+    Для ProcessPoolExecutor функции задач и их аргументы должны
+    сериализоваться pickle, то есть быть функциями уровня модуля или
+    статическими методами.
+    """
+    __slots__ = ["_phases"]
+
+    def __init__(self) -> None:
+        self._phases: List[Tuple[str, List[StartupJob], Optional[MergeFunc], bool]] = []
+
+    def add_phase(
+        self,
+        name: str,
+        jobs: Iterable[StartupJob],
+        merge: Optional[MergeFunc] = None,
+        fatal: bool = True,
+    ) -> None:
+        """Добавляет фазу.
+
+        Args:
+            name (str): Имя фазы в отчете и ошибках.
+            jobs (Iterable[StartupJob]): Задачи (ключ, функция, аргументы).
+            merge (Optional[MergeFunc]): Получает ключ -> результат задачи,
+                ее результат попадает в StartupReport.results[name]. По
+                умолчанию сохраняется сам словарь результатов.
+            fatal (bool): Прерывают ли ошибки фазы запуск. Ошибки
+                необязательной фазы попадают в StartupReport.warnings, а ее
+                результата в StartupReport.results нет. По умолчанию True.
+        """
+        if any(phase[0] == name for phase in self._phases):
+            raise ValueError(f"Startup phase {name} already exists")
+
+        self._phases.append((name, list(jobs), merge, fatal))
+
+    @property
+    def job_count(self) -> int:
+        """Число задач во всех фазах, например для размера пула."""
+        return sum(len(jobs) for _, jobs, _, _ in self._phases)
+
+    def run(self, executor: Optional[Executor] = None) -> StartupReport:
+        """Выполняет все фазы.
+
+        Args:
+            executor (Optional[Executor]): Исполнитель задач. По умолчанию
+                ThreadPoolExecutor, который закрывается после запуска.
+
+        Raises:
+            StartupError: Со всеми ошибками задач и merge обязательных фаз.
+
+        Returns:
+            StartupReport: Результаты и время по фазам.
+        """
+        report = StartupReport()
+        start = time.perf_counter()
+        own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor()
+
+        try:
+            futures = [
+                [executor.submit(_run_job, func, args) for _, func, args in jobs]
+                for _, jobs, _, _ in self._phases
+            ]
+            outcomes = [[future.result() for future in phase] for phase in futures]
+
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        errors: List[str] = []
+        for (name, jobs, merge, fatal), phase_outcomes in zip(self._phases, outcomes):
+            results: Dict[str, Any] = {}
+            phase_errors = 0
+            failures = errors if fatal else report.warnings
+            for (key, _, _), (result, error, _) in zip(jobs, phase_outcomes):
+                if error is not None:
+                    failures.append(f"[{name}] {key}: {error}")
+                    phase_errors += 1
+
+                else:
+                    results[key] = result
+
+            merge_start = time.perf_counter()
+            if not phase_errors:
+                try:
+                    report.results[name] = merge(results) if merge is not None else results
+
+                except Exception as err:
+                    failures.append(f"[{name}] merge: {type(err).__name__}: {err}")
+                    phase_errors += 1
+
+            report.timings.append(PhaseTiming(
+                name,
+                len(jobs),
+                sum(outcome[2] for outcome in phase_outcomes),
+                time.perf_counter() - merge_start,
+                phase_errors,
+            ))
+
+        report.wall = time.perf_counter() - start
+        if errors:
+            raise StartupError(errors, report)
+
+        return report
@@ -233,8 +233,25 @@ class DMSValidator:
             SpriteValidationError: Если хотя бы одна директория некорректна.
         """
         base_path = Path(base_path)
-        for item in base_path.iterdir():
-            if item.is_dir() and item.suffix == '.dms':
-                DMSValidator.validate_dms(base_path, item)
+        for item in DMSValidator.list_dms(base_path):
+            DMSValidator.validate_dms(base_path, item)
 
         return True
+
+    @staticmethod
+    def list_dms(base_path: Union[str, Path], recursive: bool = False) -> List[Path]:
+        """Возвращает директории DMS в базовой директории.
+
+        Args:
+            base_path (Union[str, Path]): Базовый путь к директории с текстурами.
+            recursive (bool): Искать DMS и во вложенных директориях. По умолчанию False.
+
+        Returns:
+            List[Path]: Пути к DMS относительно base_path, отсортированные.
+        """
+        base_path = Path(base_path)
+        items = base_path.rglob('*.dms') if recursive else base_path.iterdir()
+        return sorted(
+            item.relative_to(base_path) for item in items
+            if item.is_dir() and item.suffix == '.dms'
+        )
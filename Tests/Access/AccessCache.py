@@ -0,0 +1,133 @@
+import asyncio
+import unittest
+
+from systems.access import AccessCache
+
+BASE_ACCESS = {"access_admin_chat": False, "change_password": True}
+
+
+class FakeDB:
+    def __init__(self):
+        self.users = {
+            "owner": {"access_admin_chat": True, "change_access": True},
+            "player": {},
+        }
+        self.reads = 0
+
+    async def get_access(self, login):
+        self.reads += 1
+        await asyncio.sleep(0)
+        access = self.users.get(login)
+        return dict(access) if access is not None else None
+
+    async def change_user_access(self, login, access):
+        self.users[login] = dict(access)
+
+
+class TestAccessCache(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeDB()
+        self.cache = AccessCache(self.db.get_access, lambda: BASE_ACCESS)
+
+    def test_checks_are_served_from_cache(self):
+        async def main():
+            results = []
+            for _ in range(100):
+                results.append(await self.cache.check("owner", ["access_admin_chat"]))
+                results.append(await self.cache.check("player", ["access_admin_chat"]))
+
+            return results
+
+        results = asyncio.run(main())
+
+        self.assertEqual(results[:2], [True, False])
+        self.assertEqual(self.db.reads, 2)
+        self.assertEqual(self.cache.stats, {"hits": 198, "misses": 2})
+
+    def test_merged_access_contains_base_flags(self):
+        async def main():
+            return (
+                await self.cache.get_merged_access("player"),
+                await self.cache.get_merged_access("owner"),
+                await self.cache.get_access("player"),
+            )
+
+        player, owner, raw = asyncio.run(main())
+
+        self.assertEqual(player, BASE_ACCESS)
+        self.assertEqual(owner, {"access_admin_chat": True, "change_password": True, "change_access": True})
+        self.assertEqual(raw, {})
+
+    def test_check_uses_base_access(self):
+        async def main():
+            return (
+                await self.cache.check("player", ["change_password"]),
+                await self.cache.check("owner", ["change_password", "access_admin_chat"]),
+                await self.cache.check("ghost", ["change_password"]),
+            )
+
+        # change_password есть только в правах по умолчанию
+        self.assertEqual(asyncio.run(main()), (True, True, False))
+
+    def test_returned_dicts_do_not_leak_into_cache(self):
+        async def main():
+            access = await self.cache.get_access("player")
+            access["access_admin_chat"] = True
+            merged = await self.cache.get_merged_access("player")
+            merged["access_admin_chat"] = True
+            return await self.cache.check("player", ["access_admin_chat"])
+
+        self.assertFalse(asyncio.run(main()))
+
+    def test_store_is_write_through(self):
+        changes = []
+        self.cache.add_listener(changes.append)
+        self.cache.add_listener(changes.append)
+
+        async def main():
+            self.assertFalse(await self.cache.check("player", ["access_admin_chat"]))
+            access = {"access_admin_chat": True}
+            await self.db.change_user_access("player", access)
+            self.cache.store("player", access)
+            return await self.cache.check("player", ["access_admin_chat"])
+
+        self.assertTrue(asyncio.run(main()))
+        self.assertEqual(self.db.reads, 1)
+        self.assertEqual(changes, ["player"])
+
+    def test_invalidate_reloads(self):
+        async def main():
+            self.assertIsNone(await self.cache.get_access("new_user"))
+            self.db.users["new_user"] = {"create_users": True}
+            self.cache.invalidate("new_user")
+            first = await self.cache.check("new_user", ["create_users"])
+            del self.db.users["new_user"]
+            self.cache.invalidate()
+            return first, await self.cache.check("new_user", ["create_users"])
+
+        self.assertEqual(asyncio.run(main()), (True, False))
+
+    def test_change_during_load_is_not_cached(self):
+        async def main():
+            task = asyncio.create_task(self.cache.get_access("player"))
+            await asyncio.sleep(0)
+            self.db.users["player"] = {"access_admin_chat": True}
+            self.cache.invalidate("player")
+            await task
+            return await self.cache.check("player", ["access_admin_chat"])
+
+        self.assertTrue(asyncio.run(main()))
+        self.assertEqual(self.db.reads, 2)
+
+    def test_custom_check(self):
+        cache = AccessCache(
+            self.db.get_access,
+            lambda: BASE_ACCESS,
+            lambda access, need: access.get("change_access", False) or all(access.get(f, False) for f in need),
+        )
+
+        self.assertTrue(asyncio.run(cache.check("owner", ["delete_users"])))
+
+
+if __name__ == "__main__":
+    unittest.main()
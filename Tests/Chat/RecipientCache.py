@@ -0,0 +1,65 @@
+import asyncio
+import unittest
+
+from systems.chat import RecipientCache
+
+
+class FakeServer:
+    def __init__(self):
+        self.resolves = []
+        self.admins = {"admin": object()}
+
+    async def resolve(self, channel):
+        self.resolves.append(channel)
+        await asyncio.sleep(0)
+        return dict(self.admins) if channel == "admin" else None
+
+
+class TestRecipientCache(unittest.TestCase):
+    def test_cached_until_invalidated(self):
+        server = FakeServer()
+        cache = RecipientCache(server.resolve, ttl=60)
+
+        async def main():
+            first = await cache.get("admin")
+            await cache.get("admin")
+            await cache.get("ooc")
+            server.admins["moder"] = object()
+            cache.invalidate("admin")
+            return first, await cache.get("admin")
+
+        first, second = asyncio.run(main())
+
+        self.assertEqual(server.resolves, ["admin", "ooc", "admin"])
+        self.assertEqual(set(first), {"admin"})
+        self.assertEqual(set(second), {"admin", "moder"})
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 3})
+
+    def test_ttl_expires(self):
+        server = FakeServer()
+        cache = RecipientCache(server.resolve, ttl=0)
+
+        async def main():
+            await cache.get("admin")
+            await cache.get("admin")
+
+        asyncio.run(main())
+        self.assertEqual(server.resolves, ["admin", "admin"])
+
+    def test_invalidate_during_resolve_is_not_cached(self):
+        server = FakeServer()
+        cache = RecipientCache(server.resolve, ttl=60)
+
+        async def main():
+            task = asyncio.create_task(cache.get("admin"))
+            await asyncio.sleep(0)
+            cache.invalidate()
+            await task
+            await cache.get("admin")
+
+        asyncio.run(main())
+        self.assertEqual(server.resolves, ["admin", "admin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import random
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from systems.content import (BlobStore, ContentManifest, apply_delta_archive,
+                             build_delta_archive, diff_manifest)
+from systems.content.blob_store import ZIP_DEFLATED, ZIP_STORED
+
+
+class TestBlobStore(unittest.TestCase):
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self.temp = Path(self._temp.name)
+        self.root = self.temp / "Content"
+        (self.root / "Sprites").mkdir(parents=True)
+        (self.root / "loc").mkdir()
+        rng = random.Random(5)
+        (self.root / "Sprites" / "icon.png").write_bytes(b"\x89PNG" + b"\0" * 4096)
+        (self.root / "Sprites" / "noise.bin").write_bytes(rng.randbytes(4096))
+        (self.root / "loc" / "ui.loc").write_text("text-ok = Хорошо\n" * 100, encoding="utf-8")
+        (self.root / "empty.txt").write_bytes(b"")
+        self.store = BlobStore(self.temp / "blobs")
+        self.manifest = ContentManifest(self.root)
+        self.manifest.refresh()
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def _files(self):
+        return [
+            (path, self.root / path, entry.hash)
+            for path, entry in sorted(self.manifest.files.items())
+        ]
+
+    def test_archive_readable_by_zipfile(self):
+        archive = self.store.write_archive(self.temp / "full.zip", self._files(), comment=b"root")
+
+        with zipfile.ZipFile(archive) as zipf:
+            self.assertIsNone(zipf.testzip())
+            self.assertEqual(zipf.comment, b"root")
+            self.assertEqual(sorted(zipf.namelist()), sorted(self.manifest.files))
+            for name in zipf.namelist():
+                self.assertEqual(zipf.read(name), (self.root / name).read_bytes())
+
+            methods = {info.filename: info.compress_type for info in zipf.infolist()}
+
+        self.assertEqual(methods["Sprites/icon.png"], ZIP_STORED)
+        self.assertEqual(methods["Sprites/noise.bin"], ZIP_STORED)
+        self.assertEqual(methods["loc/ui.loc"], ZIP_DEFLATED)
+
+    def test_only_new_files_compressed(self):
+        self.store.write_archive(self.temp / "a.zip", self._files())
+        self.assertEqual(self.store.stats, {"hits": 0, "misses": 4})
+
+        (self.root / "loc" / "ui.loc").write_text("text-ok = Отлично\n", encoding="utf-8")
+        self.manifest.refresh()
+        self.store.write_archive(self.temp / "b.zip", self._files())
+
+        self.assertEqual(self.store.stats, {"hits": 3, "misses": 5})
+
+    def test_archives_are_deterministic(self):
+        first = self.store.write_archive(self.temp / "a.zip", self._files()).read_bytes()
+        second = BlobStore(self.temp / "other").write_archive(self.temp / "b.zip", self._files())
+
+        self.assertEqual(first, second.read_bytes())
+
+    def test_changed_file_rejected(self):
+        files = self._files()
+        (self.root / "loc" / "ui.loc").write_text("changed", encoding="utf-8")
+
+        with self.assertRaises(ValueError):
+            self.store.write_archive(self.temp / "a.zip", files)
+
+        with self.assertRaises(ValueError):
+            self.store.write_archive(self.temp / "a.zip", [("x", None, "0" * 64)])
+
+    def test_collect(self):
+        self.store.write_archive(self.temp / "a.zip", self._files())
+        keep = [self.manifest.files["loc/ui.loc"].hash]
+
+        self.assertEqual(self.store.collect(keep, min_age=3600), 0)
+        self.assertEqual(self.store.collect(keep), 3)
+        self.assertIsNotNone(self.store.get(keep[0]))
+        self.assertIsNone(self.store.get(self.manifest.files["empty.txt"].hash))
+
+    def test_delta_archive_from_blobs(self):
+        client = self.temp / "client"
+        delta = diff_manifest(self.manifest, {})
+        archive = build_delta_archive(self.manifest, delta, self.temp / "delta.zip", self.store)
+
+        self.assertEqual(apply_delta_archive(archive, client), self.manifest.root_hash)
+        self.assertEqual((client / "loc" / "ui.loc").read_bytes(), (self.root / "loc" / "ui.loc").read_bytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from systems.content import (ChunkedDownload, ChunkedTransfers, TransferInfo,
+                             build_transfer_info)
+from systems.content.chunked_transfer import MAX_RANGE_SIZE
+
+
+class ConnectionDropped(Exception):
+    pass
+
+
+class TestChunkedTransfer(unittest.TestCase):
+    CHUNK = 1024
+
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self.temp = Path(self._temp.name)
+        self.data = random.Random(3).randbytes(self.CHUNK * 10 + 123)
+        self.archive = self.temp / "content.zip"
+        self.archive.write_bytes(self.data)
+        self.transfers = ChunkedTransfers(chunk_size=self.CHUNK)
+        self.info = self.transfers.register(self.archive)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def _fetcher(self, calls, fail_after=None):
+        def fetch(transfer_id, index):
+            if fail_after is not None and len(calls) >= fail_after:
+                raise ConnectionDropped()
+
+            calls.append(index)
+            return self.transfers.read_chunk(transfer_id, index)
+
+        return fetch
+
+    def test_info_describes_chunks(self):
+        self.assertEqual(self.info.size, len(self.data))
+        self.assertEqual(self.info.chunk_count, 11)
+        self.assertEqual(self.info, TransferInfo.from_dict(self.info.to_dict()))
+        self.assertEqual(self.info, build_transfer_info(self.archive, self.CHUNK))
+
+    def test_chunks_and_ranges(self):
+        self.assertEqual(self.transfers.read_chunk(self.info.id, 0), self.data[:self.CHUNK])
+        self.assertEqual(self.transfers.read_chunk(self.info.id, 10), self.data[self.CHUNK * 10:])
+        self.assertEqual(self.transfers.read_range(self.info.id, 1000, 50), self.data[1000:1050])
+        self.assertEqual(self.transfers.read_range(self.info.id, len(self.data), 10), b"")
+
+        with self.assertRaises(ValueError):
+            self.transfers.read_chunk(self.info.id, 11)
+
+        with self.assertRaises(ValueError):
+            self.transfers.read_range(self.info.id, -1, 10)
+
+        with self.assertRaises(ValueError):
+            self.transfers.read_chunk("unknown", 0)
+
+    def test_range_is_capped(self):
+        big = self.temp / "big.zip"
+        big.write_bytes(b"\1" * (MAX_RANGE_SIZE + 10))
+        info = self.transfers.register(big)
+
+        self.assertEqual(len(self.transfers.read_range(info.id, 0, MAX_RANGE_SIZE * 2)), MAX_RANGE_SIZE)
+
+    def test_interrupted_download_resumes(self):
+        target = self.temp / "client" / "content.zip"
+        first_calls = []
+
+        with self.assertRaises(ConnectionDropped):
+            ChunkedDownload(self.info, target).download(self._fetcher(first_calls, fail_after=4))
+
+        self.assertEqual(first_calls, [0, 1, 2, 3])
+        self.assertFalse(target.exists())
+        resumed = ChunkedDownload(self.info, target)
+        self.assertEqual(resumed.verified_chunks(), 4)
+
+        second_calls = []
+        resumed.download(self._fetcher(second_calls))
+
+        self.assertEqual(second_calls, list(range(4, 11)))
+        self.assertEqual(target.read_bytes(), self.data)
+        self.assertFalse(resumed.part_path.exists())
+
+    def test_resume_discards_corrupted_tail(self):
+        target = self.temp / "client" / "content.zip"
+        download = ChunkedDownload(self.info, target)
+        download.part_path.parent.mkdir(parents=True)
+        # Три верных блока, испорченный четвертый и обрывок пятого
+        broken = bytearray(self.data[:self.CHUNK * 4 + 100])
+        broken[self.CHUNK * 3 + 5] ^= 0xFF
+        download.part_path.write_bytes(bytes(broken))
+
+        self.assertEqual(download.verified_chunks(), 3)
+        calls = []
+        download.download(self._fetcher(calls))
+
+        self.assertEqual(calls, list(range(3, 11)))
+        self.assertEqual(target.read_bytes(), self.data)
+
+    def test_bad_chunk_is_refetched_then_rejected(self):
+        target = self.temp / "client" / "content.zip"
+        attempts = []
+
+        def flaky(transfer_id, index):
+            attempts.append(index)
+            chunk = self.transfers.read_chunk(transfer_id, index)
+            return b"x" + chunk[1:] if attempts.count(index) == 1 else chunk
+
+        ChunkedDownload(self.info, target).download(flaky)
+        self.assertEqual(target.read_bytes(), self.data)
+
+        with self.assertRaises(ValueError):
+            ChunkedDownload(self.info, self.temp / "other.zip").download(lambda transfer_id, index: b"bad")
+
+    def test_replaced_archive_makes_transfer_stale(self):
+        os.utime(self.archive)
+        self.assertEqual(self.transfers.read_chunk(self.info.id, 1), self.data[self.CHUNK:self.CHUNK * 2])
+
+        replacement = self.temp / "content.zip.tmp"
+        replacement.write_bytes(self.data[::-1])
+        os.replace(replacement, self.archive)
+
+        with self.assertRaises(ValueError):
+            self.transfers.read_chunk(self.info.id, 0)
+
+        info = self.transfers.register(self.archive)
+        self.assertNotEqual(info.id, self.info.id)
+        self.assertEqual(self.transfers.read_chunk(info.id, 0), self.data[::-1][:self.CHUNK])
+
+    def test_register_reuses_info(self):
+        self.assertIs(self.transfers.register(self.archive), self.info)
+
+    def test_empty_file(self):
+        empty = self.temp / "empty.zip"
+        empty.write_bytes(b"")
+        info = self.transfers.register(empty)
+        target = self.temp / "client" / "empty.zip"
+
+        ChunkedDownload(info, target).download(lambda transfer_id, index: b"")
+
+        self.assertEqual(info.chunk_count, 0)
+        self.assertEqual(target.read_bytes(), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from systems.content import (DELTA_INFO_NAME, ContentManifest,
+                             DeltaArchiveCache, apply_delta_archive,
+                             build_delta_archive, diff_manifest,
+                             validate_client_files)
+
+
+class TestContentDelta(unittest.TestCase):
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self.temp = Path(self._temp.name)
+        self.server = self.temp / "server"
+        for i in range(10):
+            path = self.server / f"dir_{i % 3}" / f"file_{i}.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"content {i}", encoding="utf-8")
+
+        self.client = self.temp / "client"
+        shutil.copytree(self.server, self.client)
+        self.client_files = self._client_manifest()
+
+        # Патч контента: один файл изменен, один добавлен, один удален
+        (self.server / "dir_0" / "file_0.txt").write_text("patched", encoding="utf-8")
+        (self.server / "dir_new").mkdir()
+        (self.server / "dir_new" / "added.txt").write_text("added", encoding="utf-8")
+        (self.server / "dir_1" / "file_1.txt").unlink()
+
+        self.manifest = ContentManifest(self.server)
+        self.manifest.refresh()
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def _client_manifest(self):
+        manifest = ContentManifest(self.client)
+        manifest.refresh()
+        return {path: entry.hash for path, entry in manifest.files.items()}
+
+    def test_diff(self):
+        delta = diff_manifest(self.manifest, self.client_files)
+
+        self.assertEqual(delta.changed, ["dir_0/file_0.txt", "dir_new/added.txt"])
+        self.assertEqual(delta.deleted, ["dir_1/file_1.txt"])
+        self.assertEqual(delta.root_hash, self.manifest.root_hash)
+        self.assertEqual(len(diff_manifest(self.manifest, {}).changed), 10)
+
+    def test_archive_roundtrip(self):
+        delta = diff_manifest(self.manifest, self.client_files)
+        archive = build_delta_archive(self.manifest, delta, self.temp / "delta.zip")
+
+        with zipfile.ZipFile(archive) as zipf:
+            self.assertEqual(
+                sorted(zipf.namelist()), [DELTA_INFO_NAME, "dir_0/file_0.txt", "dir_new/added.txt"]
+            )
+
+        root = apply_delta_archive(archive, self.client)
+        client = ContentManifest(self.client)
+        client.refresh()
+
+        self.assertEqual(root, self.manifest.root_hash)
+        self.assertEqual(client.root_hash, self.manifest.root_hash)
+
+    def test_apply_rejects_bad_archives(self):
+        archive = self.temp / "evil.zip"
+        with zipfile.ZipFile(archive, "w") as zipf:
+            zipf.writestr(DELTA_INFO_NAME, json.dumps({"root": "", "deleted": ["../outside.txt"], "files": {}}))
+
+        (self.temp / "outside.txt").write_text("keep", encoding="utf-8")
+        with self.assertRaises(ValueError):
+            apply_delta_archive(archive, self.client)
+
+        self.assertTrue((self.temp / "outside.txt").exists())
+
+        with zipfile.ZipFile(archive, "w") as zipf:
+            zipf.writestr(DELTA_INFO_NAME, json.dumps({"root": "", "deleted": [], "files": {"a.txt": "0" * 64}}))
+            zipf.writestr("a.txt", "tampered")
+
+        with self.assertRaises(ValueError):
+            apply_delta_archive(archive, self.client)
+
+    def test_cache(self):
+        cache = DeltaArchiveCache(self.temp / "deltas", limit=2)
+
+        delta, archive = cache.get_or_build(self.manifest, self.client_files)
+        _, again = cache.get_or_build(self.manifest, dict(self.client_files))
+        self.assertEqual(archive, again)
+        self.assertEqual(len(delta.changed), 2)
+
+        full = {path: entry.hash for path, entry in self.manifest.files.items()}
+        self.assertIsNone(cache.get_or_build(self.manifest, full)[1])
+
+        os.utime(archive, ns=(0, 0))  # type: ignore
+        cache.get_or_build(self.manifest, {})
+        cache.get_or_build(self.manifest, {"dir_0/file_0.txt": "old"})
+        self.assertEqual(len(list((self.temp / "deltas").glob("*.zip"))), 2)
+        self.assertFalse(archive.exists())  # type: ignore
+
+        with self.assertRaises(ValueError):
+            DeltaArchiveCache(self.temp / "deltas", limit=0)
+
+    def test_validate_client_files(self):
+        self.assertEqual(validate_client_files({"a": "b"}), {"a": "b"})
+
+        for bad in (["a"], {"a": 1}, {1: "a"}):
+            with self.assertRaises(ValueError):
+                validate_client_files(bad)
+
+
+if __name__ == '__main__':
+    unittest.main()
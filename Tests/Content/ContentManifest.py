@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from systems.content import ContentManifest, hash_file
+
+
+class TestContentManifest(unittest.TestCase):
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp.name) / "Content"
+        (self.root / "Sprites" / "dev").mkdir(parents=True)
+        (self.root / "loc" / "rus").mkdir(parents=True)
+        self._write("Sprites/dev/a.png", b"sprite a")
+        self._write("Sprites/dev/b.png", b"sprite b")
+        self._write("loc/rus/ui.loc", "key = значение".encode())
+        self._write("changelog.yml", b"- 1.0")
+        self.state = Path(self._temp.name) / "data" / "manifest.msgpack"
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def _write(self, rel_path: str, data: bytes) -> None:
+        path = self.root / rel_path
+        existed = path.exists()
+        old_mtime = path.stat().st_mtime_ns if existed else 0
+        path.write_bytes(data)
+        if existed:
+            # Гарантируем новое mtime даже на ФС с грубым разрешением
+            os.utime(path, ns=(old_mtime + 10**9, old_mtime + 10**9))
+
+    def _manifest(self) -> ContentManifest:
+        manifest = ContentManifest(self.root, self.state)
+        manifest.refresh()
+        return manifest
+
+    def test_entries(self):
+        manifest = self._manifest()
+
+        self.assertEqual(
+            sorted(manifest.files),
+            ["Sprites/dev/a.png", "Sprites/dev/b.png", "changelog.yml", "loc/rus/ui.loc"],
+        )
+        entry = manifest.get("Sprites/dev/a.png")
+        self.assertEqual((entry.size, entry.hash), (8, hash_file(self.root / "Sprites/dev/a.png")))  # type: ignore
+
+    def test_root_changes_only_with_content(self):
+        manifest = self._manifest()
+        root = manifest.root_hash
+        sprites = manifest.dir_hash("Sprites")
+
+        self.assertEqual(manifest.refresh(), [])
+        self._write("changelog.yml", b"- 1.0")
+        self.assertEqual(manifest.refresh(), [])
+        self.assertEqual(manifest.root_hash, root)
+
+        self._write("loc/rus/ui.loc", "key = другое".encode())
+        self.assertEqual(manifest.refresh(), ["loc/rus/ui.loc"])
+        self.assertNotEqual(manifest.root_hash, root)
+        self.assertEqual(manifest.dir_hash("Sprites"), sprites)
+
+        self._write("loc/rus/ui.loc", "key = значение".encode())
+        manifest.refresh()
+        self.assertEqual(manifest.root_hash, root)
+
+    def test_same_content_same_root(self):
+        other_root = Path(self._temp.name) / "Other"
+        for rel_path in self._manifest().files:
+            (other_root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (other_root / rel_path).write_bytes((self.root / rel_path).read_bytes())
+
+        other = ContentManifest(other_root)
+        other.refresh()
+
+        self.assertEqual(other.root_hash, self._manifest().root_hash)
+
+    def test_add_and_remove(self):
+        manifest = self._manifest()
+        root = manifest.root_hash
+
+        (self.root / "Sprites/new").mkdir()
+        self._write("Sprites/new/c.png", b"")
+        self.assertEqual(manifest.refresh(), ["Sprites/new/c.png"])
+        self.assertIsNotNone(manifest.dir_hash("Sprites/new"))
+
+        (self.root / "Sprites/new/c.png").unlink()
+        self.assertEqual(manifest.refresh(), ["Sprites/new/c.png"])
+        self.assertIsNone(manifest.dir_hash("Sprites/new"))
+        self.assertEqual(manifest.root_hash, root)
+
+    def test_update_paths(self):
+        manifest = self._manifest()
+        root = manifest.root_hash
+
+        self._write("Sprites/dev/a.png", b"changed")
+        (self.root / "changelog.yml").unlink()
+
+        changed = manifest.update([self.root / "Sprites/dev/a.png", "changelog.yml", "missing.txt"])
+
+        self.assertEqual(changed, ["Sprites/dev/a.png", "changelog.yml"])
+        self.assertNotIn("changelog.yml", manifest.files)
+        self.assertNotEqual(manifest.root_hash, root)
+
+    def test_state_reused_between_runs(self):
+        root = self._manifest().root_hash
+        self.assertTrue(self.state.is_file())
+
+        manifest = ContentManifest(self.root, self.state)
+        self.assertEqual(manifest.root_hash, root)
+        self.assertEqual(manifest.refresh(), [])
+
+    def test_refresh_if_stale(self):
+        manifest = self._manifest()
+        self._write("changelog.yml", b"- 2.0")
+
+        self.assertEqual(manifest.refresh_if_stale(60), [])
+        self.assertEqual(manifest.refresh_if_stale(0), ["changelog.yml"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+import asyncio
+import time
+import unittest
+
+from systems.content import DownloadScheduler
+
+
+class TestDownloadScheduler(unittest.TestCase):
+    def test_concurrency_is_bounded(self):
+        scheduler = DownloadScheduler(0, max_active=2)
+        peak = 0
+
+        async def download(client):
+            nonlocal peak
+            async with scheduler.transfer(client, 100):
+                peak = max(peak, scheduler.metrics().active)
+                await asyncio.sleep(0.01)
+
+        async def main():
+            tasks = [asyncio.create_task(download(f"player{i}")) for i in range(6)]
+            await asyncio.sleep(0)
+            metrics = scheduler.metrics()
+            await asyncio.gather(*tasks)
+            return metrics
+
+        metrics = asyncio.run(main())
+
+        self.assertEqual(peak, 2)
+        self.assertEqual((metrics.active, metrics.queued, metrics.clients), (2, 4, 6))
+        final = scheduler.metrics()
+        self.assertEqual((final.active, final.queued, final.transfers, final.bytes_sent), (0, 0, 6, 600))
+
+    def test_clients_get_slots_in_turn(self):
+        scheduler = DownloadScheduler(0, max_active=1)
+        order = []
+
+        async def download(client):
+            async with scheduler.transfer(client, 1):
+                order.append(client)
+                await asyncio.sleep(0)
+
+        async def main():
+            # "greedy" ставит в очередь пять запросов раньше остальных
+            tasks = [asyncio.create_task(download("greedy")) for _ in range(5)]
+            tasks += [asyncio.create_task(download(name)) for name in ("a", "b")]
+            await asyncio.gather(*tasks)
+
+        asyncio.run(main())
+
+        self.assertEqual(order, ["greedy", "a", "b", "greedy", "greedy", "greedy", "greedy"])
+
+    def test_bandwidth_budget_paces_transfers(self):
+        scheduler = DownloadScheduler(100_000, max_active=4)
+
+        async def download(client):
+            for _ in range(5):
+                async with scheduler.transfer(client, 5_000):
+                    pass
+
+        async def main():
+            start = time.perf_counter()
+            await asyncio.gather(*(download(f"player{i}") for i in range(4)))
+            return time.perf_counter() - start
+
+        # 4 * 5 * 5000 байт при 100 КБ/с - около 0.2 с, первая передача без ожидания
+        elapsed = asyncio.run(main())
+
+        self.assertGreaterEqual(elapsed, 0.18)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(scheduler.metrics().bytes_sent, 100_000)
+        self.assertGreater(scheduler.metrics().throughput, 0)
+
+    def test_large_transfer_shares_bandwidth(self):
+        scheduler = DownloadScheduler(1_000_000, max_active=2, quantum=10_000)
+        finished = {}
+
+        async def download(client, size):
+            async with scheduler.transfer(client, size):
+                finished[client] = time.perf_counter()
+
+        async def main():
+            start = time.perf_counter()
+            large = asyncio.create_task(download("large", 500_000))
+            await asyncio.sleep(0)
+            await download("small", 10_000)
+            await large
+            return start
+
+        start = asyncio.run(main())
+
+        # Архив на 0.5 с не занимает канал целиком: маленькая передача
+        # получает свою часть сразу после текущей части большой
+        self.assertLess(finished["small"] - start, 0.1)
+        self.assertGreaterEqual(finished["large"] - start, 0.45)
+
+    def test_send_is_paced_while_running(self):
+        scheduler = DownloadScheduler(100_000, max_active=1, quantum=5_000)
+        sent = asyncio.Event()
+
+        async def send_file():
+            sent.set()
+            return "done"
+
+        async def main():
+            start = time.perf_counter()
+            async with scheduler.transfer("player") as transfer:
+                result = await transfer.send(send_file(), 20_000)
+
+            return result, time.perf_counter() - start
+
+        result, elapsed = asyncio.run(main())
+
+        self.assertEqual(result, "done")
+        self.assertTrue(sent.is_set())
+        self.assertGreaterEqual(elapsed, 0.14)
+        self.assertEqual(scheduler.metrics().bytes_sent, 20_000)
+
+    def test_failed_send_stops_pacing(self):
+        scheduler = DownloadScheduler(10_000, max_active=1, quantum=1_000)
+
+        async def send_file():
+            raise ConnectionError("closed")
+
+        async def main():
+            with self.assertRaises(ConnectionError):
+                async with scheduler.transfer("player") as transfer:
+                    await transfer.send(send_file(), 1_000_000)
+
+            await asyncio.sleep(0.01)
+            return scheduler.metrics()
+
+        metrics = asyncio.run(main())
+
+        self.assertEqual(metrics.active, 0)
+        self.assertLess(metrics.bytes_sent, 1_000_000)
+
+    def test_interactive_work_goes_first(self):
+        scheduler = DownloadScheduler(0, max_active=1, quantum=1_000, interactive_wait=1.0)
+        events = []
+
+        async def chat():
+            async with scheduler.interactive():
+                events.append("chat start")
+                self.assertEqual(scheduler.metrics().interactive, 1)
+                await asyncio.sleep(0.05)
+                events.append("chat end")
+
+        async def download():
+            async with scheduler.transfer("player") as transfer:
+                for _ in range(3):
+                    await transfer.pace(1_000)
+                    events.append("chunk")
+                    await asyncio.sleep(0.01)
+
+        async def main():
+            task = asyncio.create_task(download())
+            await asyncio.sleep(0.005)
+            await chat()
+            await task
+
+        asyncio.run(main())
+
+        self.assertEqual(events, ["chunk", "chat start", "chat end", "chunk", "chunk"])
+        self.assertEqual(scheduler.metrics().interactive, 0)
+
+    def test_waiting_does_not_block_loop(self):
+        scheduler = DownloadScheduler(50_000, max_active=1)
+        ticks = 0
+
+        async def ticker(done):
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def main():
+            done = asyncio.Event()
+            task = asyncio.create_task(ticker(done))
+            for _ in range(3):
+                async with scheduler.transfer("player", 5_000):
+                    pass
+
+            done.set()
+            await task
+
+        asyncio.run(main())
+
+        self.assertGreaterEqual(ticks, 10)
+
+    def test_cancelled_waiter_frees_queue(self):
+        scheduler = DownloadScheduler(0, max_active=1)
+
+        async def main():
+            release = asyncio.Event()
+
+            async def holder():
+                async with scheduler.transfer("a", 1):
+                    await release.wait()
+
+            first = asyncio.create_task(holder())
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(holder())
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.metrics().queued, 1)
+
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            self.assertEqual(scheduler.metrics().queued, 0)
+
+            release.set()
+            await first
+            async with scheduler.transfer("b", 1):
+                return scheduler.metrics().active
+
+        self.assertEqual(asyncio.run(main()), 1)
+        self.assertEqual(scheduler.metrics().active, 0)
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            DownloadScheduler(-1)
+
+        with self.assertRaises(ValueError):
+            DownloadScheduler(0, max_active=0)
+
+        with self.assertRaises(ValueError):
+            DownloadScheduler(0, quantum=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+import random
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from systems.content import (ContentManifest, SingleFlight,
+                             build_delta_archive, diff_manifest)
+
+
+async def max_loop_gap(work, interval: float = 0.005):
+    """Выполняет work() и возвращает ее результат и наибольшую задержку
+    цикла событий, замеченную тикером за это время."""
+    gaps = []
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            gaps.append(now - last - interval)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    try:
+        result = await work()
+
+    finally:
+        done.set()
+        await task
+
+    return result, max(gaps)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        started = []
+
+        def rebuild():
+            started.append(threading.get_ident())
+            time.sleep(0.05)
+            return "archive"
+
+        async def main():
+            return await asyncio.gather(*(flight.run("archive", rebuild) for _ in range(20)))
+
+        self.assertEqual(asyncio.run(main()), ["archive"] * 20)
+        self.assertEqual(len(started), 1)
+        self.assertEqual((flight.calls, flight.executions), (20, 1))
+        self.assertFalse(flight.is_running("archive"))
+
+    def test_key_released_after_failure(self):
+        flight = SingleFlight()
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            time.sleep(0.01)
+            if len(attempts) == 1:
+                raise OSError("disk busy")
+
+            return "ok"
+
+        async def main():
+            first = await asyncio.gather(
+                flight.run("key", flaky), flight.run("key", flaky), return_exceptions=True
+            )
+            return first, await flight.run("key", flaky)
+
+        first, second = asyncio.run(main())
+
+        self.assertTrue(all(isinstance(result, OSError) for result in first))
+        self.assertEqual(second, "ok")
+        self.assertEqual(len(attempts), 2)
+
+    def test_cancelled_waiter_does_not_cancel_others(self):
+        flight = SingleFlight()
+
+        async def main():
+            first = asyncio.create_task(flight.run("key", time.sleep, 0.05))
+            second = asyncio.create_task(flight.run("key", time.sleep, 0.05))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        self.assertIsNone(asyncio.run(main()))
+
+    def test_event_loop_stays_responsive_during_rebuild(self):
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp) / "Content"
+            rng = random.Random(1)
+            for i in range(300):
+                path = root / f"dir_{i % 10}" / f"file_{i}.bin"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(rng.randbytes(64 * 1024))
+
+            def rebuild() -> float:
+                start = time.perf_counter()
+                manifest = ContentManifest(root)
+                manifest.refresh()
+                build_delta_archive(manifest, diff_manifest(manifest, {}), Path(temp) / "full.zip")
+                return time.perf_counter() - start
+
+            async def blocking():
+                return rebuild()
+
+            async def offloaded():
+                flight = SingleFlight()
+                results = await asyncio.gather(*(flight.run("archive", rebuild) for _ in range(5)))
+                self.assertEqual(flight.executions, 1)
+                return results[0]
+
+            build_time, blocked_gap = asyncio.run(max_loop_gap(blocking))
+            _, offloaded_gap = asyncio.run(max_loop_gap(offloaded))
+
+        # Синхронная пересборка останавливает цикл на все время работы,
+        # в пуле потоков задержка ограничена переключением GIL
+        self.assertGreaterEqual(blocked_gap, build_time * 0.5)
+        self.assertLess(offloaded_gap, max(0.1, build_time * 0.25))
+
+
+if __name__ == '__main__':
+    unittest.main()
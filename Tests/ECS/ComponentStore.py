@@ -0,0 +1,140 @@
+import gc
+import unittest
+from typing import Any, Dict
+
+from systems.ecs import (BaseComponent, BaseEntity, ComponentStore, Factory,
+                         register_component, register_entity)
+
+
+@register_component
+class StoreHealthComponent(BaseComponent):
+    def __init__(self, health: int = 100) -> None:
+        super().__init__()
+        self.health = health
+
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type, "health": self.health}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "StoreHealthComponent":
+        return cls(data.get("health", 100))
+
+
+@register_component
+class StoreArmorComponent(BaseComponent):
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "StoreArmorComponent":
+        return cls()
+
+
+@register_entity
+class StoreMob(BaseEntity):
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "components": {
+                name: comp.dump() for name, comp in self._components.items()
+            },
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "StoreMob":
+        entity = cls(id=data["id"])
+        cls._restore_components(entity, data)
+        return entity
+
+
+def spawn(with_armor: bool) -> BaseEntity:
+    components: Dict[str, Any] = {"StoreHealthComponent": {"type": "StoreHealthComponent"}}
+    if with_armor:
+        components["StoreArmorComponent"] = {"type": "StoreArmorComponent"}
+
+    return Factory.create_entity({"id": "mob", "type": "StoreMob", "components": components})
+
+
+class TestComponentStore(unittest.TestCase):
+    def setUp(self):
+        ComponentStore.clear()
+
+    def test_query_created_entities(self):
+        armored = [spawn(True) for _ in range(3)]
+        plain = [spawn(False) for _ in range(5)]
+
+        rows = ComponentStore.query("StoreHealthComponent", "StoreArmorComponent")
+        self.assertEqual({row[0] for row in rows}, set(armored))
+        for entity, health, armor in rows:
+            self.assertIs(health, entity.get_component("StoreHealthComponent"))
+            self.assertIs(armor, entity.get_component("StoreArmorComponent"))
+
+        self.assertEqual(len(ComponentStore.query("StoreHealthComponent")), len(armored + plain))
+        self.assertEqual(ComponentStore.query("StoreArmorComponent", "MissingComponent"), [])
+
+    def test_component_changes_update_index(self):
+        entity = spawn(False)
+        self.assertEqual(ComponentStore.query("StoreArmorComponent"), [])
+
+        armor = StoreArmorComponent()
+        entity.add_component(armor)
+        self.assertEqual(ComponentStore.query("StoreArmorComponent"), [(entity, armor)])
+
+        replacement = StoreArmorComponent()
+        entity.add_component(replacement)
+        self.assertEqual(ComponentStore.query("StoreArmorComponent"), [(entity, replacement)])
+
+        entity.remove_component("StoreArmorComponent")
+        self.assertEqual(ComponentStore.query("StoreArmorComponent"), [])
+        self.assertEqual(ComponentStore.count("StoreArmorComponent"), 0)
+        self.assertIsNone(entity.get_component("StoreArmorComponent"))
+
+    def test_entities_without_uid_are_not_indexed(self):
+        prototype = StoreMob("proto")
+        prototype.add_component(StoreArmorComponent())
+
+        self.assertFalse(ComponentStore.is_attached(prototype))
+        self.assertEqual(ComponentStore.query("StoreArmorComponent"), [])
+
+        with self.assertRaises(ValueError):
+            ComponentStore.attach(prototype)
+
+    def test_detach(self):
+        entity = spawn(True)
+        ComponentStore.detach(entity)
+
+        self.assertEqual(ComponentStore.query("StoreHealthComponent"), [])
+        entity.remove_component("StoreHealthComponent")
+        self.assertEqual(ComponentStore.count("StoreHealthComponent"), 0)
+
+    def test_weak_query_survives_collection(self):
+        Factory.set_weak_registry(True)
+        threshold = gc.get_threshold()
+        try:
+            kept = [spawn(True) for _ in range(20)]
+            for _ in range(20):
+                gc.disable()
+                for _ in range(50):
+                    spawn(True)
+
+                # Брошенные сущности собираются прямо во время запроса
+                gc.set_threshold(1)
+                gc.enable()
+                rows = ComponentStore.query("StoreHealthComponent", "StoreArmorComponent")
+                gc.set_threshold(*threshold)
+                self.assertTrue(set(kept) <= {row[0] for row in rows})
+                self.assertTrue(all(None not in row for row in rows))
+
+        finally:
+            gc.set_threshold(*threshold)
+            gc.enable()
+            Factory.set_weak_registry(False)
+
+    def test_query_requires_types(self):
+        with self.assertRaises(ValueError):
+            ComponentStore.query()
+
+
+if __name__ == '__main__':
+    unittest.main()
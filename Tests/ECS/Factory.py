@@ -0,0 +1,319 @@
+import copy
+import gc
+import unittest
+from typing import Any, Dict, List, Optional
+
+from systems.ecs import (BaseComponent, BaseEntity, ComponentStore, Factory,
+                         World, register_component, register_entity)
+from systems.ecs.factory import split_uid
+
+
+@register_component
+class FactoryInventoryComponent(BaseComponent):
+    def __init__(self, slots: Optional[List[str]] = None, size: int = 4) -> None:
+        super().__init__()
+        self.slots: List[str] = slots if slots is not None else []
+        self.size = size
+
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type, "slots": self.slots, "size": self.size}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "FactoryInventoryComponent":
+        return cls(data.get("slots"), data.get("size", 4))
+
+    def reset(self, data: Dict[str, Any]) -> None:
+        slots = data.get("slots")
+        self.slots = slots if slots is not None else []
+        self.size = data.get("size", 4)
+
+
+@register_entity
+class FactoryItem(BaseEntity):
+    def __init__(self, id: str = "", name: str = "") -> None:
+        super().__init__(id)
+        self.name = name
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "name": self.name,
+            "components": {
+                name: comp.dump() for name, comp in self._components.items()
+            },
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "FactoryItem":
+        entity = cls(id=data["id"], name=data.get("name", ""))
+        cls._restore_components(entity, data)
+        return entity
+
+    def reset(self, data: Dict[str, Any]) -> None:
+        self.set_id(data["id"])
+        self.name = data.get("name", "")
+        self._restore_components(self, data)
+
+
+@register_entity
+class FactoryRock(BaseEntity):
+    def dump(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "FactoryRock":
+        return cls(id=data["id"])
+
+
+@register_entity
+class FactoryNote(BaseEntity):
+    # Хранит дамп как есть, без разбора полей
+    def __init__(self, id: str = "", data: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(id)
+        self.data: Dict[str, Any] = data if data is not None else {}
+
+    def dump(self) -> Dict[str, Any]:
+        return self.data
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "FactoryNote":
+        return cls(id=data["id"], data=data)
+
+
+class TestFactorySpawn(unittest.TestCase):
+    def setUp(self):
+        self.base = Factory.register_base_entity({
+            "id": "backpack",
+            "type": "FactoryItem",
+            "name": "Backpack",
+            "components": {
+                "FactoryInventoryComponent": {
+                    "type": "FactoryInventoryComponent",
+                    "slots": ["knife"],
+                    "size": 8,
+                },
+            },
+        })
+
+    def test_copy_matches_prototype(self):
+        copy = Factory.get_base_entity_copy("backpack")
+
+        self.assertIsNot(copy, self.base)
+        self.assertEqual(copy.dump(), self.base.dump())  # type: ignore
+        self.assertNotEqual(copy.uid, 0)  # type: ignore
+
+        inventory = copy.get_component("FactoryInventoryComponent")  # type: ignore
+        self.assertIs(inventory.owner, copy)  # type: ignore
+
+    def test_copies_do_not_share_state(self):
+        first, second = Factory.spawn_many("backpack", 2)
+        first.get_component("FactoryInventoryComponent").slots.append("rope")  # type: ignore
+
+        self.assertEqual(second.get_component("FactoryInventoryComponent").slots, ["knife"])  # type: ignore
+        self.assertEqual(self.base.get_component("FactoryInventoryComponent").slots, ["knife"])  # type: ignore
+
+        fresh = Factory.get_base_entity_copy("backpack")
+        self.assertEqual(fresh.get_component("FactoryInventoryComponent").slots, ["knife"])  # type: ignore
+
+    def test_copy_does_not_share_template_data(self):
+        Factory.register_base_entity({"id": "note", "type": "FactoryNote", "text": "hello"})
+
+        first = Factory.get_base_entity_copy("note")
+        first.data["text"] = "changed"  # type: ignore
+
+        second = Factory.get_base_entity_copy("note")
+        self.assertEqual(second.data["text"], "hello")  # type: ignore
+        self.assertIn(second.uid, Factory._entity_registry_by_uid)  # type: ignore
+
+    def test_spawn_many(self):
+        entities = Factory.spawn_many("backpack", 10)
+
+        self.assertEqual(len(entities), 10)
+        self.assertEqual(len({entity.uid for entity in entities}), 10)
+        self.assertEqual(len({id(entity) for entity in entities}), 10)
+        self.assertEqual(Factory.spawn_many("backpack", 0), [])
+
+    def test_unknown_prototype(self):
+        self.assertIsNone(Factory.get_base_entity_copy("missing"))
+
+        with self.assertRaises(ValueError):
+            Factory.spawn_many("missing", 3)
+
+    def test_deepcopy_fallback(self):
+        copy = Factory.get_base_entity_deepcopy("backpack")
+
+        self.assertEqual(copy.dump(), self.base.dump())  # type: ignore
+        self.assertNotEqual(copy.uid, 0)  # type: ignore
+
+    def test_destroying_copy_keeps_prototype_uid(self):
+        # Прототип, которому кто-то выдал uid, не делит его с копиями
+        Factory.assign_new_uid_if_needed(self.base)
+        base_uid = self.base.uid
+
+        for spawned in (Factory.get_base_entity_copy("backpack"), Factory.get_base_entity_deepcopy("backpack")):
+            self.assertNotEqual(spawned.uid, base_uid)  # type: ignore
+            Factory.destroy_entity(spawned)  # type: ignore
+
+        self.assertIs(Factory.get_entity_by_uid(base_uid), self.base)
+        self.assertNotIn(split_uid(base_uid)[0], Factory._free_indices)
+        Factory.destroy_entity(self.base)
+
+
+class TestFactoryPool(unittest.TestCase):
+    def setUp(self):
+        Factory.register_base_entity({
+            "id": "bag",
+            "type": "FactoryItem",
+            "name": "Bag",
+            "components": {
+                "FactoryInventoryComponent": {
+                    "type": "FactoryInventoryComponent",
+                    "slots": ["apple"],
+                },
+            },
+        })
+        Factory.enable_pool(FactoryItem, limit=2)
+        Factory.enable_pool(FactoryInventoryComponent, limit=2)
+
+    def tearDown(self):
+        Factory.disable_pool(FactoryItem)
+        Factory.disable_pool(FactoryInventoryComponent)
+
+    def test_release_unregisters(self):
+        entity = Factory.create_entity({"id": "rock", "type": "FactoryRock"})
+        uid = entity.uid
+
+        Factory.destroy_entity(entity)
+
+        self.assertIsNone(Factory.get_entity_by_uid(uid))
+        self.assertEqual(entity.uid, 0)
+
+        with self.assertRaises(ValueError):
+            Factory.destroy_entity(entity)
+
+    def test_released_objects_are_reused(self):
+        bag = Factory.get_base_entity_copy("bag")
+        inventory = bag.get_component("FactoryInventoryComponent")  # type: ignore
+        inventory.slots.append("knife")  # type: ignore
+        bag.name = "Used bag"  # type: ignore
+
+        Factory.destroy_entity(bag)  # type: ignore
+        self.assertIsNone(bag.get_component("FactoryInventoryComponent"))  # type: ignore
+        self.assertIsNone(inventory.owner)  # type: ignore
+
+        reused = Factory.get_base_entity_copy("bag")
+        self.assertIs(reused, bag)
+        self.assertIs(reused.get_component("FactoryInventoryComponent"), inventory)  # type: ignore
+        self.assertEqual(reused.dump(), Factory._base_entity_registry["bag"].dump())  # type: ignore
+        self.assertIs(inventory.owner, reused)  # type: ignore
+        self.assertNotEqual(reused.uid, 0)  # type: ignore
+
+        stats = Factory.pool_stats()["FactoryItem"]
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_pool_is_bounded(self):
+        for entity in Factory.spawn_many("bag", 5):
+            Factory.destroy_entity(entity)
+
+        stats = Factory.pool_stats()["FactoryItem"]
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["dropped"], 3)
+
+    def test_pool_requires_reset(self):
+        self.assertFalse(hasattr(FactoryRock, "reset"))
+        with self.assertRaises(ValueError):
+            Factory.enable_pool(FactoryRock)
+
+
+
+class TestEntityLifecycle(unittest.TestCase):
+    def tearDown(self):
+        Factory.set_weak_registry(False)
+
+    def _create_rock(self) -> BaseEntity:
+        return Factory.create_entity({"id": "rock", "type": "FactoryRock"})
+
+    def test_destroy_recycles_index_with_new_generation(self):
+        rock = self._create_rock()
+        old_uid = rock.uid
+
+        Factory.destroy_entity(rock)
+        self.assertFalse(Factory.is_alive(old_uid))
+
+        new_rock = self._create_rock()
+        self.assertEqual(split_uid(new_rock.uid)[0], split_uid(old_uid)[0])
+        self.assertEqual(split_uid(new_rock.uid)[1], split_uid(old_uid)[1] + 1)
+        self.assertIsNone(Factory.get_entity_by_uid(old_uid))
+        self.assertIs(Factory.get_entity_by_uid(new_rock.uid), new_rock)
+
+    def test_steady_churn_keeps_registry_flat(self):
+        for _ in range(3):
+            for rock in [self._create_rock() for _ in range(50)]:
+                Factory.destroy_entity(rock)
+
+        registry_size = len(Factory._entity_registry_by_uid)
+        index_count = len(Factory._generations)
+        for _ in range(20):
+            for rock in [self._create_rock() for _ in range(50)]:
+                Factory.destroy_entity(rock)
+
+        self.assertEqual(len(Factory._entity_registry_by_uid), registry_size)
+        self.assertEqual(len(Factory._generations), index_count)
+
+    def test_destroying_foreign_copy_keeps_original(self):
+        rock = self._create_rock()
+        stray = copy.deepcopy(rock)
+        self.assertEqual(stray.uid, rock.uid)
+
+        Factory.destroy_entity(stray)
+
+        self.assertEqual(stray.uid, 0)
+        self.assertIs(Factory.get_entity_by_uid(rock.uid), rock)
+        self.assertNotIn(split_uid(rock.uid)[0], Factory._free_indices)
+        self.assertNotEqual(self._create_rock().uid, rock.uid)
+
+    def test_assign_uid_for_stale_entity(self):
+        rock = FactoryRock("rock")
+        rock.set_uid(10**12)
+
+        Factory.assign_new_uid_if_needed(rock)
+
+        self.assertIs(Factory.get_entity_by_uid(rock.uid), rock)
+        self.assertTrue(ComponentStore.is_attached(rock))
+
+    def test_weak_registry_drops_unreferenced_entities(self):
+        World.clear()
+        Factory.set_weak_registry(True)
+        view = World.query(FactoryInventoryComponent)
+
+        kept = Factory.create_entity({
+            "id": "bag",
+            "type": "FactoryItem",
+            "components": {"FactoryInventoryComponent": {"type": "FactoryInventoryComponent"}},
+        })
+        dropped = Factory.create_entity({
+            "id": "bag",
+            "type": "FactoryItem",
+            "components": {"FactoryInventoryComponent": {"type": "FactoryInventoryComponent"}},
+        })
+        dropped_uid = dropped.uid
+        self.assertIn(dropped, view)
+
+        del dropped
+        gc.collect()
+
+        self.assertFalse(Factory.is_alive(dropped_uid))
+        self.assertEqual(view.entities(), [kept])
+        self.assertEqual(ComponentStore.count("FactoryInventoryComponent"), 1)
+        self.assertIn(split_uid(dropped_uid)[0], Factory._free_indices)
+
+        Factory.set_weak_registry(False)
+        self.assertTrue(Factory.is_alive(kept.uid))
+        self.assertEqual(view.entities(), [kept])
+
+
+if __name__ == '__main__':
+    unittest.main()
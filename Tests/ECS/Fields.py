@@ -0,0 +1,102 @@
+import copy
+import unittest
+from typing import Any, Dict
+
+from systems.ecs import (BaseComponent, BaseEntity, Factory, dump_fields,
+                         register_component, register_entity, restore_fields,
+                         slot_fields)
+
+
+@register_component
+class SlotStatsComponent(BaseComponent):
+    __slots__ = ["health", "armor"]
+
+    def __init__(self, health: int = 100, armor: int = 0) -> None:
+        super().__init__()
+        self.health = health
+        self.armor = armor
+
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type, **dump_fields(self)}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "SlotStatsComponent":
+        comp = cls()
+        restore_fields(comp, data)
+        return comp
+
+
+@register_component
+class SlotBossStatsComponent(SlotStatsComponent):
+    __slots__ = ["phase"]
+
+    def __init__(self, health: int = 1000, armor: int = 5, phase: int = 1) -> None:
+        super().__init__(health, armor)
+        self.phase = phase
+
+
+@register_entity
+class SlotMob(BaseEntity):
+    __slots__ = ["name"]
+
+    def __init__(self, id: str = "", name: str = "") -> None:
+        super().__init__(id)
+        self.name = name
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            **dump_fields(self),
+            "components": {
+                name: comp.dump() for name, comp in self._components.items()
+            },
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "SlotMob":
+        entity = cls(id=data["id"])
+        restore_fields(entity, data)
+        cls._restore_components(entity, data)
+        return entity
+
+
+class TestFields(unittest.TestCase):
+    def test_slot_fields(self):
+        self.assertEqual(slot_fields(SlotStatsComponent), ("health", "armor"))
+        self.assertEqual(slot_fields(SlotBossStatsComponent), ("health", "armor", "phase"))
+        self.assertEqual(slot_fields(SlotMob), ("name",))
+
+    def test_slotted_instances_have_no_dict(self):
+        mob = SlotMob("goblin", "Goblin")
+        mob.add_component(SlotBossStatsComponent())
+
+        self.assertFalse(hasattr(mob, "__dict__"))
+        self.assertFalse(hasattr(mob.get_component("SlotBossStatsComponent"), "__dict__"))
+
+    def test_roundtrip_through_factory(self):
+        mob = SlotMob("goblin", "Goblin")
+        mob.add_component(SlotBossStatsComponent(health=300, phase=2))
+
+        restored = Factory.create_entity(mob.dump())
+
+        self.assertIsInstance(restored, SlotMob)
+        self.assertEqual(restored.dump(), mob.dump())
+        self.assertEqual(restored.get_component("SlotBossStatsComponent").phase, 2)  # type: ignore
+        self.assertEqual(copy.deepcopy(restored).dump(), mob.dump())
+
+    def test_dict_backed_fields(self):
+        comp = SlotStatsComponent()
+        self.assertEqual(dump_fields(comp), {"health": 100, "armor": 0})
+
+        class Plain:
+            def __init__(self) -> None:
+                self.name = "plain"
+
+        plain = Plain()
+        restore_fields(plain, {"name": "restored", "type": "Plain", "unknown": 1})
+        self.assertEqual(dump_fields(plain), {"name": "restored"})
+
+
+if __name__ == '__main__':
+    unittest.main()
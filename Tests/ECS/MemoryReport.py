@@ -0,0 +1,47 @@
+import unittest
+
+from systems.ecs import format_memory_report, memory_report
+
+from .ComponentStore import StoreHealthComponent, StoreMob
+from .Fields import SlotMob, SlotStatsComponent
+
+
+class TestMemoryReport(unittest.TestCase):
+    def test_report_by_type(self):
+        entities = []
+        for i in range(3):
+            mob = SlotMob("goblin", f"Goblin {i}")
+            mob.add_component(SlotStatsComponent())
+            entities.append(mob)
+
+        plain = StoreMob("mob")
+        plain.add_component(StoreHealthComponent())
+        entities.append(plain)
+
+        report = memory_report(entities)
+
+        slot_stats = report["entities"]["SlotMob"]
+        self.assertEqual(slot_stats["count"], 3)
+        self.assertEqual(slot_stats["dict_backed"], 0)
+        self.assertGreater(slot_stats["per_instance"], 0)
+        self.assertEqual(report["entities"]["StoreMob"]["dict_backed"], 1)
+        self.assertEqual(report["components"]["SlotStatsComponent"]["count"], 3)
+        self.assertEqual(report["components"]["StoreHealthComponent"]["dict_backed"], 1)
+        self.assertLess(
+            report["components"]["SlotStatsComponent"]["per_instance"],
+            report["components"]["StoreHealthComponent"]["per_instance"],
+        )
+
+        text = format_memory_report(report)
+        self.assertIn("SlotStatsComponent", text)
+        self.assertIn("components:", text)
+
+    def test_defaults_to_live_registry(self):
+        report = memory_report()
+
+        self.assertIn("entities", report)
+        self.assertIn("components", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
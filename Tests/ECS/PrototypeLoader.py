@@ -0,0 +1,158 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from systems.ecs import (BaseComponent, BaseEntity, Factory, PrototypeLoader,
+                         register_component, register_entity)
+from systems.ecs.prototype_loader import parse_prototypes
+
+
+@register_component
+class ProtoHealthComponent(BaseComponent):
+    hp: int = 100
+    regen: int = 0
+
+
+@register_component
+class ProtoTagsComponent(BaseComponent):
+    tags: List[str] = []
+
+
+@register_entity
+class ProtoCreature(BaseEntity):
+    name: str = ""
+
+
+CREATURES = """
+- type: ProtoCreature
+  id: proto_rat
+  name: Rat
+  components:
+    - type: ProtoHealthComponent
+      hp: 10
+      regen: 1
+    - type: ProtoTagsComponent
+      tags: [small]
+"""
+
+ITEMS = """
+- type: ProtoCreature
+  id: 42
+  components:
+    ProtoHealthComponent:
+      hp: 5
+"""
+
+
+class TestPrototypeLoader(unittest.TestCase):
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp.name) / "Prototype"
+        (self.root / "mobs").mkdir(parents=True)
+        (self.root / "mobs" / "creatures.yml").write_text(CREATURES, encoding="utf-8")
+        (self.root / "items.yaml").write_text(ITEMS, encoding="utf-8")
+        (self.root / "readme.txt").write_text("not a prototype", encoding="utf-8")
+        self.cache = Path(self._temp.name) / "data" / "cache.msgpack"
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def _loader(self) -> PrototypeLoader:
+        return PrototypeLoader([self.root], self.cache)
+
+    def _touch(self, path: Path, text: str) -> None:
+        stat = path.stat()
+        path.write_text(text, encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_normalizes_components(self):
+        prototypes = {proto["id"]: proto for proto in self._loader().load()}
+
+        self.assertEqual(set(prototypes), {"proto_rat", "42"})
+        self.assertEqual(
+            prototypes["proto_rat"]["components"]["ProtoHealthComponent"],
+            {"type": "ProtoHealthComponent", "hp": 10, "regen": 1},
+        )
+        self.assertEqual(
+            prototypes["42"]["components"],
+            {"ProtoHealthComponent": {"type": "ProtoHealthComponent", "hp": 5}},
+        )
+
+    def test_warm_load_uses_cache(self):
+        cold = self._loader()
+        expected = cold.load()
+        self.assertEqual(cold.stats, {"files": 2, "parsed": 2, "cached": 0})
+        self.assertTrue(self.cache.is_file())
+
+        warm = self._loader()
+        self.assertEqual(warm.load(), expected)
+        self.assertEqual(warm.stats, {"files": 2, "parsed": 0, "cached": 2})
+
+    def test_only_changed_files_reparsed(self):
+        self._loader().load()
+        self._touch(self.root / "items.yaml", ITEMS.replace("hp: 5", "hp: 7"))
+        self._touch(self.root / "mobs" / "creatures.yml", CREATURES)
+
+        loader = self._loader()
+        prototypes = {proto["id"]: proto for proto in loader.load()}
+
+        # creatures.yml тронут, но не изменен - совпал хэш
+        self.assertEqual(loader.stats, {"files": 2, "parsed": 1, "cached": 1})
+        self.assertEqual(prototypes["42"]["components"]["ProtoHealthComponent"]["hp"], 7)
+
+        again = self._loader()
+        again.load()
+        self.assertEqual(again.stats["parsed"], 0)
+
+    def test_removed_file_dropped(self):
+        self._loader().load()
+        (self.root / "items.yaml").unlink()
+
+        prototypes = self._loader().load()
+
+        self.assertEqual([proto["id"] for proto in prototypes], ["proto_rat"])
+
+    def test_corrupt_cache_ignored(self):
+        self.cache.parent.mkdir(parents=True)
+        self.cache.write_bytes(b"\xc1garbage")
+
+        loader = self._loader()
+        self.assertEqual(len(loader.load()), 2)
+        self.assertEqual(loader.stats["parsed"], 2)
+
+    def test_duplicate_id(self):
+        (self.root / "copy.yml").write_text(CREATURES, encoding="utf-8")
+
+        with self.assertRaises(ValueError):
+            self._loader().load()
+
+    def test_validation(self):
+        self.assertEqual(parse_prototypes("# only comments\n"), [])
+
+        for text in (
+            "type: ProtoCreature",
+            "- type: ProtoCreature",
+            "- id: no_type",
+            "- {type: ProtoCreature, id: a, components: [{hp: 1}]}",
+            "- {type: ProtoCreature, id: a, components: [{type: A}, {type: A}]}",
+            "- {type: ProtoCreature, id: a, components: 5}",
+            "- [unclosed",
+        ):
+            with self.assertRaises(ValueError, msg=text):
+                parse_prototypes(text)
+
+    def test_register_all(self):
+        self.assertEqual(self._loader().register_all(), 2)
+
+        rat = Factory.get_base_entity_copy("proto_rat")
+
+        self.assertIsInstance(rat, ProtoCreature)
+        self.assertEqual(rat.name, "Rat")  # type: ignore
+        self.assertEqual(rat.get_component("ProtoHealthComponent").hp, 10)  # type: ignore
+        self.assertEqual(rat.get_component("ProtoTagsComponent").tags, ["small"])  # type: ignore
+
+
+if __name__ == '__main__':
+    unittest.main()
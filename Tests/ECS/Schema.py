@@ -0,0 +1,178 @@
+import unittest
+from typing import Annotated, Any, ClassVar, Dict, List
+
+from systems.ecs import (BaseComponent, BaseEntity, Factory, FieldCodec,
+                         register_component, register_entity)
+from systems.ecs.schema import schema_fields
+
+
+@register_component
+class SchemaStatsComponent(BaseComponent):
+    health: int = 100
+    armor: int = 0
+    tags: List[str] = []
+    max_health: ClassVar[int] = 1000
+
+
+@register_component
+class SchemaBossStatsComponent(SchemaStatsComponent):
+    phase: int = 1
+
+
+@register_component
+class SchemaSlotComponent(BaseComponent):
+    __slots__ = ["name", "level"]
+
+    name: str
+    level: int
+
+
+@register_component
+class SchemaCustomComponent(BaseComponent):
+    value: int = 0
+
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type, "value": self.value, "custom": True}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "SchemaCustomComponent":
+        comp = cls.__new__(cls)
+        BaseComponent.__init__(comp)
+        comp.value = data.get("value", 0)
+        return comp
+
+
+@register_component
+class SchemaLabelComponent(BaseComponent):
+    # Пишется заглавными буквами, в памяти хранится строчными
+    label: Annotated[str, FieldCodec(str.upper, str.lower)] = "none"
+
+    def __init__(self, label: str = "none") -> None:
+        super().__init__()
+        self.label = label
+        self.built = True
+
+
+@register_entity
+class SchemaMob(BaseEntity):
+    name: str = "mob"
+    level: int = 1
+
+
+class TestSchema(unittest.TestCase):
+    def test_fields(self):
+        names = [field.name for field in schema_fields(SchemaBossStatsComponent)]
+        self.assertEqual(names, ["health", "armor", "tags", "phase"])
+        self.assertEqual(SchemaBossStatsComponent.schema_names, ("health", "armor", "tags", "phase"))
+
+    def test_generated_init_and_dump(self):
+        comp = SchemaStatsComponent(health=50)
+
+        self.assertIsNone(comp.owner)
+        self.assertEqual(
+            comp.dump(),
+            {"type": "SchemaStatsComponent", "health": 50, "armor": 0, "tags": []},
+        )
+        self.assertIsNot(comp.tags, SchemaStatsComponent().tags)
+
+    def test_restore_uses_defaults(self):
+        comp = SchemaBossStatsComponent.restore({"type": "SchemaBossStatsComponent", "phase": 3})
+
+        self.assertEqual(comp.health, 100)
+        self.assertEqual(comp.phase, 3)
+        self.assertEqual(comp.dump()["type"], "SchemaBossStatsComponent")
+
+    def test_values_roundtrip(self):
+        comp = SchemaBossStatsComponent(health=7, tags=["boss"], phase=2)
+        values = comp.dump_values()
+
+        self.assertEqual(values, [7, 0, ["boss"], 2])
+        self.assertEqual(SchemaBossStatsComponent.restore_values(values).dump(), comp.dump())
+
+        # Данные, записанные до добавления полей в конец схемы
+        short = SchemaBossStatsComponent.restore_values([1, 2])
+        self.assertEqual(short.dump(), SchemaBossStatsComponent(health=1, armor=2).dump())
+
+        with self.assertRaises(ValueError):
+            SchemaBossStatsComponent.restore_values([1, 2, [], 3, 4])
+
+    def test_required_slotted_fields(self):
+        comp = SchemaSlotComponent("knight", 3)
+
+        self.assertFalse(hasattr(comp, "__dict__"))
+        self.assertEqual(comp.dump(), {"type": "SchemaSlotComponent", "name": "knight", "level": 3})
+
+        with self.assertRaises(KeyError):
+            SchemaSlotComponent.restore({"type": "SchemaSlotComponent", "name": "knight"})
+
+        with self.assertRaises(ValueError):
+            SchemaSlotComponent.restore_values(["knight"])
+
+    def test_codec_and_own_init(self):
+        comp = SchemaLabelComponent("boss")
+
+        self.assertEqual(comp.dump(), {"type": "SchemaLabelComponent", "label": "BOSS"})
+        self.assertEqual(comp.dump_values(), ["BOSS"])
+
+        for restored in (
+            SchemaLabelComponent.restore({"type": "SchemaLabelComponent", "label": "ELITE"}),
+            SchemaLabelComponent.restore_values(["ELITE"]),
+        ):
+            self.assertEqual(restored.label, "elite")
+            self.assertTrue(restored.built)
+
+        self.assertEqual(SchemaLabelComponent.restore({"type": "SchemaLabelComponent"}).label, "none")
+
+    def test_handwritten_methods_are_kept(self):
+        comp = SchemaCustomComponent.restore({"type": "SchemaCustomComponent", "value": 5})
+
+        self.assertEqual(comp.dump(), {"type": "SchemaCustomComponent", "value": 5, "custom": True})
+        self.assertFalse(hasattr(SchemaCustomComponent, "dump_values"))
+
+    def test_entity_schema(self):
+        mob = SchemaMob("goblin", name="Goblin", level=4)
+        mob.add_component(SchemaStatsComponent(health=10))
+
+        restored = Factory.create_entity(mob.dump())
+
+        self.assertIsInstance(restored, SchemaMob)
+        self.assertEqual(restored.dump(), mob.dump())
+        self.assertEqual(restored.level, 4)  # type: ignore
+
+    def test_entity_with_packed_components(self):
+        restored = Factory.create_entity({
+            "id": "goblin",
+            "type": "SchemaMob",
+            "components": {"SchemaStatsComponent": [10, 2, ["elite"]]},
+        })
+
+        stats = restored.get_component("SchemaStatsComponent")
+        self.assertEqual((stats.health, stats.armor, stats.tags), (10, 2, ["elite"]))  # type: ignore
+        self.assertIs(stats.owner, restored)  # type: ignore
+
+    def test_pooled_packed_components(self):
+        Factory.enable_pool(SchemaStatsComponent)
+        try:
+            first = Factory.create_entity({
+                "id": "goblin",
+                "type": "SchemaMob",
+                "components": {"SchemaStatsComponent": [10, 2, []]},
+            })
+            stats = first.get_component("SchemaStatsComponent")
+            Factory.destroy_entity(first)
+
+            second = Factory.create_entity({
+                "id": "goblin",
+                "type": "SchemaMob",
+                "components": {"SchemaStatsComponent": [20, 1, []]},
+            })
+
+            self.assertIs(second.get_component("SchemaStatsComponent"), stats)
+            self.assertEqual(stats.health, 20)  # type: ignore
+
+        finally:
+            Factory.disable_pool(SchemaStatsComponent)
+
+
+if __name__ == '__main__':
+    unittest.main()
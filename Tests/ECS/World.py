@@ -0,0 +1,87 @@
+import unittest
+
+from systems.ecs import ComponentStore, World
+
+from .ComponentStore import (StoreArmorComponent, StoreHealthComponent,
+                             StoreMob, spawn)
+
+
+class TestWorld(unittest.TestCase):
+    def setUp(self):
+        World.clear()
+
+    def test_query_is_cached(self):
+        view = World.query(StoreHealthComponent, StoreArmorComponent)
+
+        self.assertIs(World.query(StoreHealthComponent, StoreArmorComponent), view)
+        self.assertIs(World.query("StoreHealthComponent", "StoreArmorComponent"), view)
+        self.assertEqual(view.types, ("StoreHealthComponent", "StoreArmorComponent"))
+
+    def test_view_follows_new_entities(self):
+        view = World.query(StoreHealthComponent, StoreArmorComponent)
+        armored = spawn(True)
+        spawn(False)
+
+        self.assertEqual(view.entities(), [armored])
+        entity, health, armor = view.rows()[0]
+        self.assertIs(health, armored.get_component("StoreHealthComponent"))
+        self.assertIs(armor, armored.get_component("StoreArmorComponent"))
+
+    def test_view_follows_component_changes(self):
+        entity = spawn(False)
+        view = World.query(StoreArmorComponent)
+        self.assertEqual(len(view), 0)
+
+        armor = StoreArmorComponent()
+        entity.add_component(armor)
+        self.assertIn(entity, view)
+        self.assertEqual(view.rows(), [(entity, armor)])
+
+        replacement = StoreArmorComponent()
+        entity.add_component(replacement)
+        self.assertEqual(view.rows(), [(entity, replacement)])
+
+        entity.remove_component("StoreArmorComponent")
+        self.assertNotIn(entity, view)
+        self.assertEqual(view.rows(), [])
+
+    def test_view_matches_store_query(self):
+        entities = [spawn(i % 3 == 0) for i in range(30)]
+        view = World.query(StoreHealthComponent, StoreArmorComponent)
+
+        for entity in entities[::4]:
+            entity.remove_component("StoreHealthComponent")
+
+        for entity in entities[1::5]:
+            entity.add_component(StoreArmorComponent())
+
+        ComponentStore.detach(entities[3])
+
+        expected = ComponentStore.query("StoreHealthComponent", "StoreArmorComponent")
+        by_uid = lambda row: row[0].uid  # noqa: E731
+        self.assertEqual(sorted(view.rows(), key=by_uid), sorted(expected, key=by_uid))
+
+    def test_changes_during_iteration(self):
+        for _ in range(5):
+            spawn(True)
+
+        view = World.query(StoreArmorComponent)
+        for entity, _ in view:
+            entity.remove_component("StoreArmorComponent")
+
+        self.assertEqual(len(view), 0)
+
+    def test_unregistered_entities_are_ignored(self):
+        view = World.query(StoreArmorComponent)
+        prototype = StoreMob("proto")
+        prototype.add_component(StoreArmorComponent())
+
+        self.assertEqual(len(view), 0)
+
+    def test_query_requires_types(self):
+        with self.assertRaises(ValueError):
+            World.query()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from Code.root_path import ROOT_PATH
+from systems.localization import load_locales, parse_loc
+
+
+class TestLocParser(unittest.TestCase):
+    def test_parse(self):
+        entries = parse_loc(
+            "# comment\n"
+            "text-a = Текст = с равно  \n"
+            "\n"
+            "desc-a=Описание\n"
+        )
+
+        self.assertEqual(entries, {"text-a": "Текст = с равно", "desc-a": "Описание"})
+
+    def test_invalid_lines(self):
+        for text in ("no separator", " = value", "a = 1\na = 2"):
+            with self.assertRaises(ValueError, msg=text):
+                parse_loc(text)
+
+    def test_load_locales(self):
+        with tempfile.TemporaryDirectory() as temp:
+            base = Path(temp)
+            (base / "rus" / "ui").mkdir(parents=True)
+            (base / "eng").mkdir()
+            (base / "rus" / "a.loc").write_text("key-a = А", encoding="utf-8")
+            (base / "rus" / "ui" / "b.loc").write_text("key-b = Б", encoding="utf-8")
+            (base / "eng" / "a.loc").write_text("key-a = A", encoding="utf-8")
+
+            self.assertEqual(
+                load_locales(base),
+                {"eng": {"key-a": "A"}, "rus": {"key-a": "А", "key-b": "Б"}},
+            )
+
+            (base / "rus" / "ui" / "c.loc").write_text("key-a = again", encoding="utf-8")
+            with self.assertRaises(ValueError):
+                load_locales(base)
+
+    def test_content_locales(self):
+        locales = load_locales(ROOT_PATH / "Content" / "loc")
+
+        self.assertIn("text-change_password", locales["rus"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import copy
+import pickle
+import unittest
+
+from systems.map.coordinate import Coordinate, pack_xy, unpack_xy
+
+
+class TestCoordinate(unittest.TestCase):
+    def test_pack_roundtrip(self):
+        for x, y in [(0, 0), (-1, 1), (123, -456), (-(2**31), 2**31 - 1)]:
+            self.assertEqual(unpack_xy(pack_xy(x, y)), (x, y))
+            self.assertEqual(Coordinate(x, y).key, pack_xy(x, y))
+
+    def test_str_compatibility(self):
+        coord = Coordinate.from_str("12 -34")
+        self.assertEqual((coord.x, coord.y), (12, -34))
+        self.assertEqual(str(coord), "12 -34")
+        self.assertEqual(Coordinate.from_str(str(Coordinate(-5, 7))), Coordinate(-5, 7))
+
+    def test_eq_and_hash(self):
+        self.assertEqual(Coordinate(1, 2), Coordinate(1, 2))
+        self.assertNotEqual(Coordinate(1, 2), Coordinate(2, 1))
+        self.assertEqual(Coordinate(1, 2), (1, 2))
+        self.assertNotEqual(Coordinate(1, 2), "1 2")
+        self.assertEqual(hash(Coordinate(3, -3)), hash(Coordinate(3, -3)))
+        self.assertIn(Coordinate(3, -3), {Coordinate(3, -3): None})
+        self.assertEqual(hash(Coordinate(1, 2)), hash((1, 2)))
+        self.assertIn((1, 2), {Coordinate(1, 2)})
+        self.assertIn(Coordinate(1, 2), {(1, 2): None})
+
+    def test_immutable(self):
+        coord = Coordinate.intern(4, 5)
+        with self.assertRaises(AttributeError):
+            coord.x = 7  # type: ignore
+
+        with self.assertRaises(AttributeError):
+            del coord.y
+
+        self.assertEqual((coord.x, coord.y, coord.key), (4, 5, pack_xy(4, 5)))
+
+    def test_copy(self):
+        coord = Coordinate(-3, 9)
+        self.assertEqual(copy.deepcopy([coord]), [coord])
+        self.assertEqual(pickle.loads(pickle.dumps(coord)), coord)
+
+    def test_intern(self):
+        self.assertIs(Coordinate.intern(10, 20), Coordinate.intern(10, 20))
+        self.assertIs(Coordinate.from_key(pack_xy(10, 20)), Coordinate.intern(10, 20))
+
+    def test_no_instance_dict(self):
+        with self.assertRaises(AttributeError):
+            Coordinate(0, 0).z = 1  # type: ignore
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from systems.map.coordinate import Coordinate
+from systems.map.lazy_map_entity import LazyMapEntity, chunk_key
+from systems.map.map_entity import MapEntity
+
+from .MapSnapshot import SnapshotHealthComponent, SnapshotItem, map_layout
+
+
+class TestLazyMapEntity(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "map.dmmapc"
+
+        self.map = MapEntity("lazy_map")
+        for i in range(200):
+            entity = SnapshotItem("crate", name=f"crate_{i}")
+            entity.add_component(SnapshotHealthComponent(i))
+            self.map.add_entity(Coordinate((i * 37) % 160 - 80, (i * 53) % 160 - 80), entity)
+
+        # Стол на границе чанков: владелец - чанк клетки (15, 0)
+        self.map.add_entity(
+            [Coordinate(15, 0), Coordinate(16, 0)], SnapshotItem("table", name="table")
+        )
+
+        LazyMapEntity.save_chunked(self.map, self.path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_open_loads_nothing(self):
+        lazy = LazyMapEntity.open(self.path)
+
+        self.assertEqual(lazy.id, "lazy_map")
+        self.assertEqual(lazy.loaded_chunk_count, 0)
+        self.assertEqual(len(lazy.entities), 0)
+        self.assertEqual(lazy.stored_chunk_count, self.map.entities.chunk_count)
+
+    def test_queries_load_touched_chunks(self):
+        lazy = LazyMapEntity.open(self.path)
+        center = Coordinate(-40, 30)
+
+        expected = sorted(e.name for e in self.map.get_entities_in_radius(center, 12))  # type: ignore
+        found = sorted(e.name for e in lazy.get_entities_in_radius(center, 12))  # type: ignore
+
+        self.assertEqual(found, expected)
+        self.assertLess(lazy.loaded_chunk_count, lazy.stored_chunk_count)
+
+    def test_multi_tile_entity_pulls_home_chunk(self):
+        lazy = LazyMapEntity.open(self.path)
+
+        found = lazy.get_entities(Coordinate(16, 0))
+        self.assertEqual([e.name for e in found], ["table"])  # type: ignore
+        self.assertIn(chunk_key(15, 0), lazy._resident)
+        self.assertEqual(lazy.get_entities(Coordinate(15, 0)), found)
+
+    def test_eviction_keeps_data(self):
+        lazy = LazyMapEntity.open(self.path, max_loaded_chunks=2)
+
+        for x in range(-80, 80, 16):
+            for y in range(-80, 80, 16):
+                lazy.get_entities_in_rect(Coordinate(x, y), Coordinate(x + 15, y + 15))
+                self.assertLessEqual(lazy.loaded_chunk_count, 2)
+
+        self.assertLess(len(lazy.entities), len(self.map.entities))
+
+        lazy.dump()
+        self.assertEqual(map_layout(lazy), map_layout(self.map))
+
+    def test_changes_survive_eviction(self):
+        lazy = LazyMapEntity.open(self.path, max_loaded_chunks=1)
+
+        center = Coordinate(-78, -78)
+        lazy.add_entity(Coordinate(-79, -79), SnapshotItem("crate", name="new"))
+        lazy.get_entities_in_radius(Coordinate(70, 70), 2)
+
+        self.assertEqual(lazy.loaded_chunk_count, 1)
+        self.assertEqual(
+            len(lazy.get_entities_in_radius(center, 2)),
+            len(self.map.get_entities_in_radius(center, 2)) + 1,
+        )
+
+    def test_save_chunked_from_lazy(self):
+        lazy = LazyMapEntity.open(self.path, max_loaded_chunks=4)
+        lazy.get_entities_in_radius(Coordinate(0, 0), 20)
+
+        resaved = Path(self._tmp.name) / "resaved.dmmapc"
+        LazyMapEntity.save_chunked(lazy, resaved)
+        reopened = LazyMapEntity.open(resaved)
+        reopened.dump()
+
+        self.assertEqual(map_layout(reopened), map_layout(self.map))
+
+    def test_save_chunked_to_own_source(self):
+        lazy = LazyMapEntity.open(self.path, max_loaded_chunks=4)
+        lazy.add_entity(Coordinate(-79, -79), SnapshotItem("crate", name="new"))
+
+        LazyMapEntity.save_chunked(lazy, self.path)
+
+        found = lazy.get_entities_in_radius(Coordinate(40, 40), 30)
+        self.assertEqual(
+            len(found), len(self.map.get_entities_in_radius(Coordinate(40, 40), 30))
+        )
+        lazy.dump()
+        self.assertEqual(len(map_layout(lazy)), len(map_layout(self.map)) + 1)
+
+        reopened = LazyMapEntity.open(self.path)
+        reopened.dump()
+        self.assertEqual(map_layout(reopened), map_layout(lazy))
+
+    def test_radius_batch_with_small_budget(self):
+        lazy = LazyMapEntity.open(self.path, max_loaded_chunks=1)
+        queries = [(Coordinate(-40, 30), 12.0), (Coordinate(50, -50), 12.0)]
+
+        found = [
+            sorted(e.name for e in result)  # type: ignore
+            for result in lazy.get_entities_in_radius_batch(queries)
+        ]
+        expected = [
+            sorted(e.name for e in self.map.get_entities_in_radius(center, radius))  # type: ignore
+            for center, radius in queries
+        ]
+
+        self.assertTrue(all(expected))
+        self.assertEqual(found, expected)
+
+    def test_bad_file(self):
+        bad = Path(self._tmp.name) / "bad.dmmapc"
+        bad.write_bytes(b"not a map")
+
+        with self.assertRaises(ValueError):
+            LazyMapEntity.open(bad)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,323 @@
+import math
+import random
+import unittest
+from typing import Any, Dict
+from unittest import mock
+
+from systems.ecs import BaseEntity, register_entity
+from systems.map.components import (CoordinateComponent,
+                                    MultiCoordinateComponent)
+from systems.map import chunk_storage
+from systems.map.coordinate import Coordinate
+from systems.map import map_journal
+from systems.map.map_entity import MapEntity
+
+
+@register_entity
+class DummyMapItem(BaseEntity):
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "components": {
+                name: comp.dump() for name, comp in self._components.items()
+            },
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "DummyMapItem":
+        entity = cls(id=data["id"])
+        cls._restore_components(entity, data)
+        return entity
+
+
+def brute_radius(placed, center: Coordinate, radius: float):
+    result = set()
+    for coord, entity in placed:
+        if math.sqrt((coord.x - center.x) ** 2 + (coord.y - center.y) ** 2) <= radius:
+            result.add(entity)
+
+    return result
+
+
+class TestMapEntity(unittest.TestCase):
+    def setUp(self):
+        self.map = MapEntity("test_map")
+        self.rng = random.Random(42)
+
+    def _fill(self, count: int, spread: int):
+        placed = []
+        for i in range(count):
+            coord = Coordinate(
+                self.rng.randint(-spread, spread), self.rng.randint(-spread, spread)
+            )
+            entity = DummyMapItem(f"item_{i}")
+            self.map.add_entity(coord, entity)
+            placed.append((coord, entity))
+
+        return placed
+
+    def test_add_and_get(self):
+        entity = DummyMapItem("item")
+        self.map.add_entity(Coordinate(3, -7), entity)
+
+        self.assertEqual(self.map.get_entities(Coordinate(3, -7)), [entity])
+        self.assertEqual(self.map.get_entities(3, -7), [entity])
+        self.assertIsNone(self.map.get_entities(Coordinate(4, -7)))
+        self.assertTrue(entity.has_component(CoordinateComponent.get_type()))
+
+        # Результат - копия, карта меняется только через add_entity/remove_entity
+        self.map.get_entities(3, -7).clear()  # type: ignore
+        self.assertEqual(self.map.get_entities(3, -7), [entity])
+
+    def test_remove_frees_chunks(self):
+        entity = DummyMapItem("item")
+        self.map.add_entity(Coordinate(100, 100), entity)
+        self.assertEqual(self.map.entities.chunk_count, 1)
+
+        self.map.remove_entity(Coordinate(100, 100), entity)
+        self.assertIsNone(self.map.get_entities(Coordinate(100, 100)))
+        self.assertEqual(self.map.entities.chunk_count, 0)
+        self.assertFalse(entity.has_component(CoordinateComponent.get_type()))
+
+    def test_crowded_tile(self):
+        crowd = [DummyMapItem(f"item_{i}") for i in range(chunk_storage.BUCKET_SET_THRESHOLD * 2)]
+        for entity in crowd:
+            self.map.add_entity(Coordinate(1, 1), entity)
+
+        self.assertEqual(self.map.get_entities(Coordinate(1, 1)), crowd)
+
+        for entity in crowd[::2]:
+            self.map.remove_entity(Coordinate(1, 1), entity)
+
+        self.assertEqual(self.map.get_entities(Coordinate(1, 1)), crowd[1::2])
+
+    def test_multi_coordinate_entity(self):
+        entity = DummyMapItem("table")
+        coords = [Coordinate(15, 0), Coordinate(16, 0), Coordinate(17, 0)]
+        self.map.add_entity(coords, entity)
+
+        for coord in coords:
+            self.assertEqual(self.map.get_entities(coord), [entity])
+
+        self.assertEqual(self.map.get_entities_in_radius(Coordinate(0, 0), 20), [entity])
+
+        self.map.remove_entity(Coordinate(16, 0), entity)
+        for coord in coords:
+            self.assertIsNone(self.map.get_entities(coord))
+
+        self.assertFalse(entity.has_component(MultiCoordinateComponent.get_type()))
+
+    def test_radius_matches_brute_force(self):
+        placed = self._fill(500, 60)
+
+        for _ in range(30):
+            center = Coordinate(self.rng.randint(-70, 70), self.rng.randint(-70, 70))
+            radius = self.rng.choice([0, 1, 1.5, 4, 10.7, 33, 200])
+            self.assertEqual(
+                set(self.map.get_entities_in_radius(center, radius)),
+                brute_radius(placed, center, radius),
+            )
+
+    def _check_radius_batch(self):
+        placed = self._fill(800, 60)
+        queries = [
+            (
+                Coordinate(self.rng.randint(-70, 70), self.rng.randint(-70, 70)),
+                self.rng.choice([-1, 0, 1.5, 8, 20, 90]),
+            )
+            for _ in range(40)
+        ]
+
+        results = self.map.get_entities_in_radius_batch(queries)
+
+        self.assertEqual(len(results), len(queries))
+        for (center, radius), result in zip(queries, results):
+            self.assertEqual(len(result), len(set(result)))
+            self.assertEqual(set(result), brute_radius(placed, center, radius))
+
+    def test_radius_batch_matches_brute_force(self):
+        self._check_radius_batch()
+
+    def test_radius_batch_without_numpy(self):
+        with mock.patch.object(chunk_storage, "np", None):
+            self._check_radius_batch()
+
+    def test_rect_matches_brute_force(self):
+        placed = self._fill(500, 60)
+
+        for _ in range(30):
+            first = Coordinate(self.rng.randint(-70, 70), self.rng.randint(-70, 70))
+            second = Coordinate(self.rng.randint(-70, 70), self.rng.randint(-70, 70))
+            expected = {
+                entity
+                for coord, entity in placed
+                if min(first.x, second.x) <= coord.x <= max(first.x, second.x)
+                and min(first.y, second.y) <= coord.y <= max(first.y, second.y)
+            }
+            self.assertEqual(set(self.map.get_entities_in_rect(first, second)), expected)
+
+    def test_nearest_matches_brute_force(self):
+        placed = self._fill(300, 200)
+
+        for _ in range(30):
+            center = Coordinate(self.rng.randint(-250, 250), self.rng.randint(-250, 250))
+            count = self.rng.choice([1, 5, 40, 1000])
+            result = self.map.get_nearest_entities(center, count)
+
+            distances = sorted(
+                (coord.x - center.x) ** 2 + (coord.y - center.y) ** 2
+                for coord, _ in placed
+            )[:count]
+            result_distances = [
+                (e.get_component("CoordinateComponent").coord.x - center.x) ** 2  # type: ignore
+                + (e.get_component("CoordinateComponent").coord.y - center.y) ** 2  # type: ignore
+                for e in result
+            ]
+            self.assertEqual(result_distances, distances)
+
+    def test_nearest_respects_max_radius(self):
+        near = DummyMapItem("near")
+        far = DummyMapItem("far")
+        self.map.add_entity(Coordinate(3, 4), near)
+        self.map.add_entity(Coordinate(300, 400), far)
+
+        self.assertEqual(self.map.get_nearest_entities(Coordinate(0, 0), 2, 5), [near])
+        self.assertEqual(self.map.get_nearest_entities(Coordinate(0, 0), 2), [near, far])
+
+    def test_teleport(self):
+        entity = DummyMapItem("item")
+        self.map.add_entity(Coordinate(0, 0), entity)
+        self.map.teleport_entity(Coordinate(0, 0), Coordinate(-40, 25), entity)
+
+        self.assertIsNone(self.map.get_entities(Coordinate(0, 0)))
+        self.assertEqual(self.map.get_entities(Coordinate(-40, 25)), [entity])
+
+    def test_teleport_keeps_component(self):
+        entity = DummyMapItem("item")
+        self.map.add_entity(Coordinate(0, 0), entity)
+        comp = entity.get_component(CoordinateComponent.get_type())
+
+        self.map.teleport_entity(Coordinate(0, 0), Coordinate(5, 5), entity)
+
+        self.assertIs(entity.get_component(CoordinateComponent.get_type()), comp)
+        self.assertEqual(comp.coord, Coordinate(5, 5))  # type: ignore
+
+    def test_move_multi_coordinate_entity(self):
+        entity = DummyMapItem("table")
+        self.map.add_entity([Coordinate(0, 0), Coordinate(1, 0)], entity)
+
+        self.map.move_entity(entity, 10, -3)
+        self.assertIsNone(self.map.get_entities(Coordinate(0, 0)))
+        self.assertEqual(self.map.get_entities(Coordinate(10, -3)), [entity])
+        self.assertEqual(self.map.get_entities(Coordinate(11, -3)), [entity])
+
+        self.map.teleport_entity(Coordinate(11, -3), Coordinate(21, -3), entity)
+        self.assertEqual(self.map.get_entities(Coordinate(20, -3)), [entity])
+        self.assertEqual(self.map.get_entities(Coordinate(21, -3)), [entity])
+        self.assertIsNone(self.map.get_entities(Coordinate(10, -3)))
+
+        comp = entity.get_component(MultiCoordinateComponent.get_type())
+        self.assertEqual(comp.coordinates, [Coordinate(20, -3), Coordinate(21, -3)])  # type: ignore
+
+    def test_move_unplaced_entity(self):
+        with self.assertRaises(ValueError):
+            self.map.move_entity(DummyMapItem("item"), 1, 1)
+
+    def test_dump_restore_roundtrip(self):
+        self._fill(50, 40)
+        table = DummyMapItem("table")
+        self.map.add_entity([Coordinate(1, 1), Coordinate(2, 1)], table)
+
+        restored = MapEntity.restore(self.map.dump())
+
+        original_cells = sorted(
+            (x, y, sorted(e.id for e in bucket))
+            for x, y, bucket in self.map.entities.iter_cells()
+        )
+        restored_cells = sorted(
+            (x, y, sorted(e.id for e in bucket))
+            for x, y, bucket in restored.entities.iter_cells()
+        )
+        self.assertEqual(original_cells, restored_cells)
+
+
+def dump_layout(data: Dict[str, Any]):
+    """Раскладка dump карты, не зависящая от порядка обхода."""
+    cells = sorted(
+        (coord_str, sorted((e["uid"], e["id"]) for e in entity_list))
+        for coord_str, entity_list in data["entitys"].items()
+    )
+    multi = sorted(
+        (e["uid"], e["id"], sorted(e["components"]["MultiCoordinateComponent"]["coordinates"]))
+        for e in data["multi_entitys"]
+    )
+    return cells, multi
+
+
+class TestMapDelta(unittest.TestCase):
+    def setUp(self):
+        self.map = MapEntity("delta_map")
+        self.items = []
+        for i in range(20):
+            entity = DummyMapItem(f"item_{i}")
+            self.map.add_entity(Coordinate(i, i % 3), entity)
+            self.items.append(entity)
+
+        self.table = DummyMapItem("table")
+        self.map.add_entity([Coordinate(-5, -5), Coordinate(-4, -5)], self.table)
+
+    def test_delta_applies_on_old_dump(self):
+        old_dump = self.map.dump()
+
+        self.map.remove_entity(Coordinate(0, 0), self.items[0])
+        self.map.teleport_entity(Coordinate(1, 1), Coordinate(50, 50), self.items[1])
+        self.map.move_entity(self.items[5], 2, 2)
+        self.map.remove_entity(Coordinate(-4, -5), self.table)
+        self.map.add_entity([Coordinate(7, 7), Coordinate(7, 8)], self.table)
+
+        fresh = DummyMapItem("fresh")
+        self.map.add_entity(Coordinate(3, 3), fresh)
+        short_lived = DummyMapItem("short_lived")
+        self.map.add_entity(Coordinate(4, 4), short_lived)
+        self.map.remove_entity(Coordinate(4, 4), short_lived)
+
+        delta = self.map.dump_delta(old_dump["version"])
+        # Убранный и возвращенный стол передается заново, а не перемещением
+        self.assertEqual(delta["removed"], [self.items[0].uid, self.table.uid])
+        self.assertEqual([item["data"]["id"] for item in delta["added"]], ["table", "fresh"])
+        self.assertEqual(
+            {item["uid"] for item in delta["moved"]},
+            {self.items[1].uid, self.items[5].uid},
+        )
+
+        patched = MapEntity.apply_delta(old_dump, delta)
+        self.assertEqual(dump_layout(patched), dump_layout(self.map.dump()))
+        self.assertEqual(patched["version"], self.map.version)
+
+    def test_empty_delta(self):
+        delta = self.map.dump_delta(self.map.version)
+        self.assertEqual((delta["added"], delta["removed"], delta["moved"]), ([], [], []))
+
+    def test_delta_rejects_other_base(self):
+        old_dump = self.map.dump()
+        self.map.remove_entity(Coordinate(0, 0), self.items[0])
+        delta = self.map.dump_delta(old_dump["version"])
+
+        with self.assertRaises(ValueError):
+            MapEntity.apply_delta(MapEntity("other").dump(), delta)
+
+        with self.assertRaises(ValueError):
+            self.map.dump_delta(self.map.version + 1)
+
+    def test_trimmed_journal_requires_full_dump(self):
+        with mock.patch.object(map_journal, "JOURNAL_LIMIT", 10):
+            for _ in range(10):
+                self.map.teleport_entity(Coordinate(2, 2), Coordinate(2, 2), self.items[2])
+
+        with self.assertRaises(ValueError):
+            self.map.dump_delta(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import io
+import unittest
+from typing import Any, Dict, List
+
+import msgpack
+
+from systems.ecs import BaseComponent, BaseEntity, register_component, register_entity
+from systems.map.coordinate import Coordinate
+from systems.map.map_entity import MapEntity
+from systems.map.map_snapshot import (REC_END, REC_ENTITY, REC_STRING,
+                                      SNAPSHOT_VERSION, MapSnapshot, pair_xy,
+                                      unpair_xy)
+
+
+@register_component
+class SnapshotHealthComponent(BaseComponent):
+    def __init__(self, health: int = 100) -> None:
+        super().__init__()
+        self.health = health
+
+    def dump(self) -> Dict[str, Any]:
+        return {"type": self.type, "health": self.health}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "SnapshotHealthComponent":
+        return cls(data.get("health", 100))
+
+
+@register_entity
+class SnapshotItem(BaseEntity):
+    def __init__(self, id: str = "", name: str = "") -> None:
+        super().__init__(id)
+        self.name = name
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "name": self.name,
+            "components": {
+                name: comp.dump() for name, comp in self._components.items()
+            },
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> "SnapshotItem":
+        entity = cls(id=data["id"], name=data.get("name", ""))
+        cls._restore_components(entity, data)
+        return entity
+
+
+@register_component
+class SnapshotStatsComponent(BaseComponent):
+    level: int = 1
+    perks: List[str] = []
+
+
+@register_component
+class SnapshotOwnerComponent(BaseComponent):
+    owner: str
+    since: int = 0
+
+
+def map_layout(map_entity: MapEntity):
+    layout = []
+    for x, y, bucket in map_entity.entities.iter_cells():
+        for entity in bucket:
+            health = entity.get_component("SnapshotHealthComponent")
+            layout.append((x, y, entity.id, entity.name, health.health if health else None))  # type: ignore
+
+    return sorted(layout, key=repr)
+
+
+class TestMapSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.map = MapEntity("snapshot_map")
+        for i in range(40):
+            entity = SnapshotItem("crate", name=f"crate_{i}")
+            entity.add_component(SnapshotHealthComponent(i))
+            self.map.add_entity(Coordinate(i - 20, (i * 7) % 13 - 6), entity)
+
+        self.map.add_entity(
+            [Coordinate(100, 100), Coordinate(101, 100)], SnapshotItem("table", name="table")
+        )
+
+    def _roundtrip(self) -> MapEntity:
+        stream = io.BytesIO()
+        MapSnapshot.dump(self.map, stream)
+        stream.seek(0)
+        return MapSnapshot.load(stream)
+
+    def test_pair_roundtrip(self):
+        for x in range(-40, 41, 3):
+            for y in range(-40, 41, 7):
+                self.assertEqual(unpair_xy(pair_xy(x, y)), (x, y))
+
+        self.assertEqual(unpair_xy(pair_xy(-(2**40), 2**45)), (-(2**40), 2**45))
+        self.assertLess(pair_xy(10, -10), 2**16)
+
+    def test_roundtrip(self):
+        restored = self._roundtrip()
+
+        self.assertEqual(restored.id, "snapshot_map")
+        self.assertEqual(map_layout(restored), map_layout(self.map))
+
+        table = restored.get_entities(Coordinate(101, 100))[0]  # type: ignore
+        self.assertEqual(restored.get_entities(Coordinate(100, 100)), [table])
+
+    def test_type_names_stored_once(self):
+        stream = io.BytesIO()
+        MapSnapshot.dump(self.map, stream)
+
+        self.assertEqual(stream.getvalue().count(b"SnapshotHealthComponent"), 1)
+        self.assertEqual(stream.getvalue().count(b"SnapshotItem"), 1)
+
+    def test_schema_components_packed(self):
+        entity = SnapshotItem("guard", name="guard")
+        entity.add_component(SnapshotStatsComponent(level=3, perks=["night_vision"]))
+        self.map.add_entity(Coordinate(50, 50), entity)
+
+        stream = io.BytesIO()
+        MapSnapshot.dump(self.map, stream)
+        # Имена полей пишутся один раз, в таблицу строк
+        self.assertEqual(stream.getvalue().count(b"perks"), 1)
+
+        stream.seek(0)
+        guard = MapSnapshot.load(stream).get_entities(Coordinate(50, 50))[0]  # type: ignore
+        stats = guard.get_component("SnapshotStatsComponent")
+        self.assertEqual((stats.level, stats.perks), (3, ["night_vision"]))  # type: ignore
+
+    def _raw_snapshot(self, comp_type, layout, values):
+        packer = msgpack.Packer(use_bin_type=True)
+        strings = ["SnapshotItem", "guard", comp_type, layout]
+        components = [[2, values, 3]]
+        records = [["DMMAP", SNAPSHOT_VERSION, "raw_map", {}]]
+        records += [[REC_STRING, value] for value in strings]
+        records += [[REC_ENTITY, pair_xy(1, 1), 0, 1, components, None], [REC_END]]
+        return io.BytesIO(b"".join(packer.pack(record) for record in records))
+
+    def test_schema_change_reads_by_name(self):
+        # Записано схемой (level, removed, perks), текущая - (level, perks)
+        stream = self._raw_snapshot("SnapshotStatsComponent", "level,removed,perks", [4, "gone", ["x_ray"]])
+
+        guard = MapSnapshot.load(stream).get_entities(Coordinate(1, 1))[0]  # type: ignore
+        stats = guard.get_component("SnapshotStatsComponent")
+        self.assertEqual((stats.level, stats.perks), (4, ["x_ray"]))  # type: ignore
+
+    def test_schema_change_fills_defaults(self):
+        stream = self._raw_snapshot("SnapshotStatsComponent", "level", [6])
+
+        guard = MapSnapshot.load(stream).get_entities(Coordinate(1, 1))[0]  # type: ignore
+        stats = guard.get_component("SnapshotStatsComponent")
+        self.assertEqual((stats.level, stats.perks), (6, []))  # type: ignore
+
+    def test_new_required_field_is_incompatible(self):
+        stream = self._raw_snapshot("SnapshotOwnerComponent", "since", [3])
+
+        with self.assertRaisesRegex(ValueError, "required fields owner"):
+            MapSnapshot.load(stream)
+
+    def test_truncated_snapshot(self):
+        stream = io.BytesIO()
+        MapSnapshot.dump(self.map, stream)
+
+        with self.assertRaises(ValueError):
+            MapSnapshot.load(io.BytesIO(stream.getvalue()[:-1]))
+
+        with self.assertRaises(ValueError):
+            MapSnapshot.load(io.BytesIO(b""))
+
+        with self.assertRaises(ValueError):
+            MapSnapshot.load(io.BytesIO(b"\x93\x01\x02\x03"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from Code.root_path import ROOT_PATH
+from systems.ecs import PrototypeLoader
+from systems.startup import (StartupError, StartupPipeline,
+                             add_localization_phase, add_prototype_phase,
+                             add_texture_phase)
+
+
+def slow_echo(value: int, delay: float) -> int:
+    time.sleep(delay)
+    return value
+
+
+def fail(message: str) -> None:
+    raise ValueError(message)
+
+
+PROTOTYPES = """
+- type: StartupCreature
+  id: startup_rat
+  components:
+    - type: HealthComponent
+      hp: 10
+"""
+
+
+class TestStartupPipeline(unittest.TestCase):
+    def test_merge_order_is_deterministic(self):
+        pipeline = StartupPipeline()
+        # Первая задача завершается последней
+        pipeline.add_phase(
+            "numbers",
+            [(f"job_{i}", slow_echo, (i, 0.05 if i == 0 else 0)) for i in range(5)],
+            lambda results: list(results.items()),
+        )
+        pipeline.add_phase("defaults", [("only", slow_echo, (7, 0))])
+
+        report = pipeline.run()
+
+        self.assertEqual(report.results["numbers"], [(f"job_{i}", i) for i in range(5)])
+        self.assertEqual(report.results["defaults"], {"only": 7})
+        self.assertEqual([timing.name for timing in report.timings], ["numbers", "defaults"])
+        self.assertEqual(report.timings[0].jobs, 5)
+        self.assertGreaterEqual(report.timings[0].busy, 0.05)
+        self.assertEqual(len(report.format()), 4)
+
+    def test_jobs_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        pipeline = StartupPipeline()
+        pipeline.add_phase("wait", [(str(i), barrier.wait, ()) for i in range(3)])
+
+        pipeline.run()
+
+    def test_all_errors_reported(self):
+        merged = []
+        pipeline = StartupPipeline()
+        pipeline.add_phase("a", [("a.yml", fail, ("broken a",)), ("ok.yml", slow_echo, (1, 0))])
+        pipeline.add_phase("b", [("b.loc", fail, ("broken b",))], merged.append)
+        pipeline.add_phase("c", [("c", slow_echo, (1, 0))], lambda results: fail("bad merge"))
+
+        with self.assertRaises(StartupError) as ctx:
+            pipeline.run()
+
+        self.assertEqual(ctx.exception.errors, [
+            "[a] a.yml: ValueError: broken a",
+            "[b] b.loc: ValueError: broken b",
+            "[c] merge: ValueError: bad merge",
+        ])
+        self.assertEqual(merged, [])
+        self.assertEqual([timing.errors for timing in ctx.exception.report.timings], [1, 1, 1])
+
+    def test_optional_phase_errors_are_warnings(self):
+        pipeline = StartupPipeline()
+        pipeline.add_phase("required", [("ok.yml", slow_echo, (1, 0))])
+        pipeline.add_phase("optional", [("bad.loc", fail, ("broken",))], fatal=False)
+        pipeline.add_phase("merge", [("a", slow_echo, (1, 0))], lambda results: fail("bad"), fatal=False)
+
+        report = pipeline.run()
+
+        self.assertEqual(report.results, {"required": {"ok.yml": 1}})
+        self.assertEqual(report.warnings, [
+            "[optional] bad.loc: ValueError: broken",
+            "[merge] merge: ValueError: bad",
+        ])
+        self.assertEqual([timing.errors for timing in report.timings], [0, 1, 1])
+
+    def test_content_phases_do_not_stop_startup(self):
+        with tempfile.TemporaryDirectory() as temp:
+            loc = Path(temp) / "loc" / "rus"
+            loc.mkdir(parents=True)
+            (loc / "broken.loc").write_text("no separator here", encoding="utf-8")
+
+            pipeline = StartupPipeline()
+            add_localization_phase(pipeline, Path(temp) / "loc")
+            report = pipeline.run()
+
+            self.assertNotIn("localization", report.results)
+            self.assertEqual(len(report.warnings), 1)
+
+    def test_job_count(self):
+        pipeline = StartupPipeline()
+        pipeline.add_phase("a", [(str(i), slow_echo, (i, 0)) for i in range(3)])
+        pipeline.add_phase("b", [])
+
+        self.assertEqual(pipeline.job_count, 3)
+
+    def test_duplicate_phase(self):
+        pipeline = StartupPipeline()
+        pipeline.add_phase("a", [])
+
+        with self.assertRaises(ValueError):
+            pipeline.add_phase("a", [])
+
+    def test_content_phases_in_processes(self):
+        with tempfile.TemporaryDirectory() as temp:
+            root = Path(temp) / "Prototype"
+            root.mkdir()
+            (root / "mobs.yml").write_text(PROTOTYPES, encoding="utf-8")
+            loader = PrototypeLoader([root], Path(temp) / "cache.msgpack")
+
+            pipeline = StartupPipeline()
+            add_prototype_phase(pipeline, loader)
+            add_texture_phase(pipeline, ROOT_PATH / "Content" / "Sprites")
+            add_localization_phase(pipeline, ROOT_PATH / "Content" / "loc")
+
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                report = pipeline.run(executor)
+
+            self.assertEqual([proto["id"] for proto in report.results["prototypes"]], ["startup_rat"])
+            self.assertEqual(loader.stats["parsed"], 1)
+            self.assertIn(Path("dev") / "Test.dms", report.results["textures"])
+            self.assertIn("rus", report.results["localization"])
+
+            # Второй запуск: кэш совпал, задач разбора нет
+            pipeline = StartupPipeline()
+            add_prototype_phase(pipeline, loader)
+            report = pipeline.run()
+
+            self.assertEqual(report.timings[0].jobs, 0)
+            self.assertEqual(len(report.results["prototypes"]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,7 @@
+import sys
+
+from Code.root_path import ROOT_PATH
+
+# Модули Code импортируют друг друга как `systems.*`, как при запуске main.py
+if str(ROOT_PATH / "Code") not in sys.path:
+    sys.path.insert(0, str(ROOT_PATH / "Code"))